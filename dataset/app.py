@@ -4,6 +4,9 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from common import configure_logging
 from fastapi import FastAPI
 from opentelemetry import trace
@@ -17,13 +20,30 @@ from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from prometheus_fastapi_instrumentator import PrometheusFastApiInstrumentator
 
 from dataset import __version__
+from dataset.components.object_storage.policy import get_policy_manager
 from dataset.config import Settings
 from dataset.config import get_settings
+from dataset.dependencies.http import get_http_client
+from dataset.dependencies.s3 import get_s3_client
 from dataset.startup import api_registry
 from dataset.startup.exception_handlers import exception_handlers
 from dataset.startup.middlewares import middlewares
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Create process-wide object storage clients on startup and release all shared clients on shutdown."""
+
+    await get_s3_client()
+    await get_policy_manager()
+
+    yield
+
+    await get_s3_client.close()
+    get_policy_manager.close()
+    await get_http_client.close()
+
+
 def create_app() -> FastAPI:
     settings = get_settings()
 
@@ -34,6 +54,7 @@ def create_app() -> FastAPI:
         docs_url='/v1/api-doc',
         redoc_url='/v1/api-redoc',
         version=__version__,
+        lifespan=lifespan,
     )
 
     setup_middlewares(app)
@@ -17,8 +17,10 @@ from sqlalchemy.engine import ScalarResult
 from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import aliased
 from sqlalchemy.sql import Executable
 from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import ValuesBase
 
 from dataset.components.db_model import DBModel
 from dataset.components.exceptions import AlreadyExists
@@ -26,6 +28,7 @@ from dataset.components.exceptions import NotFound
 from dataset.components.exceptions import ServiceException
 from dataset.components.exceptions import UnhandledException
 from dataset.components.filtering import Filtering
+from dataset.components.pagination import Cursor
 from dataset.components.pagination import Page
 from dataset.components.pagination import Pagination
 from dataset.components.schemas import BaseSchema
@@ -72,11 +75,16 @@ class CRUD:
 
         return None
 
+    def join_relationships(self, statement: Select, entity: Any) -> Select:
+        """Join and eagerly load relationships of the entity, either the model or its alias."""
+
+        return statement
+
     @property
     def select_query(self) -> Select:
         """Create base select."""
 
-        return select(self.model)
+        return self.join_relationships(select(self.model), self.model)
 
     async def commit(self) -> None:
         """Commit the current transaction."""
@@ -103,10 +111,26 @@ class CRUD:
 
         return await self.session.scalars(statement, **kwds)
 
-    async def _create_one(self, statement: Executable) -> UUID | str:
-        """Execute a statement to create one entry."""
-        result = await self.execute(statement)
-        return result.inserted_primary_key.id
+    async def _returning_one(self, statement: ValuesBase, load_relationships: bool = False) -> DBModel:
+        """Execute an insert or update statement and return the entry populated from the RETURNING clause.
+
+        Relationships are joined to the returned row within the same statement when requested.
+        """
+
+        statement = statement.returning(*self.model.__table__.columns)
+        if load_relationships:
+            entity = aliased(self.model, statement.cte())
+            query = self.join_relationships(select(entity), entity)
+        else:
+            query = select(self.model).from_statement(statement)
+
+        result = await self.execute(query.execution_options(populate_existing=True))
+        instance = result.scalars().first()
+
+        if instance is None:
+            raise NotFound()
+
+        return instance
 
     async def _retrieve_one(self, statement: Executable) -> DBModel:
         """Execute a statement to retrieve one entry."""
@@ -143,13 +167,11 @@ class CRUD:
         if result.rowcount == 0:
             raise NotFound()
 
-    async def create(self, entry_create: BaseSchema, **kwds: Any) -> DBModel:
-        """Create a new entry."""
+    async def create(self, entry_create: BaseSchema, load_relationships: bool = False, **kwds: Any) -> DBModel:
+        """Create a new entry, relationships are loaded only on request."""
         values = entry_create.dict()
         statement = insert(self.model).values(**(values | kwds))
-        entry_id = await self._create_one(statement)
-
-        entry = await self.retrieve_by_id(entry_id)
+        entry = await self._returning_one(statement, load_relationships)
 
         return entry
 
@@ -164,30 +186,38 @@ class CRUD:
     async def paginate(
         self, pagination: Pagination, sorting: Sorting | None = None, filtering: Filtering | None = None
     ) -> Page:
-        """Get all existing entries with pagination support."""
+        """Get all existing entries with pagination support, the total count is only selected on request."""
 
-        count_statement = select(func.count()).select_from(self.model)
-        if filtering:
-            count_statement = filtering.apply(count_statement, self.model)
-        count = await self._retrieve_one(count_statement)
+        count = None
+        if pagination.include_count:
+            count_statement = select(func.count()).select_from(self.model)
+            if filtering:
+                count_statement = filtering.apply(count_statement, self.model)
+            count = await self._retrieve_one(count_statement)
 
-        entries_statement = self.select_query.limit(pagination.limit).offset(pagination.offset)
+        entries_statement = self.select_query
         if sorting:
             entries_statement = sorting.apply(entries_statement, self.model)
         if filtering:
             entries_statement = filtering.apply(entries_statement, self.model)
+        entries_statement = pagination.apply(entries_statement, self.model, sorting)
         entries = await self._retrieve_many(entries_statement)
 
-        return Page(pagination=pagination, count=count, entries=entries)
+        next_cursor = None
+        if len(entries) > pagination.limit:
+            entries = entries[: pagination.limit]
+            next_cursor = Cursor.from_entry(entries[-1], sorting.field if sorting else None).encode()
+
+        return Page(pagination=pagination, count=count, entries=entries, next_cursor=next_cursor)
 
-    async def update(self, id_: UUID, entry_update: BaseSchema, **kwds: Any) -> DBModel:
-        """Update an existing entry attributes."""
+    async def update(
+        self, id_: UUID, entry_update: BaseSchema, load_relationships: bool = False, **kwds: Any
+    ) -> DBModel:
+        """Update an existing entry attributes, relationships are loaded only on request."""
 
         values = entry_update.dict(exclude_unset=True, exclude_defaults=True)
         statement = update(self.model).where(self.model.id == id_).values(**(values | kwds))
-        await self._update_one(statement)
-
-        entry = await self.retrieve_by_id(id_)
+        entry = await self._returning_one(statement, load_relationships)
 
         return entry
 
@@ -4,14 +4,22 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from typing import Any
 from uuid import UUID
 
+from sqlalchemy import func
+from sqlalchemy import update
 from sqlalchemy.future import select
 
 from dataset.components.crud import CRUD
 from dataset.components.dataset.exceptions import DatasetNotFound
 from dataset.components.dataset.models import Dataset
+from dataset.components.dataset.models import StorageLayout
 from dataset.components.exceptions import NotFound
+from dataset.components.schemas import BaseSchema
+from dataset.config import get_settings
+
+settings = get_settings()
 
 
 class DatasetCRUD(CRUD):
@@ -19,6 +27,12 @@ class DatasetCRUD(CRUD):
 
     model = Dataset
 
+    async def create(self, entry_create: BaseSchema, **kwds: Any) -> Dataset:
+        """Create a new dataset, files of new datasets are stored in the configured storage layout."""
+
+        kwds.setdefault('storage_layout', StorageLayout(settings.DATASET_STORAGE_LAYOUT))
+        return await super().create(entry_create, **kwds)
+
     async def retrieve_by_code(self, code: str) -> Dataset:
         """Get an existing dataset by unique code."""
 
@@ -44,3 +58,27 @@ class DatasetCRUD(CRUD):
         else:
             dataset = await self.retrieve_by_code(id_or_code)
         return dataset
+
+    async def increment_counters(self, id_: UUID, total_files: int, size: int) -> tuple[int, int]:
+        """Add deltas to file count and size of a dataset in a single statement and return the new values.
+
+        Counters are changed relative to the stored values and clamped at zero, so concurrent file operations on the
+        same dataset do not overwrite each other.
+        """
+
+        statement = (
+            update(self.model)
+            .where(self.model.id == id_)
+            .values(
+                total_files=func.greatest(func.coalesce(self.model.total_files, 0) + total_files, 0),
+                size=func.greatest(func.coalesce(self.model.size, 0) + size, 0),
+            )
+            .returning(self.model.total_files, self.model.size)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.execute(statement)
+        row = result.first()
+        if row is None:
+            raise DatasetNotFound()
+
+        return row.total_files, row.size
@@ -12,12 +12,25 @@ from sqlalchemy import Index
 from sqlalchemy import UniqueConstraint
 from sqlalchemy import func
 from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import ENUM
 from sqlalchemy.dialects.postgresql import INTEGER
 from sqlalchemy.dialects.postgresql import TIMESTAMP
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
 from dataset.components.models import DBModel
+from dataset.components.types import StrEnum
+
+
+class StorageLayout(StrEnum):
+    """Layout of dataset file object keys.
+
+    Keys of the path layout mirror display paths of files, so moving or renaming a file moves its object. Keys of the
+    id layout never change, so move and rename only update the metadata.
+    """
+
+    PATH = 'path'
+    ID = 'id'
 
 
 class Dataset(DBModel):
@@ -44,6 +57,12 @@ class Dataset(DBModel):
     title = Column(VARCHAR(length=256), nullable=False)
     creator = Column(VARCHAR(length=256), index=True, nullable=False)
     project_id = Column(UUID(as_uuid=True), nullable=False)
+    storage_layout = Column(
+        ENUM(StorageLayout, name='storage_layout', values_callable=lambda enum: enum.values()),
+        default=StorageLayout.PATH,
+        server_default=StorageLayout.PATH.value,
+        nullable=False,
+    )
     created_at = Column(TIMESTAMP(timezone=True), default=func.now(), index=True, nullable=False)
     updated_at = Column(TIMESTAMP(timezone=True), default=func.now(), onupdate=func.now(), nullable=False)
 
@@ -6,6 +6,7 @@
 
 from abc import ABCMeta
 from abc import abstractmethod
+from http.client import BAD_REQUEST
 from http.client import CONFLICT
 from http.client import FORBIDDEN
 from http.client import INTERNAL_SERVER_ERROR
@@ -126,3 +127,19 @@ class Unauthorized(ServiceException):
     @property
     def details(self) -> str:
         return 'Unauthorized access to requested resource'
+
+
+class BadRequest(ServiceException):
+    """Raised when request cannot be processed for the given resource."""
+
+    @property
+    def status(self) -> int:
+        return BAD_REQUEST
+
+    @property
+    def code(self) -> str:
+        return 'bad_request'
+
+    @property
+    def details(self) -> str:
+        return 'Request cannot be processed'
@@ -91,6 +91,25 @@ class FileActivityLogService(BaseFileFolderActivityLog):
             )
             await self._message_send(log_schema.dict())
 
+    async def send_on_storage_layout_event(
+        self, dataset_code: str, source_list: list[dict[str, Any]], user: str, network_origin: str = 'unknown'
+    ):
+        """Send msg to msg broker for files moved to the id storage layout."""
+
+        for item in source_list:
+            log_schema = FileFolderActivityLogSchema(
+                container_code=dataset_code,
+                user=user,
+                activity_type='update',
+                item_parent_path=item['parent_path'] or '',
+                item_id=UUID(item['id']),
+                item_type=item['type'],
+                item_name=item['name'],
+                changes=[{'item_property': 'storage_layout', 'old_value': 'path', 'new_value': 'id'}],
+                network_origin=network_origin,
+            )
+            await self._message_send(log_schema.dict())
+
 
 def get_file_activity_log_service(
     kafka_producer_client: KafkaProducerClient = Depends(get_kafka_client),
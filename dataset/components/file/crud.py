@@ -4,19 +4,22 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
-import csv
 import json
-from io import StringIO
 from typing import Any
-
-from starlette.concurrency import run_in_threadpool
+from uuid import uuid4
 
 from dataset.components.dataset.models import Dataset
+from dataset.components.dataset.models import StorageLayout
 from dataset.components.exceptions import NotFound
+from dataset.components.file.normalizer import CSVNormalizer
+from dataset.components.file.normalizer import normalize_csv
 from dataset.components.file.schemas import FileSchema
+from dataset.components.file.schemas import FileStatSchema
 from dataset.components.file.schemas import FileStreamSchema
 from dataset.components.file.schemas import ItemStatusSchema
 from dataset.components.folder.exceptions import FolderNotFound
+from dataset.components.object_storage.batch import DeleteObjectsBatcher
+from dataset.components.object_storage.copy import ObjectCopier
 from dataset.components.object_storage.s3 import S3Client
 from dataset.config import get_settings
 from dataset.logger import logger
@@ -31,27 +34,7 @@ class FileCRUD:
     def __init__(self, s3_client: S3Client, metadata_service: MetadataService):
         self.s3_client = s3_client
         self.metadata_service = metadata_service
-
-    def _parse_csv_response(self, csvdata: str) -> str:
-        """Return content from csv file."""
-
-        csv.field_size_limit(settings.MAX_PREVIEW_SIZE)
-        csvfile = StringIO(csvdata)
-        csv_out = StringIO()
-        # detect csv format
-        try:
-            dialect = csv.Sniffer().sniff(csvfile.read(1024), [',', '|', ';', '\t'])
-        except csv.Error:
-            dialect = csv.excel
-        csvfile.seek(0)
-        reader = csv.reader(csvfile, dialect)
-        writer = csv.writer(csv_out, delimiter=',')
-        writer.writerows(reader)
-        content = csv_out.getvalue()
-        if len(content) >= settings.MAX_PREVIEW_SIZE:
-            # Remove last line as it will be incomplete
-            content = content[: content[:-1].rfind('\n')]
-        return content
+        self.object_copier = ObjectCopier(s3_client)
 
     def _parse_location(self, path: str) -> dict[str, str]:
         """Return bucket and object key content from csv file."""
@@ -60,11 +43,38 @@ class FileCRUD:
         _, bucket, obj_path = tuple(minio_path.split('/', 2))
         return {'bucket': bucket, 'path': obj_path}
 
+    def _get_location(self, bucket: str, object_key: str) -> str:
+        """Return minio location of the object."""
+
+        minio_http = ('https://' if settings.S3_INTERNAL_HTTPS else 'http://') + settings.S3_INTERNAL
+        return f'minio://{minio_http}/{bucket}/{object_key}'
+
+    def get_object_key(self, dataset: Dataset, fuf_path: str) -> str:
+        """Return object key for a new file at the path within the dataset in the storage layout of the dataset."""
+
+        if dataset.storage_layout == StorageLayout.ID:
+            return f'{settings.DATASET_OBJECT_FOLDER}/{uuid4()}'
+        return f'{settings.DATASET_FILE_FOLDER}/{fuf_path}'
+
+    @staticmethod
+    def get_item_path(item: dict[str, Any]) -> str:
+        """Return display path of the item within the dataset, which is independent of the storage layout."""
+
+        if item.get('parent_path'):
+            return f'{item["parent_path"]}/{item["name"]}'
+        return item['name']
+
+    def _get_file_type(self, name: str) -> str:
+        """Return file type from the last extension, or the last two for gzip compressed files like "nii.gz"."""
+
+        extensions = name.split('.')[1:]
+        if len(extensions) > 1 and extensions[-1] == 'gz':
+            return '.'.join(extensions[-2:])
+        return extensions[-1] if extensions else ''
+
     async def _format_file_body(self, file_type: str, body: str) -> str:
         """Return decoded content by file type."""
 
-        if file_type in ['csv', 'tsv']:
-            return await run_in_threadpool(self._parse_csv_response, body)
         if file_type == 'json':
             try:
                 return json.dumps(json.loads(body))
@@ -72,35 +82,89 @@ class FileCRUD:
                 logger.error('fail to parse the json')
         return body
 
-    async def _get_file_metadata(self, file_id: str) -> dict[str, Any]:
-        """Return file metadata: bucket, path, path and size."""
+    def parse_file_metadata(self, file_metadata: dict[str, Any]) -> dict[str, Any]:
+        """Return bucket, path, type, size and version from metadata item of the file."""
 
-        file_metadata = await self.metadata_service.get_by_id(file_id)
-        if not file_metadata:
-            raise NotFound()
         file_data = self._parse_location(file_metadata['storage']['location_uri'])
-        file_type = file_metadata['name'].split('.')[1]
         return {
             'bucket': file_data['bucket'],
             'path': file_data['path'],
-            'type': file_type,
+            'type': self._get_file_type(file_metadata['name']),
             'size': file_metadata['size'],
+            'version': file_metadata['storage'].get('version'),
         }
 
-    async def download_file(self, file_id: str) -> FileSchema:
-        """Return file metadata."""
+    async def get_file_metadata(self, file_id: str) -> dict[str, Any]:
+        """Return file metadata: bucket, path, path and size."""
+
+        file_metadata = await self.metadata_service.get_by_id(file_id)
+        if not file_metadata:
+            raise NotFound()
+        return self.parse_file_metadata(file_metadata)
 
-        file_metadata = await self._get_file_metadata(file_id)
-        file_body = await self.s3_client.get_file_body(file_metadata['bucket'], file_metadata['path'])
-        content = await self._format_file_body(file_metadata['type'], file_body)
+    async def get_object_version(self, file_metadata: dict[str, Any]) -> str:
+        """Return object version from metadata or ETag of the object when the version is not known."""
+
+        if file_metadata['version']:
+            return file_metadata['version']
+
+        head = await self.s3_client.head_object(file_metadata['bucket'], file_metadata['path'])
+        return head['ETag'].strip('"')
+
+    async def read_file(self, file_metadata: dict[str, Any]) -> FileSchema:
+        """Return file with content formatted by file type."""
+
+        if file_metadata['type'] in ['csv', 'tsv']:
+            # normalization may shrink the content, so more than the preview size is requested
+            response = await self.s3_client.get_object(
+                file_metadata['bucket'], file_metadata['path'], byte_range=f'bytes=0-{2 * settings.MAX_PREVIEW_SIZE}'
+            )
+            truncated = False
+            if 'ContentRange' in response:
+                # content range has "bytes 0-<last>/<size>" format
+                last, size = response['ContentRange'].removeprefix('bytes 0-').split('/')
+                truncated = int(last) + 1 < int(size)
+            normalizer = CSVNormalizer(settings.MAX_PREVIEW_SIZE)
+            content = ''.join([part async for part in normalize_csv(response['Body'], normalizer, truncated=truncated)])
+        else:
+            file_body = await self.s3_client.get_file_body(file_metadata['bucket'], file_metadata['path'])
+            content = await self._format_file_body(file_metadata['type'], file_body)
         return FileSchema(content=content, type=file_metadata['type'], size=file_metadata['size'])
 
-    async def stream_file(self, file_id: str) -> FileStreamSchema:
-        """Return file metadata for stream."""
+    async def download_file(self, file_id: str) -> FileSchema:
+        """Return file metadata."""
 
-        file_metadata = await self._get_file_metadata(file_id)
-        file = await self.s3_client.boto_client.stat_object(file_metadata['bucket'], file_metadata['path'])
-        return FileStreamSchema(content=file['Body'], type=file_metadata['type'], size=file_metadata['size'])
+        file_metadata = await self.get_file_metadata(file_id)
+        return await self.read_file(file_metadata)
+
+    async def get_file_stat(self, file_id: str) -> FileStatSchema:
+        """Return file location with size, etag and modification time taken from the object."""
+
+        file_metadata = await self.get_file_metadata(file_id)
+        head = await self.s3_client.head_object(file_metadata['bucket'], file_metadata['path'])
+        return FileStatSchema(
+            bucket=file_metadata['bucket'],
+            path=file_metadata['path'],
+            type=file_metadata['type'],
+            size=head['ContentLength'],
+            etag=head['ETag'],
+            last_modified=head['LastModified'],
+            version=head.get('VersionId'),
+        )
+
+    async def stream_file(
+        self, file_stat: FileStatSchema, byte_range: tuple[int, int] | None = None
+    ) -> FileStreamSchema:
+        """Return file stream, or stream of the inclusive byte range of it."""
+
+        range_header = None
+        size = file_stat.size
+        if byte_range:
+            range_header = f'bytes={byte_range[0]}-{byte_range[1]}'
+            size = byte_range[1] - byte_range[0] + 1
+
+        file = await self.s3_client.get_object(file_stat.bucket, file_stat.path, file_stat.version, range_header)
+        return FileStreamSchema(content=file['Body'], type=file_stat.type, size=size)
 
     async def create(
         self,
@@ -126,8 +190,8 @@ class FileCRUD:
             fuf_path = parent_path + '/' + file_name
         else:
             fuf_path = file_name
-        minio_http = ('https://' if settings.S3_INTERNAL_HTTPS else 'http://') + settings.S3_INTERNAL
-        location = f'minio://{minio_http}/{dataset.code}/{settings.DATASET_FILE_FOLDER}/{fuf_path}'
+        object_key = self.get_object_key(dataset, fuf_path)
+        location = self._get_location(dataset.code, object_key)
 
         payload = {
             'parent': parent.get('id'),
@@ -148,13 +212,13 @@ class FileCRUD:
             minio_path = file.get('storage').get('location_uri').split('//')[-1]
             _, bucket, obj_path = tuple(minio_path.split('/', 2))
 
-            await self.s3_client.copy_object(
-                bucket, obj_path, dataset.code, settings.DATASET_FILE_FOLDER + '/' + fuf_path
-            )
-            logger.info(f'Minio Copy {dataset.code}/{fuf_path} Success')
+            version = await self.object_copier.copy(bucket, obj_path, dataset.code, object_key, file.get('size'))
+            logger.info(f'Minio Copy {dataset.code}/{object_key} Success')
 
-            payload = {'id': folder_node.get('id'), 'status': ItemStatusSchema.ACTIVE}
+            # the recorded version lets cached previews be served without asking S3 for the version of the object
+            payload = {'id': folder_node.get('id'), 'status': ItemStatusSchema.ACTIVE, 'version': version}
             await self.metadata_service.update_object(payload)
+            folder_node['storage'] = {**folder_node.get('storage', {}), 'version': version}
 
         except Exception as e:
             logger.exception(f'error when uploading: {str(e)}')
@@ -162,13 +226,54 @@ class FileCRUD:
 
         return folder_node
 
-    async def delete(self, file: dict[str, Any]) -> None:
-        """Delete file from dataset."""
-        await self.metadata_service.delete_object(file.get('id'))
+    async def relocate(
+        self, item: dict[str, Any], parent: dict[str, Any], parent_path: str | None, new_name: str | None = None
+    ) -> dict[str, Any]:
+        """Move file or folder under the parent by updating its metadata only, objects are not touched.
+
+        Only valid for datasets in the id layout, where object keys do not depend on paths.
+        """
+
+        payload = {
+            'id': item['id'],
+            'parent': parent.get('id'),
+            'parent_path': parent_path if parent.get('id') else None,
+            'name': new_name if new_name else item['name'],
+        }
+        await self.metadata_service.update_object(payload)
+        return item | payload
+
+    async def migrate_to_id_layout(self, file: dict[str, Any]) -> bool:
+        """Copy file object from the path layout key to the id layout key and point metadata to it.
+
+        The old object is removed only after metadata refers to the new one. Returns False when the file is in the id
+        layout already, so the migration can be resumed.
+        """
+
+        file_data = self._parse_location(file['storage']['location_uri'])
+        if file_data['path'].startswith(f'{settings.DATASET_OBJECT_FOLDER}/'):
+            return False
+
+        object_key = f'{settings.DATASET_OBJECT_FOLDER}/{uuid4()}'
+        version = await self.object_copier.copy(
+            file_data['bucket'], file_data['path'], file_data['bucket'], object_key, file.get('size')
+        )
+        await self.metadata_service.update_object(
+            {'id': file['id'], 'location_uri': self._get_location(file_data['bucket'], object_key), 'version': version}
+        )
+        await self.s3_client.delete_object(file_data['bucket'], file_data['path'])
+        logger.info(f'Minio {file_data["bucket"]}/{file_data["path"]} migrated to {object_key}')
+        return True
+
+    async def delete_object(self, file: dict[str, Any], batcher: DeleteObjectsBatcher | None = None) -> None:
+        """Delete object of the file, with the batcher the object is deleted together with objects of other files."""
         try:
             # minio location is minio://http://<end_point>/bucket/user/object_path
             minio_path = file['storage'].get('location_uri').split('//')[-1]
             _, bucket, obj_path = tuple(minio_path.split('/', 2))
+            if batcher:
+                await batcher.delete(bucket, obj_path)
+                return
             logger.info('call minio delete', extra={'bucket': bucket, 'obj_path': 'obj_path'})
             await self.s3_client.delete_object(bucket, obj_path)
             logger.info(f'Minio {bucket}/{obj_path} Delete Success')
@@ -176,6 +281,11 @@ class FileCRUD:
             logger.exception(f'error when deleting: {str(e)}')
             raise e
 
+    async def delete(self, file: dict[str, Any]) -> None:
+        """Delete file from dataset."""
+        await self.metadata_service.delete_object(file.get('id'))
+        await self.delete_object(file)
+
     async def validate_files_folders(
         self, file_id_list: list[dict[str, Any]], code: str, items_type: str = 'dataset'
     ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
@@ -185,9 +295,12 @@ class FileCRUD:
         not_passed_file = []
         duplicate_in_batch_dict = {}
 
-        obj_list = await self.metadata_service.get_objects(code, items_type=items_type)
-        # creates dict where key is obj.id and value is root_objects index
-        object_ids = {obj['id']: index for index, obj in enumerate(obj_list)}
+        # keep only requested objects while streaming the container listing
+        requested_ids = set(file_id_list)
+        objects = {}
+        async for obj in self.metadata_service.iter_objects(code, items_type=items_type):
+            if obj['id'] in requested_ids:
+                objects[obj['id']] = obj
 
         # this is to keep track the object in passed_file array
         # and in the duplicate_in_batch_dict it will be {"geid": array_index}
@@ -195,16 +308,14 @@ class FileCRUD:
         array_index = 0
 
         for file_id in file_id_list:
-            # get index from dict in root_objects
-            root_object_index = object_ids.get(file_id, None)
+            current_node = objects.get(file_id, None)
 
             # if there is no connect then the node is not correct
             # else it is correct
-            if root_object_index is None:
+            if current_node is None:
                 not_passed_file.append({'id': file_id, 'feedback': 'unauthorized'})
 
             else:
-                current_node = obj_list[root_object_index]
                 exist_index = duplicate_in_batch_dict.get(current_node.get('name'), None)
                 # if we have process the file with same name in the same BATCH
                 # we will try to update name for ALL duplicate file into display_path
@@ -250,11 +361,13 @@ class FileCRUD:
     ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
         """Mark duplicated files in dataset."""
 
-        dataset_objects = await self.metadata_service.get_objects(dataset_code)
         duplic_file = []
         not_duplic_file = []
-        name_parent_dict = {obj['name']: obj['parent_path'] for obj in dataset_objects}
-        type_dict = {obj['name']: obj['type'] for obj in dataset_objects}
+        name_parent_dict = {}
+        type_dict = {}
+        async for obj in self.metadata_service.iter_objects(dataset_code):
+            name_parent_dict[obj['name']] = obj['parent_path']
+            type_dict[obj['name']] = obj['type']
         for file in files_list:
             same_name = name_parent_dict.get(file.get('name'), 'not_found')
             obj_type = type_dict.get(file.get('name'), 'not_found')
@@ -5,12 +5,15 @@
 # You may not use this file except in compliance with the License.
 
 from fastapi import Depends
+from redis.asyncio import Redis
 
 from dataset.components.file.crud import FileCRUD
 from dataset.components.file.locks import LockingManager
+from dataset.components.file.locks import create_locking_manager
 from dataset.components.folder.crud import FolderCRUD
 from dataset.components.folder.dependencies import get_folder_crud
 from dataset.components.object_storage.s3 import S3Client
+from dataset.dependencies.redis import get_redis_client
 from dataset.dependencies.s3 import get_s3_client
 from dataset.dependencies.services import get_metadata_service
 from dataset.services.metadata import MetadataService
@@ -23,6 +26,8 @@ async def get_file_crud(
     return FileCRUD(s3_client, metadata_service)
 
 
-async def get_locking_manager(folder_crud: FolderCRUD = Depends(get_folder_crud)) -> LockingManager:
-    """Return LockingManager instance."""
-    return LockingManager(folder_crud)
+async def get_locking_manager(
+    folder_crud: FolderCRUD = Depends(get_folder_crud), redis_client: Redis = Depends(get_redis_client)
+) -> LockingManager:
+    """Return LockingManager instance of the configured backend."""
+    return create_locking_manager(folder_crud, redis_client)
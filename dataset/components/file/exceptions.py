@@ -0,0 +1,49 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from http.client import CONFLICT
+
+from dataset.components.exceptions import ServiceException
+
+
+class ResourceLocked(ServiceException):
+    """Raised when resource is locked by another operation."""
+
+    domain: str = 'file'
+
+    def __init__(self, resource_key: str) -> None:
+        super().__init__(resource_key)
+        self.resource_key = resource_key
+
+    @property
+    def status(self) -> int:
+        return CONFLICT
+
+    @property
+    def code(self) -> str:
+        return 'resource_locked'
+
+    @property
+    def details(self) -> str:
+        return f'Resource "{self.resource_key}" is already in use'
+
+
+class LockLeaseLost(ServiceException):
+    """Raised when leases of held locks expired before they were renewed."""
+
+    domain: str = 'file'
+
+    @property
+    def status(self) -> int:
+        return CONFLICT
+
+    @property
+    def code(self) -> str:
+        return 'lock_lease_lost'
+
+    @property
+    def details(self) -> str:
+        return 'Locks of the operation expired and may be held by another operation'
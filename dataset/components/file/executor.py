@@ -0,0 +1,75 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Any
+from typing import TypeVar
+
+from dataset.config import get_settings
+from dataset.logger import logger
+
+settings = get_settings()
+
+T = TypeVar('T')
+
+_process_semaphore: asyncio.Semaphore | None = None
+
+
+def get_process_semaphore() -> asyncio.Semaphore:
+    """Return semaphore limiting in-flight file operation steps across the whole process."""
+
+    global _process_semaphore
+
+    if _process_semaphore is None:
+        _process_semaphore = asyncio.Semaphore(settings.FILE_OPERATION_PROCESS_CONCURRENCY)
+    return _process_semaphore
+
+
+class OperationFailed(Exception):
+    """Raised when some items of a file operation could not be processed."""
+
+    def __init__(self, failures: list[dict[str, Any]]) -> None:
+        super().__init__(f'{len(failures)} item(s) failed')
+        self.failures = failures
+
+
+class FileOperationExecutor:
+    """Run file operation steps concurrently with per-job and per-process limits.
+
+    Only single steps (metadata calls, object copies, status updates) hold a slot, tree traversal itself does not, so
+    nested folders can never starve each other of slots. The guard is called before every step and stops it by raising,
+    e.g. when locks of the operation are lost.
+    """
+
+    def __init__(self, concurrency: int | None = None, guard: Callable[[], None] | None = None) -> None:
+        self.job_semaphore = asyncio.Semaphore(concurrency or settings.FILE_OPERATION_JOB_CONCURRENCY)
+        self.guard = guard
+        self.failures: list[dict[str, Any]] = []
+        self.failed_items: list[dict[str, Any]] = []
+
+    async def run(self, func: Callable[..., Awaitable[T]], *args: Any, **kwds: Any) -> T:
+        """Await one operation step once both the job and the process slot are acquired."""
+
+        async with self.job_semaphore:
+            async with get_process_semaphore():
+                if self.guard:
+                    self.guard()
+                return await func(*args, **kwds)
+
+    def add_failure(self, item: dict[str, Any], exc: Exception) -> None:
+        """Record an item that failed to be processed."""
+
+        logger.error(f'Item "{item.get("id")}" failed: {exc}', extra={'item_name': item.get('name')})
+        self.failures.append({'id': item.get('id'), 'name': item.get('name'), 'error': str(exc)})
+        self.failed_items.append(item)
+
+    def raise_for_failures(self) -> None:
+        """Raise OperationFailed if any item failed."""
+
+        if self.failures:
+            raise OperationFailed(self.failures)
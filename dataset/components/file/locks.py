@@ -4,34 +4,108 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import asyncio
 from typing import Any
+from uuid import uuid4
 
 import httpx
 from fastapi import HTTPException
+from redis.asyncio import Redis
 
+from dataset.components.file.crud import FileCRUD
+from dataset.components.file.exceptions import LockLeaseLost
+from dataset.components.file.exceptions import ResourceLocked
 from dataset.components.file.schemas import ItemStatusSchema
 from dataset.components.file.schemas import ResourceLockingSchema
 from dataset.components.folder.crud import FolderCRUD
 from dataset.config import get_settings
+from dataset.dependencies.http import Upstream
+from dataset.dependencies.http import get_http_client
 from dataset.logger import logger
 
 settings = get_settings()
 
+# KEYS are lock keys, ARGV are owner, lease ttl and operation of each lock key
+ACQUIRE_SCRIPT = '''
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local ttl = tonumber(ARGV[2])
+for i = 1, #KEYS do
+    redis.call('ZREMRANGEBYSCORE', KEYS[i], '-inf', now_ms)
+    for _, holder in ipairs(redis.call('ZRANGE', KEYS[i], 0, -1)) do
+        local operation, owner = string.match(holder, '^(%a+):(.+)$')
+        if owner ~= ARGV[1] and (operation == 'write' or ARGV[i + 2] == 'write') then
+            return -i
+        end
+    end
+end
+for i = 1, #KEYS do
+    redis.call('ZADD', KEYS[i], now_ms + ttl, ARGV[i + 2] .. ':' .. ARGV[1])
+    if redis.call('PTTL', KEYS[i]) < ttl then
+        redis.call('PEXPIRE', KEYS[i], ttl)
+    end
+end
+return 0
+'''
+
+# KEYS are lock keys, ARGV are owner, lease ttl and operation of each lock key
+RENEW_SCRIPT = '''
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local ttl = tonumber(ARGV[2])
+local lost = 0
+for i = 1, #KEYS do
+    local holder = ARGV[i + 2] .. ':' .. ARGV[1]
+    local expires = redis.call('ZSCORE', KEYS[i], holder)
+    if expires and tonumber(expires) > now_ms then
+        redis.call('ZADD', KEYS[i], now_ms + ttl, holder)
+        if redis.call('PTTL', KEYS[i]) < ttl then
+            redis.call('PEXPIRE', KEYS[i], ttl)
+        end
+    else
+        lost = lost + 1
+    end
+end
+return lost
+'''
+
+# KEYS are lock keys, ARGV are owner and operation of each lock key
+RELEASE_SCRIPT = '''
+local released = 0
+for i = 1, #KEYS do
+    released = released + redis.call('ZREM', KEYS[i], ARGV[i + 1] .. ':' .. ARGV[1])
+end
+return released
+'''
+
 
 class LockingManager:
-    """Manages resource locking."""
+    """Manages resource locking.
+
+    In the "prefix" lock mode folders written by the operation are not walked, a single write lock on the folder key
+    covers all of its descendants. Every lock also takes shared read locks on the keys of its ancestor folders, so a
+    folder write lock conflicts with any lock below it. The lock service has no intention modes and a read lock on the
+    folder key would not conflict with writes below it, so folders that are only read are still walked and every key
+    below them is read locked.
+    """
 
     DATAOPS_LOCK_URL = f'{settings.DATA_UTILITY_SERVICE_v2}/resource/lock/'
 
-    def __init__(self, folder_crud: FolderCRUD):
+    def __init__(
+        self,
+        folder_crud: FolderCRUD,
+        mode: str = settings.FILE_OPERATION_LOCK_MODE,
+        concurrency: int = settings.FILE_OPERATION_LOCK_CONCURRENCY,
+    ):
         self.folder_crud = folder_crud
+        self.prefix_locks = mode == 'prefix'
+        self.concurrency = concurrency
 
     async def lock_resource(self, resource_key: str, operation: str) -> None:
         """Lock specified resource for reading or writing."""
         logger.info('Lock resource:', extra={'resource_key': resource_key})
         resource_lock = ResourceLockingSchema(resource_key=resource_key, operation=operation)
-        async with httpx.AsyncClient() as client:
-            response = await client.post(self.DATAOPS_LOCK_URL, json=dict(resource_lock))
+        response = await get_http_client(Upstream.DATA_OPS).post(self.DATAOPS_LOCK_URL, json=dict(resource_lock))
         try:
             response.raise_for_status()
         except httpx.HTTPStatusError as exc:
@@ -44,8 +118,9 @@ class LockingManager:
         """Unlock specified resource for reading or writing."""
         logger.info('Unlock resource:', extra={'resource_key': resource_key})
         resource_unlock = ResourceLockingSchema(resource_key=resource_key, operation=operation)
-        async with httpx.AsyncClient() as client:
-            response = await client.request(url=self.DATAOPS_LOCK_URL, json=dict(resource_unlock), method='DELETE')
+        response = await get_http_client(Upstream.DATA_OPS).request(
+            url=self.DATAOPS_LOCK_URL, json=dict(resource_unlock), method='DELETE'
+        )
         try:
             response.raise_for_status()
         except httpx.HTTPStatusError as exc:
@@ -54,6 +129,91 @@ class LockingManager:
                 raise HTTPException(status_code=exc.response.status_code, detail=exc.response.json()) from exc
             raise exc
 
+    def check_leases(self) -> None:
+        """Raise LockLeaseLost when held locks expired, locks of the lock service do not expire."""
+
+    async def unlock_resources(self, locked_node: list[tuple[str, str]]) -> None:
+        """Unlock resources concurrently, the first error is raised once all unlocks are attempted."""
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def unlock(resource_key: str, operation: str) -> None:
+            async with semaphore:
+                await self.unlock_resource(resource_key, operation)
+
+        results = await asyncio.gather(
+            *[unlock(resource_key, operation) for resource_key, operation in locked_node], return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
+
+    def _get_prefix_locks(self, resource_key: str, operation: str) -> dict[str, str]:
+        """Return the lock of resource key together with shared locks of its ancestor folders."""
+
+        bucket, _, path = resource_key.partition('/')
+        parts = path.split('/')
+        locks = {f'{bucket}/{"/".join(parts[:index])}': 'read' for index in range(1, len(parts))}
+        locks[resource_key] = operation
+        return locks
+
+    def _get_file_location(self, ff_object: dict[str, Any]) -> tuple[str, str]:
+        """Return bucket and path of the file to lock.
+
+        Object keys in the id layout do not follow folders, so files are locked by their display path instead, the
+        same key the file has in the path layout.
+        """
+
+        minio_path = ff_object['storage']['location_uri'].split('//')[-1]
+        _, bucket, minio_obj_path = tuple(minio_path.split('/', 2))
+        if minio_obj_path.startswith(f'{settings.DATASET_OBJECT_FOLDER}/'):
+            minio_obj_path = f'{settings.DATASET_FILE_FOLDER}/{FileCRUD.get_item_path(ff_object)}'
+        return bucket, minio_obj_path
+
+    def _request_lock(self, requested: dict[str, str], resource_key: str, operation: str) -> None:
+        """Add resource to requested locks, write lock wins when the resource is requested twice."""
+
+        requested[resource_key] = 'write' if 'write' in (requested.get(resource_key), operation) else 'read'
+
+    async def _lock_node(
+        self,
+        requested: dict[str, str],
+        locked_node: list[tuple[str, str]],
+        resource_key: str,
+        operation: str,
+        is_folder: bool,
+    ) -> bool:
+        """Lock resource right away or, in the prefix lock mode, request it to be locked by _lock_requested.
+
+        Return whether the lock covers descendants of the folder, so the folder does not have to be walked.
+        """
+
+        if not self.prefix_locks:
+            await self.lock_resource(resource_key, operation)
+            locked_node.append((resource_key, operation))
+            return False
+
+        for key, mode in self._get_prefix_locks(resource_key, operation).items():
+            self._request_lock(requested, key, mode)
+        return is_folder and operation == 'write'
+
+    async def _lock_requested(self, requested: dict[str, str], locked_node: list[tuple[str, str]]) -> None:
+        """Lock requested resources concurrently, the first error is raised once all locks are attempted."""
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def lock(resource_key: str, operation: str) -> None:
+            async with semaphore:
+                await self.lock_resource(resource_key, operation)
+            locked_node.append((resource_key, operation))
+
+        results = await asyncio.gather(
+            *[lock(resource_key, operation) for resource_key, operation in requested.items()], return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
+
     async def recursive_lock_import(  # noqa: C901
         self, dataset_code, nodes, root_path
     ) -> tuple[list[Any], Exception | None]:
@@ -67,6 +227,7 @@ class LockingManager:
         # case will be copy the same node, if we unlock the whole tree in exception
         # then it will affect the processing one.
         locked_node, err = [], None
+        requested = {}
 
         async def recur_walker(current_nodes, current_root_path, new_name=None) -> None:
             """Recursively trace down the node tree and run the lock function."""
@@ -75,14 +236,15 @@ class LockingManager:
                 if ff_object['status'] == ItemStatusSchema.ARCHIVED.name:
                     continue
 
+                covered = False
+
                 # conner case here, we DONT lock the name folder
                 # for the copy we will lock the both source as read operation,
                 # and the target will be write operation
                 if ff_object.get('parent_path') != ff_object.get('owner'):
                     bucket, minio_obj_path = None, None
                     if ff_object.get('type').lower() == 'file':
-                        minio_path = ff_object.get('storage').get('location_uri').split('//')[-1]
-                        _, bucket, minio_obj_path = tuple(minio_path.split('/', 2))
+                        bucket, minio_obj_path = self._get_file_location(ff_object)
                     else:
                         bucket = 'core-' + ff_object.get('container_code')
                         parent_path = ff_object.get('parent_path')
@@ -96,11 +258,11 @@ class LockingManager:
                             minio_obj_path = f'{ff_object.get("name")}'
                     # source is from project
                     source_key = f'{bucket}/{minio_obj_path}'
-                    await self.lock_resource(source_key, 'read')
-                    locked_node.append((source_key, 'read'))
+                    is_folder = ff_object.get('type').lower() == 'folder'
+                    covered = await self._lock_node(requested, locked_node, source_key, 'read', is_folder)
 
-                # open the next recursive loop if it is folder
-                if ff_object.get('type').lower() == 'folder':
+                # open the next recursive loop if it is folder, unless it is covered by the prefix lock
+                if ff_object.get('type').lower() == 'folder' and not covered:
                     if new_name:
                         filename = new_name
                     else:
@@ -120,6 +282,7 @@ class LockingManager:
         # start here
         try:
             await recur_walker(nodes, root_path)
+            await self._lock_requested(requested, locked_node)
         except Exception as e:
             err = e
 
@@ -132,6 +295,7 @@ class LockingManager:
         # case will be copy the same node, if we unlock the whole tree in exception
         # then it will affect the processing one.
         locked_node, err = [], None
+        requested = {}
 
         async def recur_walker(current_nodes) -> None:
             """Recursively trace down the node tree and run the lock function."""
@@ -140,14 +304,15 @@ class LockingManager:
                 if ff_object['status'] == ItemStatusSchema.ARCHIVED.name:
                     continue
 
+                covered = False
+
                 # conner case here, we DONT lock the name folder
                 # for the copy we will lock the both source as read operation,
                 # and the target will be write operation
                 if ff_object.get('parent_path') != ff_object.get('owner'):
                     bucket, minio_obj_path = None, None
                     if ff_object.get('type').lower() == 'file':
-                        minio_path = ff_object.get('storage').get('location_uri').split('//')[-1]
-                        _, bucket, minio_obj_path = tuple(minio_path.split('/', 2))
+                        bucket, minio_obj_path = self._get_file_location(ff_object)
                     else:
                         bucket = ff_object.get('container_code')
                         parent_path = ff_object.get('parent_path')
@@ -162,11 +327,11 @@ class LockingManager:
                             minio_obj_path += f'{ff_object.get("name")}'
 
                     source_key = f'{bucket}/{minio_obj_path}'
-                    await self.lock_resource(source_key, 'write')
-                    locked_node.append((source_key, 'write'))
+                    is_folder = ff_object.get('type').lower() == 'folder'
+                    covered = await self._lock_node(requested, locked_node, source_key, 'write', is_folder)
 
-                # open the next recursive loop if it is folder
-                if ff_object.get('type').lower() == 'folder':
+                # open the next recursive loop if it is folder, unless it is covered by the prefix lock
+                if ff_object.get('type').lower() == 'folder' and not covered:
                     children_nodes = await self.folder_crud.get_children(
                         ff_object['container_code'], ff_object.get('id', None)
                     )
@@ -177,6 +342,7 @@ class LockingManager:
         # start here
         try:
             await recur_walker(nodes)
+            await self._lock_requested(requested, locked_node)
         except Exception as e:
             err = e
 
@@ -191,6 +357,7 @@ class LockingManager:
         # case will be copy the same node, if we unlock the whole tree in exception
         # then it will affect the processing one.
         locked_node, err = [], None
+        requested = {}
 
         # TODO lock
         async def recur_walker(current_nodes, current_root_path, new_name=None) -> None:
@@ -200,14 +367,15 @@ class LockingManager:
                 if ff_object['status'] == ItemStatusSchema.ARCHIVED.name:
                     continue
 
+                covered = False
+
                 # conner case here, we DONT lock the name folder
                 # for the copy we will lock the both source as read operation,
                 # and the target will be write operation
                 if ff_object.get('parent_path') != ff_object.get('owner'):
                     bucket, minio_obj_path = None, None
                     if ff_object.get('type').lower() == 'file':
-                        minio_path = ff_object.get('storage').get('location_uri').split('//')[-1]
-                        _, bucket, minio_obj_path = tuple(minio_path.split('/', 2))
+                        bucket, minio_obj_path = self._get_file_location(ff_object)
                     else:
                         bucket = ff_object.get('container_code')
                         if ff_object['parent_path']:
@@ -216,8 +384,8 @@ class LockingManager:
                         else:
                             minio_obj_path = f'{settings.DATASET_FILE_FOLDER}/{ff_object.get("name")}'
                     source_key = f'{bucket}/{minio_obj_path}'
-                    await self.lock_resource(source_key, 'write')
-                    locked_node.append((source_key, 'write'))
+                    is_folder = ff_object.get('type').lower() == 'folder'
+                    covered = await self._lock_node(requested, locked_node, source_key, 'write', is_folder)
 
                     if current_root_path == settings.DATASET_FILE_FOLDER:
                         target_key = f'{bucket}/{current_root_path}/{new_name if new_name else ff_object.get("name")}'
@@ -226,11 +394,10 @@ class LockingManager:
                             f'{bucket}/{settings.DATASET_FILE_FOLDER}/{current_root_path}/'
                             f'{new_name if new_name else ff_object.get("name")}'
                         )
-                    await self.lock_resource(target_key, 'write')
-                    locked_node.append((target_key, 'write'))
+                    await self._lock_node(requested, locked_node, target_key, 'write', is_folder)
 
-                # open the next recursive loop if it is folder
-                if ff_object.get('type').lower() == 'folder':
+                # open the next recursive loop if it is folder, unless it is covered by the prefix lock
+                if ff_object.get('type').lower() == 'folder' and not covered:
                     if new_name:
                         filename = new_name
                     else:
@@ -250,6 +417,7 @@ class LockingManager:
         # start here
         try:
             await recur_walker(nodes, root_path, new_name)
+            await self._lock_requested(requested, locked_node)
         except Exception as e:
             err = e
 
@@ -263,6 +431,7 @@ class LockingManager:
         # case will be copy the same node, if we unlock the whole tree in exception
         # then it will affect the processing one.
         locked_node, err = [], None
+        requested = {}
 
         async def recur_walker(current_nodes) -> None:
             """Recursively trace down the node tree and run the lock function."""
@@ -271,24 +440,25 @@ class LockingManager:
                 if ff_object['status'] == ItemStatusSchema.ARCHIVED.name:
                     continue
 
+                covered = False
+
                 # conner case here, we DONT lock the name folder
                 # for the copy we will lock the both source as read operation,
                 # and the target will be write operation
                 if ff_object.get('parent_path') != ff_object.get('owner'):
                     bucket, minio_obj_path = None, None
                     if ff_object.get('type').lower() == 'file':
-                        minio_path = ff_object.get('storage').get('location_uri').split('//')[-1]
-                        _, bucket, minio_obj_path = tuple(minio_path.split('/', 2))
+                        bucket, minio_obj_path = self._get_file_location(ff_object)
                     else:
                         bucket = ff_object.get('container_code')
                         minio_obj_path = f'{settings.DATASET_FILE_FOLDER}/{ff_object.get("name")}'
 
                     source_key = f'{bucket}/{minio_obj_path}'
-                    await self.lock_resource(source_key, 'read')
-                    locked_node.append((source_key, 'read'))
+                    is_folder = ff_object.get('type').lower() == 'folder'
+                    covered = await self._lock_node(requested, locked_node, source_key, 'read', is_folder)
 
-                # open the next recursive loop if it is folder
-                if ff_object.get('type').lower() == 'folder':
+                # open the next recursive loop if it is folder, unless it is covered by the prefix lock
+                if ff_object.get('type').lower() == 'folder' and not covered:
                     # next_root = current_root_path+"/"+(new_name if new_name else ff_object.get("name"))
                     children_nodes = await self.folder_crud.get_children(
                         ff_object['container_code'], ff_object.get('id', None)
@@ -300,7 +470,157 @@ class LockingManager:
         # start here
         try:
             await recur_walker(nodes)
+            await self._lock_requested(requested, locked_node)
         except Exception as e:
             err = e
 
         return locked_node, err
+
+
+class RedisLockingManager(LockingManager):
+    """Manages resource locking in Redis, a whole batch of locks is acquired or released atomically.
+
+    Every lock key is a sorted set of "<operation>:<owner>" holders scored by the lease expiry. Acquire takes either
+    all requested locks or none of them. Leases of held locks are renewed in the background and expire on their own
+    when the worker crashes. Once a lease is lost, or was not renewed in time, check_leases raises so the operation
+    stops writing.
+
+    Lock keys share the prefix as a hash tag, so the scripts touching many keys run on a single Redis Cluster slot.
+    """
+
+    def __init__(
+        self,
+        folder_crud: FolderCRUD,
+        redis_client: Redis,
+        mode: str = settings.FILE_OPERATION_LOCK_MODE,
+        prefix: str = settings.FILE_OPERATION_LOCK_REDIS_PREFIX,
+        ttl: int = settings.FILE_OPERATION_LOCK_TTL,
+    ) -> None:
+        super().__init__(folder_crud, mode)
+        self.redis_client = redis_client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.owner = uuid4().hex
+        self.held: set[tuple[str, str]] = set()
+        self.lease_deadline: float | None = None
+        self.leases_lost = False
+        self.renew_task: asyncio.Task | None = None
+        self.acquire_script = redis_client.register_script(ACQUIRE_SCRIPT)
+        self.renew_script = redis_client.register_script(RENEW_SCRIPT)
+        self.release_script = redis_client.register_script(RELEASE_SCRIPT)
+
+    def _get_lock_key(self, resource_key: str) -> str:
+        return f'{{{self.prefix}}}:{resource_key}'
+
+    async def _renew(self) -> None:
+        """Extend leases of held locks until all of them are released."""
+
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            held = list(self.held)
+            renewed_at = loop.time()
+            try:
+                lost = await self.renew_script(
+                    keys=[self._get_lock_key(resource_key) for resource_key, _ in held],
+                    args=[self.owner, self.ttl * 1000, *[operation for _, operation in held]],
+                )
+                if lost:
+                    logger.error(f'{lost} lock lease(s) expired before renewal')
+                    self.leases_lost = True
+                else:
+                    self.lease_deadline = renewed_at + self.ttl
+            except Exception:
+                logger.exception('Unable to renew lock leases')
+
+    def check_leases(self) -> None:
+        """Raise LockLeaseLost when a lease of held locks was lost or was not renewed before it expired."""
+
+        if self.leases_lost:
+            raise LockLeaseLost()
+        if self.lease_deadline is not None and asyncio.get_running_loop().time() >= self.lease_deadline:
+            raise LockLeaseLost()
+
+    async def _acquire(self, locks: dict[str, str]) -> None:
+        """Acquire all locks or none of them."""
+
+        if not locks:
+            return
+
+        resource_keys = list(locks)
+        acquired_at = asyncio.get_running_loop().time()
+        result = await self.acquire_script(
+            keys=[self._get_lock_key(resource_key) for resource_key in resource_keys],
+            args=[self.owner, self.ttl * 1000, *locks.values()],
+        )
+        if result < 0:
+            resource_key = resource_keys[-result - 1]
+            logger.warning(f'resource {resource_key} already in use')
+            raise ResourceLocked(resource_key)
+
+        self.held.update(locks.items())
+        if self.lease_deadline is None:
+            self.lease_deadline = acquired_at + self.ttl
+        if self.renew_task is None:
+            self.renew_task = asyncio.create_task(self._renew())
+        logger.info(f'Locked {len(locks)} resource(s)')
+
+    async def _release(self, locks: list[tuple[str, str]]) -> None:
+        if not locks:
+            return
+
+        await self.release_script(
+            keys=[self._get_lock_key(resource_key) for resource_key, _ in locks],
+            args=[self.owner, *[operation for _, operation in locks]],
+        )
+        self.held.difference_update(locks)
+        if not self.held:
+            self.lease_deadline = None
+            self.leases_lost = False
+            if self.renew_task is not None:
+                self.renew_task.cancel()
+                self.renew_task = None
+        logger.info(f'Unlocked {len(locks)} resource(s)')
+
+    async def lock_resource(self, resource_key: str, operation: str) -> None:
+        """Lock specified resource for reading or writing."""
+        await self._acquire({resource_key: operation})
+
+    async def unlock_resource(self, resource_key: str, operation: str) -> None:
+        """Unlock specified resource for reading or writing."""
+        await self._release([(resource_key, operation)])
+
+    async def unlock_resources(self, locked_node: list[tuple[str, str]]) -> None:
+        """Unlock all resources with a single call."""
+
+        await self._release(locked_node)
+
+    async def _lock_node(
+        self,
+        requested: dict[str, str],
+        locked_node: list[tuple[str, str]],
+        resource_key: str,
+        operation: str,
+        is_folder: bool,
+    ) -> bool:
+        """Request resource to be locked together with the rest of the tree by _lock_requested."""
+
+        if self.prefix_locks:
+            return await super()._lock_node(requested, locked_node, resource_key, operation, is_folder)
+
+        self._request_lock(requested, resource_key, operation)
+        return False
+
+    async def _lock_requested(self, requested: dict[str, str], locked_node: list[tuple[str, str]]) -> None:
+        """Lock requested resources atomically."""
+
+        await self._acquire(requested)
+        locked_node.extend(requested.items())
+
+
+def create_locking_manager(folder_crud: FolderCRUD, redis_client: Redis) -> LockingManager:
+    """Return LockingManager instance of the configured backend."""
+
+    if settings.FILE_OPERATION_LOCK_BACKEND == 'redis':
+        return RedisLockingManager(folder_crud, redis_client)
+    return LockingManager(folder_crud)
@@ -0,0 +1,188 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import csv
+from collections.abc import AsyncIterator
+from io import StringIO
+from typing import Any
+
+from aiobotocore.response import StreamingBody
+
+from dataset.config import get_settings
+
+settings = get_settings()
+
+SNIFF_DELIMITERS = [',', '|', ';', '\t']
+SNIFF_SAMPLE_SIZE = 1024
+
+csv.field_size_limit(settings.MAX_PREVIEW_SIZE)
+
+
+def sniff_dialect(sample: str) -> dict[str, Any]:
+    """Detect csv format from the sample and return it as reader parameters."""
+
+    try:
+        dialect = csv.Sniffer().sniff(sample, SNIFF_DELIMITERS)
+    except csv.Error:
+        dialect = csv.excel
+    return {
+        'delimiter': dialect.delimiter,
+        'quotechar': dialect.quotechar or '"',
+        'doublequote': dialect.doublequote,
+        'skipinitialspace': dialect.skipinitialspace,
+    }
+
+
+class RowSplitter:
+    """Split csv bytes fed in chunks into raw rows on line breaks that are not inside quoted fields.
+
+    Rows are returned together with their absolute byte offset, which is counted from the given start position.
+    """
+
+    def __init__(self, quotechar: str = '"', position: int = 0) -> None:
+        self.quotechar = quotechar.encode()
+        self.position = position
+        self.buffer = bytearray()
+        self.scanned = 0
+        self.in_quotes = False
+
+    def feed(self, chunk: bytes) -> list[tuple[int, bytes]]:
+        """Return rows completed by the chunk."""
+
+        self.buffer += chunk
+        rows = []
+        start = 0
+        position = self.scanned
+        while True:
+            newline = self.buffer.find(b'\n', position)
+            if newline == -1:
+                if self.buffer.count(self.quotechar, position) % 2:
+                    self.in_quotes = not self.in_quotes
+                break
+
+            if self.buffer.count(self.quotechar, position, newline) % 2:
+                self.in_quotes = not self.in_quotes
+            position = newline + 1
+            if not self.in_quotes:
+                rows.append((self.position + start, bytes(self.buffer[start:position])))
+                start = position
+
+        del self.buffer[:start]
+        self.position += start
+        self.scanned = len(self.buffer)
+        return rows
+
+    def finish(self) -> list[tuple[int, bytes]]:
+        """Return the last row when it does not end with a line break."""
+
+        if not self.buffer:
+            return []
+
+        row = (self.position, bytes(self.buffer))
+        self.position += len(self.buffer)
+        self.buffer = bytearray()
+        self.scanned = 0
+        return [row]
+
+
+def decode_rows(rows: list[bytes], dialect: dict[str, Any]) -> list[list[str]]:
+    """Parse raw rows with the detected csv format."""
+
+    return list(csv.reader((row.decode(errors='replace') for row in rows), **dialect))
+
+
+class CSVNormalizer:
+    """Incremental converter of csv bytes in the detected format into comma separated rows.
+
+    Output is produced only for complete rows, so memory use is bounded by the chunk size and the longest row instead
+    of the size of the file. With a limit, output stops before the first row that would exceed it.
+    """
+
+    def __init__(self, limit: int | None = None, sample_size: int = SNIFF_SAMPLE_SIZE) -> None:
+        self.limit = limit
+        self.sample_size = sample_size
+        self.sample = bytearray()
+        self.dialect: dict[str, Any] | None = None
+        self.splitter: RowSplitter | None = None
+        self.output = StringIO()
+        self.writer = csv.writer(self.output, delimiter=',')
+        self.size = 0
+        self.done = False
+
+    def _start(self) -> str:
+        """Detect csv format from the collected sample and process it."""
+
+        self.dialect = sniff_dialect(self.sample[: self.sample_size].decode(errors='ignore'))
+        self.splitter = RowSplitter(self.dialect['quotechar'])
+        sample, self.sample = bytes(self.sample), bytearray()
+        return self.feed(sample)
+
+    def _write_rows(self, rows: list[tuple[int, bytes]]) -> str:
+        if self.done or not rows:
+            return ''
+
+        self.output.seek(0)
+        self.output.truncate()
+        try:
+            for row in decode_rows([row for _, row in rows], self.dialect):
+                position = self.output.tell()
+                self.writer.writerow(row)
+                if self.limit is not None and self.size + self.output.tell() > self.limit:
+                    self.output.truncate(position)
+                    self.done = True
+                    break
+        except csv.Error:
+            self.done = True
+
+        content = self.output.getvalue()
+        self.size += len(content)
+        return content
+
+    def feed(self, chunk: bytes) -> str:
+        """Return normalized rows completed by the chunk."""
+
+        if self.done:
+            return ''
+
+        if self.dialect is None:
+            self.sample += chunk
+            if len(self.sample) < self.sample_size:
+                return ''
+            return self._start()
+
+        content = self._write_rows(self.splitter.feed(chunk))
+        if self.limit is not None and len(self.splitter.buffer) > self.limit:
+            self.done = True
+        return content
+
+    def finish(self, truncated: bool = False) -> str:
+        """Return the rest of normalized rows, the last row without a line break is skipped for truncated input."""
+
+        content = self._start() if self.dialect is None else ''
+        if truncated:
+            return content
+        return content + self._write_rows(self.splitter.finish())
+
+
+async def normalize_csv(
+    body: StreamingBody,
+    normalizer: CSVNormalizer,
+    chunk_size: int = settings.PREVIEW_CHUNK_SIZE,
+    truncated: bool = False,
+) -> AsyncIterator[str]:
+    """Yield normalized csv read from S3 object body in chunks, the body is closed as soon as the limit is reached.
+
+    The last row without a line break is skipped for truncated body, for example for a range of the object.
+    """
+
+    async with body:
+        while not normalizer.done:
+            chunk = await body.read(chunk_size)
+            content = normalizer.feed(chunk) if chunk else normalizer.finish(truncated)
+            if content:
+                yield content
+            if not chunk:
+                break
@@ -4,11 +4,13 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from datetime import datetime
 from enum import Enum
 from typing import Any
 
 from aiobotocore.response import StreamingBody
 
+from dataset.components.dataset.models import StorageLayout
 from dataset.components.schemas import BaseSchema
 
 
@@ -20,6 +22,18 @@ class FileSchema(BaseSchema):
     size: int
 
 
+class FileStatSchema(BaseSchema):
+    """Schema for file object location and validators."""
+
+    bucket: str
+    path: str
+    type: str
+    size: int
+    etag: str
+    last_modified: datetime
+    version: str | None = None
+
+
 class FileStreamSchema(FileSchema):
     """Schema for file stream."""
 
@@ -59,6 +73,12 @@ class DatasetFileRename(BaseSchema):
     operator: str
 
 
+class DatasetStorageLayoutMigrate(BaseSchema):
+    """The post request payload for dataset to move files to the id storage layout."""
+
+    operator: str
+
+
 class FileOperationResponse(BaseSchema):
     """Schema for file operation response."""
 
@@ -72,6 +92,19 @@ class LegacyFileResponse(BaseSchema):
     result: FileOperationResponse
 
 
+class StorageLayoutSchema(BaseSchema):
+    """Schema for storage layout of dataset files."""
+
+    storage_layout: StorageLayout
+    migrating: bool
+
+
+class LegacyStorageLayoutResponse(BaseSchema):
+    """Legacy schema for storage layout migration response."""
+
+    result: StorageLayoutSchema
+
+
 class LegacyFileListResponse(BaseSchema):
     """Legacy schema for single file response."""
 
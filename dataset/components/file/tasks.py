@@ -4,23 +4,29 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import asyncio
 from typing import Any
 
 from fastapi import Depends
 
 from dataset.components.dataset.crud import DatasetCRUD
 from dataset.components.dataset.models import Dataset
+from dataset.components.dataset.models import StorageLayout
 from dataset.components.file.activity_log import FileActivityLogService
 from dataset.components.file.activity_log import get_file_activity_log_service
 from dataset.components.file.crud import FileCRUD
 from dataset.components.file.dependencies import get_file_crud
 from dataset.components.file.dependencies import get_locking_manager
+from dataset.components.file.executor import FileOperationExecutor
 from dataset.components.file.locks import LockingManager
 from dataset.components.file.schemas import ItemStatusSchema
 from dataset.components.file.types import EActionType
 from dataset.components.file.types import EFileStatus
 from dataset.components.folder.crud import FolderCRUD
 from dataset.components.folder.dependencies import get_folder_crud
+from dataset.components.object_storage.batch import DeleteObjectsBatcher
+from dataset.components.preview.derivatives import PreviewDerivatives
+from dataset.components.preview.derivatives import get_preview_derivatives
 from dataset.components.request.network import Network
 from dataset.components.schemas import BaseSchema
 from dataset.config import get_settings
@@ -40,69 +46,97 @@ class FileOperationTasks:
         locking_manager: LockingManager = Depends(get_locking_manager),
         task_stream_service: TaskStreamService = Depends(),
         file_act_notifier: FileActivityLogService = Depends(get_file_activity_log_service),
+        preview_derivatives: PreviewDerivatives = Depends(get_preview_derivatives),
     ):
         self.file_crud = file_crud
         self.folder_crud = folder_crud
         self.locking_manager = locking_manager
         self.task_stream_service = task_stream_service
         self.file_act_notifier = file_act_notifier
+        self.preview_derivatives = preview_derivatives
 
-    async def recursive_copy(
+    async def _set_job_status(
+        self,
+        executor: FileOperationExecutor,
+        job_tracker: dict[str, Any] | None,
+        ff_object: dict[str, Any],
+        status: EFileStatus,
+        dataset: Dataset,
+    ) -> None:
+        """Update task stream status of a top level item when the operation is tracked."""
+
+        if not job_tracker:
+            return
+
+        job_id = job_tracker['job_id'].get(ff_object.get('id'))
+        await executor.run(
+            self.task_stream_service.update_job_status,
+            job_tracker['session_id'],
+            ff_object,
+            job_tracker['action'],
+            status.name,
+            dataset.code,
+            job_id,
+        )
+
+    async def _copy_nodes(
         self,
         current_nodes: list[dict[str, Any]],
         dataset: Dataset,
         oper: str,
         current_root_path: str,
         parent_node: dict[str, Any],
-        job_tracker: dict[str, Any] = None,
-        new_name: str = None,
-    ) -> tuple[int, int, list[dict[str, Any]]]:
-        """Recursively adds all children from a specific parent to a dataset."""
+        job_tracker: dict[str, Any] | None,
+        new_name: str | None,
+        executor: FileOperationExecutor,
+    ) -> list[tuple[int, int, dict[str, Any] | None, bool]]:
+        """Copy sibling nodes concurrently and return per node totals, new node and failure flag."""
+
+        active_nodes = [node for node in current_nodes if node['status'] != ItemStatusSchema.ARCHIVED.name]
+        return await asyncio.gather(
+            *[
+                self._copy_node(node, dataset, oper, current_root_path, parent_node, job_tracker, new_name, executor)
+                for node in active_nodes
+            ]
+        )
+
+    async def _copy_node(
+        self,
+        ff_object: dict[str, Any],
+        dataset: Dataset,
+        oper: str,
+        current_root_path: str,
+        parent_node: dict[str, Any],
+        job_tracker: dict[str, Any] | None,
+        new_name: str | None,
+        executor: FileOperationExecutor,
+    ) -> tuple[int, int, dict[str, Any] | None, bool]:
+        """Copy one file or folder; folder is created before any of its children."""
 
         num_of_files = 0
         total_file_size = 0
-        new_lv1_nodes = []
-
-        for ff_object in current_nodes:
-            ff_geid = ff_object.get('id')
-
-            if ff_object['status'] == ItemStatusSchema.ARCHIVED.name:
-                continue
+        new_node = None
+        failed = False
 
-            if job_tracker:
-                job_id = job_tracker['job_id'].get(ff_geid)
-                await self.task_stream_service.update_job_status(
-                    job_tracker['session_id'],
-                    ff_object,
-                    job_tracker['action'],
-                    EFileStatus.RUNNING.name,
-                    dataset.code,
-                    job_id,
-                )
+        try:
+            await self._set_job_status(executor, job_tracker, ff_object, EFileStatus.RUNNING, dataset)
 
             if ff_object.get('type').lower() == 'file':
-                new_node = await self.file_crud.create(
-                    dataset,
-                    ff_object,
-                    oper,
-                    parent_node,
-                    new_name,
-                )
+                new_node = await executor.run(self.file_crud.create, dataset, ff_object, oper, parent_node, new_name)
+                await self.preview_derivatives.submit(new_node)
                 num_of_files += 1
                 total_file_size += ff_object.get('size', 0)
-                new_lv1_nodes.append(new_node)
 
             elif ff_object.get('type').lower() == 'folder':
-                folder_name = new_name if new_name else ff_object.get('name')
-                new_node = await self.folder_crud.import_folder(
-                    parent_node.get('id'), current_root_path, oper, folder_name, dataset.code
+                filename = new_name if new_name else ff_object.get('name')
+                new_node = await executor.run(
+                    self.folder_crud.import_folder,
+                    parent_node.get('id'),
+                    current_root_path,
+                    oper,
+                    filename,
+                    dataset.code,
                 )
-                new_lv1_nodes.append(new_node)
-
-                if new_name:
-                    filename = new_name
-                else:
-                    filename = ff_object.get('name')
 
                 if not current_root_path:
                     next_root_path = filename
@@ -111,52 +145,89 @@ class FileOperationTasks:
                 children_nodes = await self.folder_crud.get_children(
                     ff_object['container_code'], ff_object.get('id', None), ff_object['container_type']
                 )
-                num_of_child_files, num_of_child_size, _ = await self.recursive_copy(
-                    children_nodes, dataset, oper, next_root_path, new_node
+                results = await self._copy_nodes(
+                    children_nodes, dataset, oper, next_root_path, new_node, None, None, executor
                 )
 
-                num_of_files += num_of_child_files
-                total_file_size += num_of_child_size
+                num_of_files += sum(result[0] for result in results)
+                total_file_size += sum(result[1] for result in results)
+                failed = any(result[3] for result in results)
+        except Exception as e:
+            executor.add_failure(ff_object, e)
+            failed = True
 
-            if job_tracker:
-                job_id = job_tracker['job_id'].get(ff_geid)
-                await self.task_stream_service.update_job_status(
-                    job_tracker['session_id'],
-                    ff_object,
-                    job_tracker['action'],
-                    EFileStatus.SUCCEED.name,
-                    dataset.code,
-                    job_id,
-                )
+        status = EFileStatus.FAILED if failed else EFileStatus.SUCCEED
+        await self._set_job_status(executor, job_tracker, ff_object, status, dataset)
+
+        return num_of_files, total_file_size, new_node, failed
+
+    async def recursive_copy(
+        self,
+        current_nodes: list[dict[str, Any]],
+        dataset: Dataset,
+        oper: str,
+        current_root_path: str,
+        parent_node: dict[str, Any],
+        job_tracker: dict[str, Any] = None,
+        new_name: str = None,
+        executor: FileOperationExecutor | None = None,
+    ) -> tuple[int, int, list[dict[str, Any]]]:
+        """Recursively adds all children from a specific parent to a dataset.
+
+        Items that fail are recorded in the executor failures, totals only include items copied successfully.
+        """
+
+        executor = executor or FileOperationExecutor()
+        results = await self._copy_nodes(
+            current_nodes, dataset, oper, current_root_path, parent_node, job_tracker, new_name, executor
+        )
+
+        num_of_files = sum(result[0] for result in results)
+        total_file_size = sum(result[1] for result in results)
+        new_lv1_nodes = [result[2] for result in results if result[2] is not None]
 
         return num_of_files, total_file_size, new_lv1_nodes
 
-    async def recursive_delete(
-        self, current_nodes: list[dict[str, Any]], dataset: Dataset, oper: str, job_tracker: dict[str, Any] = None
-    ) -> tuple[int, int]:
-        """Recursively deletes all children from a specific parent from a dataset."""
+    async def _delete_nodes(
+        self,
+        current_nodes: list[dict[str, Any]],
+        dataset: Dataset,
+        job_tracker: dict[str, Any] | None,
+        executor: FileOperationExecutor,
+        batcher: DeleteObjectsBatcher,
+    ) -> list[tuple[int, int, bool]]:
+        """Delete sibling nodes concurrently and return per node totals and failure flag."""
+
+        active_nodes = [node for node in current_nodes if node['status'] != ItemStatusSchema.ARCHIVED.name]
+        return await asyncio.gather(
+            *[self._delete_node(node, dataset, job_tracker, executor, batcher) for node in active_nodes]
+        )
+
+    async def _delete_node(
+        self,
+        ff_object: dict[str, Any],
+        dataset: Dataset,
+        job_tracker: dict[str, Any] | None,
+        executor: FileOperationExecutor,
+        batcher: DeleteObjectsBatcher,
+    ) -> tuple[int, int, bool]:
+        """Delete one file or folder; folder is removed only after all of its children are gone.
+
+        Objects of files and their preview derivatives are deleted in batches outside of the executor slots, so metadata
+        deletes of other files keep running while the batch fills up.
+        """
 
         num_of_files = 0
         total_file_size = 0
-        for ff_object in current_nodes:
-            ff_geid = ff_object.get('id')
+        failed = False
 
-            if ff_object['status'] == ItemStatusSchema.ARCHIVED.name:
-                continue
-
-            if job_tracker:
-                job_id = job_tracker['job_id'].get(ff_geid)
-                await self.task_stream_service.update_job_status(
-                    job_tracker['session_id'],
-                    ff_object,
-                    job_tracker['action'],
-                    EFileStatus.RUNNING.name,
-                    dataset.code,
-                    job_id,
-                )
+        try:
+            await self._set_job_status(executor, job_tracker, ff_object, EFileStatus.RUNNING, dataset)
 
             if ff_object.get('type').lower() == 'file':
-                await self.file_crud.delete(ff_object)
+                await executor.run(self.file_crud.metadata_service.delete_object, ff_object.get('id'))
+                await self.file_crud.delete_object(ff_object, batcher)
+                await self.preview_derivatives.delete(ff_object, batcher)
 
                 num_of_files += 1
                 total_file_size += ff_object.get('size', 0)
@@ -165,26 +236,140 @@ class FileOperationTasks:
                     ff_object.get('container_code'), ff_object.get('id')
                 )
                 logger.info('children to be deleted', extra={'children_nodes': children_nodes})
-                num_of_child_files, num_of_child_size = await self.recursive_delete(children_nodes, dataset, oper)
+                results = await self._delete_nodes(children_nodes, dataset, None, executor, batcher)
 
-                await self.file_crud.metadata_service.delete_object(ff_object.get('id'))
+                num_of_files += sum(result[0] for result in results)
+                total_file_size += sum(result[1] for result in results)
+                failed = any(result[2] for result in results)
 
-                num_of_files += num_of_child_files
-                total_file_size += num_of_child_size
+                if not failed:
+                    await executor.run(self.file_crud.metadata_service.delete_object, ff_object.get('id'))
+        except Exception as e:
+            executor.add_failure(ff_object, e)
+            failed = True
 
-            if job_tracker:
-                job_id = job_tracker['job_id'].get(ff_geid)
-                await self.task_stream_service.update_job_status(
-                    job_tracker['session_id'],
-                    ff_object,
-                    job_tracker['action'],
-                    EFileStatus.SUCCEED.name,
-                    dataset.code,
-                    job_id,
-                )
+        status = EFileStatus.FAILED if failed else EFileStatus.SUCCEED
+        await self._set_job_status(executor, job_tracker, ff_object, status, dataset)
+
+        return num_of_files, total_file_size, failed
+
+    async def recursive_delete(
+        self,
+        current_nodes: list[dict[str, Any]],
+        dataset: Dataset,
+        oper: str,
+        job_tracker: dict[str, Any] = None,
+        executor: FileOperationExecutor | None = None,
+    ) -> tuple[int, int]:
+        """Recursively deletes all children from a specific parent from a dataset.
+
+        Items that fail are recorded in the executor failures, totals only include items deleted successfully.
+        """
+
+        executor = executor or FileOperationExecutor()
+        batcher = DeleteObjectsBatcher(self.file_crud.s3_client)
+        results = await self._delete_nodes(current_nodes, dataset, job_tracker, executor, batcher)
+
+        num_of_files = sum(result[0] for result in results)
+        total_file_size = sum(result[1] for result in results)
 
         return num_of_files, total_file_size
 
+    async def _relocate_nodes(
+        self,
+        current_nodes: list[dict[str, Any]],
+        dataset: Dataset,
+        current_root_path: str | None,
+        parent_node: dict[str, Any],
+        job_tracker: dict[str, Any] | None,
+        new_name: str | None,
+        executor: FileOperationExecutor,
+    ) -> list[bool]:
+        """Relocate sibling nodes concurrently and return per node failure flag."""
+
+        active_nodes = [node for node in current_nodes if node['status'] != ItemStatusSchema.ARCHIVED.name]
+        return await asyncio.gather(
+            *[
+                self._relocate_node(node, dataset, current_root_path, parent_node, job_tracker, new_name, executor)
+                for node in active_nodes
+            ]
+        )
+
+    async def _relocate_node(
+        self,
+        ff_object: dict[str, Any],
+        dataset: Dataset,
+        current_root_path: str | None,
+        parent_node: dict[str, Any],
+        job_tracker: dict[str, Any] | None,
+        new_name: str | None,
+        executor: FileOperationExecutor,
+    ) -> bool:
+        """Relocate one file or folder; descendants of a folder only get their parent path updated."""
+
+        failed = False
+
+        try:
+            await self._set_job_status(executor, job_tracker, ff_object, EFileStatus.RUNNING, dataset)
+
+            new_node = await executor.run(self.file_crud.relocate, ff_object, parent_node, current_root_path, new_name)
+            if ff_object.get('type').lower() == 'folder':
+                next_root_path = self.file_crud.get_item_path(new_node)
+                children_nodes = await self.folder_crud.get_children(
+                    ff_object['container_code'], ff_object.get('id', None), ff_object['container_type']
+                )
+                results = await self._relocate_nodes(
+                    children_nodes, dataset, next_root_path, new_node, None, None, executor
+                )
+                failed = any(results)
+        except Exception as e:
+            executor.add_failure(ff_object, e)
+            failed = True
+
+        status = EFileStatus.FAILED if failed else EFileStatus.SUCCEED
+        await self._set_job_status(executor, job_tracker, ff_object, status, dataset)
+
+        return failed
+
+    async def recursive_relocate(
+        self,
+        current_nodes: list[dict[str, Any]],
+        dataset: Dataset,
+        current_root_path: str | None,
+        parent_node: dict[str, Any],
+        job_tracker: dict[str, Any] = None,
+        new_name: str = None,
+        executor: FileOperationExecutor | None = None,
+    ) -> None:
+        """Recursively moves nodes under a new parent or name in a dataset in the id layout.
+
+        Only metadata is updated, objects keep their keys. Items that fail are recorded in the executor failures.
+        """
+
+        executor = executor or FileOperationExecutor()
+        await self._relocate_nodes(
+            current_nodes, dataset, current_root_path, parent_node, job_tracker, new_name, executor
+        )
+
+    def _exclude_failed(self, items: list[dict[str, Any]], executor: FileOperationExecutor) -> list[dict[str, Any]]:
+        """Return items that were processed completely, folders are excluded when any item below them failed."""
+
+        failed_paths = [self.file_crud.get_item_path(item) for item in executor.failed_items]
+
+        def is_failed(item: dict[str, Any]) -> bool:
+            path = self.file_crud.get_item_path(item)
+            return any(failed == path or failed.startswith(f'{path}/') for failed in failed_paths)
+
+        return [item for item in items if not is_failed(item)]
+
+    async def _unlock_resources(self, locked_node: list[tuple[str, str]]) -> None:
+        """Unlock resources, errors are only logged so the final status of the operation is still flushed."""
+
+        try:
+            await self.locking_manager.unlock_resources(locked_node)
+        except Exception:
+            logger.exception('Error occurred while unlocking resources.')
+
     async def copy_files_worker(
         self,
         dataset_crud: DatasetCRUD,
@@ -194,11 +379,17 @@ class FileOperationTasks:
         project_code: str,
         session_id: str,
         network: Network,
-    ) -> None:
-        """Background task responsible to add list of files/folders from dataset."""
+    ) -> Exception | None:
+        """Background task responsible to add list of files/folders from dataset.
+
+        Return the error that failed the operation before anything was changed, so the job can be retried. Errors
+        raised later and failures of single items are only reported in the task stream.
+        """
 
         action = EActionType.data_import.name
         job_tracker = await self.task_stream_service.initialize_file_jobs(session_id, action, import_list, dataset.code)
+        executor = FileOperationExecutor(guard=self.locking_manager.check_leases)
+        locked_node, error, changed = [], None, False
 
         try:
             locked_node, err = await self.locking_manager.recursive_lock_import(
@@ -207,24 +398,23 @@ class FileOperationTasks:
 
             if err:
                 raise err
+            changed = True
             num_of_files, total_file_size, _ = await self.recursive_copy(
-                import_list, dataset, oper, None, {}, job_tracker
+                import_list, dataset, oper, None, {}, job_tracker, executor=executor
             )
 
             logger.info(f'dataset {dataset.code} total_files increase')
-            update_attribute = {
-                'total_files': dataset.total_files + num_of_files,
-                'size': dataset.size + total_file_size,
-            }
-            await dataset_crud.update(dataset.id, BaseSchema(), **update_attribute)
+            total_files, _ = await dataset_crud.increment_counters(dataset.id, num_of_files, total_file_size)
             await dataset_crud.commit()
-            logger.info(f'dataset {dataset.code}: {num_of_files} files added, old total {dataset.total_files}')
+            logger.info(f'dataset {dataset.code}: {num_of_files} files added, new total {total_files}')
 
             await self.file_act_notifier.send_on_import_event(
-                dataset.code, project_code, import_list, oper, network.origin
+                dataset.code, project_code, self._exclude_failed(import_list, executor), oper, network.origin
             )
         except Exception as e:
             logger.exception(f'{e}')
+            if not changed:
+                error = e
             for ff_object in import_list:
                 job_id = job_tracker['job_id'].get(ff_object.get('id'))
                 await self.task_stream_service.update_job_status(
@@ -236,9 +426,12 @@ class FileOperationTasks:
                     job_id,
                 )
         finally:
-            for resource_key, operation in locked_node:
-                await self.locking_manager.unlock_resource(resource_key, operation)
-        return
+            await self._unlock_resources(locked_node)
+            self.folder_crud.reset_trees()
+            await self.preview_derivatives.wait()
+            await self.task_stream_service.flush()
+
+        return error
 
     async def move_file_worker(  # noqa: C901
         self,
@@ -247,11 +440,17 @@ class FileOperationTasks:
         oper: str,
         target_folder: dict[str, Any],
         session_id: str,
-    ) -> None:
-        """Background task responsible to copy files/folders to new parents and remove from the old ones."""
+    ) -> Exception | None:
+        """Background task responsible to copy files/folders to new parents and remove from the old ones.
+
+        Return the error that failed the operation before anything was changed, so the job can be retried. Errors
+        raised later and failures of single items are only reported in the task stream.
+        """
 
         action = EActionType.data_transfer.name
         job_tracker = await self.task_stream_service.initialize_file_jobs(session_id, action, move_list, dataset.code)
+        executor = FileOperationExecutor(guard=self.locking_manager.check_leases)
+        locked_node, error, changed = [], None, False
         try:
             if not target_folder.get('id'):
                 target_folder = {}
@@ -268,13 +467,25 @@ class FileOperationTasks:
             locked_node, err = await self.locking_manager.recursive_lock_move_rename(move_list, target_folder_name)
             if err:
                 raise err
+            changed = True
 
-            await self.recursive_copy(move_list, dataset, oper, target_parent_path, target_folder)
-            await self.recursive_delete(move_list, dataset, oper, job_tracker=job_tracker)
+            if dataset.storage_layout == StorageLayout.ID:
+                await self.recursive_relocate(
+                    move_list, dataset, target_parent_path, target_folder, job_tracker, executor=executor
+                )
+            else:
+                await self.recursive_copy(
+                    move_list, dataset, oper, target_parent_path, target_folder, executor=executor
+                )
+                # never remove the sources when some of them were not copied
+                executor.raise_for_failures()
+                await self.recursive_delete(move_list, dataset, oper, job_tracker=job_tracker, executor=executor)
 
             dff = settings.DATASET_FILE_FOLDER
-            for ff_geid in move_list:
-                if ff_geid.get('type').lower() == 'file':
+            for ff_geid in self._exclude_failed(move_list, executor):
+                if ff_geid.get('type').lower() == 'file' and dataset.storage_layout == StorageLayout.ID:
+                    old_path = '/' + self.file_crud.get_item_path(ff_geid)
+                elif ff_geid.get('type').lower() == 'file':
                     minio_path = ff_geid.get('storage').get('location_uri').split('//')[-1]
                     _, _, old_path = tuple(minio_path.split('/', 2))
                     old_path = old_path.replace(dff, '', 1)
@@ -299,6 +510,8 @@ class FileOperationTasks:
 
         except Exception as e:
             logger.exception(f'{e}')
+            if not changed:
+                error = e
             for ff_object in move_list:
                 job_id = job_tracker['job_id'].get(ff_object.get('id'))
                 await self.task_stream_service.update_job_status(
@@ -310,10 +523,12 @@ class FileOperationTasks:
                     job_id,
                 )
         finally:
-            for resource_key, operation in locked_node:
-                await self.locking_manager.unlock_resource(resource_key, operation)
+            await self._unlock_resources(locked_node)
+            self.folder_crud.reset_trees()
+            await self.preview_derivatives.wait()
+            await self.task_stream_service.flush()
 
-        return
+        return error
 
     async def delete_files_work(
         self,
@@ -323,52 +538,36 @@ class FileOperationTasks:
         oper: str,
         session_id: str,
         network: Network,
-    ) -> None:
-        """Background task responsible to remove list of files/folders from dataset."""
-        deleted_files = []
+    ) -> Exception | None:
+        """Background task responsible to remove list of files/folders from dataset.
+
+        Return the error that failed the operation before anything was changed, so the job can be retried. Errors
+        raised later and failures of single items are only reported in the task stream.
+        """
         action = EActionType.data_delete.name
         job_tracker = await self.task_stream_service.initialize_file_jobs(session_id, action, delete_list, dataset.code)
+        executor = FileOperationExecutor(guard=self.locking_manager.check_leases)
+        locked_node, error, changed = [], None, False
         try:
             locked_node, err = await self.locking_manager.recursive_lock_delete(delete_list)
             if err:
                 raise err
-            num_of_files, total_file_size = await self.recursive_delete(delete_list, dataset, oper, job_tracker)
-
-            for ff_geid in delete_list:
-                if ff_geid.get('type').lower() == 'file':
-                    minio_path = ff_geid.get('storage').get('location_uri').split('//')[-1]
-                    _, _, obj_path = tuple(minio_path.split('/', 2))
-
-                    dff = settings.DATASET_FILE_FOLDER + '/'
-                    obj_path = obj_path[: len(dff)].replace(dff, '') + obj_path[len(dff) :]
-                    deleted_files.append(obj_path)
-
-                else:
-                    dff = settings.DATASET_FILE_FOLDER
-                    temp = ff_geid.get('parent_path')
-                    if not temp:
-                        temp = settings.DATASET_FILE_FOLDER
-
-                    frp = ''
-                    if dff != temp:
-                        dff = dff + '/'
-                        frp = temp.replace(dff, '', 1)
-                    deleted_files.append(frp + ff_geid.get('name'))
+            changed = True
+            num_of_files, total_file_size = await self.recursive_delete(
+                delete_list, dataset, oper, job_tracker, executor=executor
+            )
+            delete_list = self._exclude_failed(delete_list, executor)
 
             logger.info(f'dataset {dataset.code} total_files decreased')
-            total_files = dataset.total_files - num_of_files
-            total_size = dataset.size - total_file_size
-            update_attribute = {
-                'total_files': total_files if total_files > 0 else 0,
-                'size': total_size if total_size > 0 else 0,
-            }
-            await dataset_crud.update(dataset.id, BaseSchema(), **update_attribute)
+            total_files, _ = await dataset_crud.increment_counters(dataset.id, -num_of_files, -total_file_size)
             await dataset_crud.commit()
-            logger.info(f'dataset {dataset.code} : {num_of_files} files removed, old total {dataset.total_files}')
+            logger.info(f'dataset {dataset.code} : {num_of_files} files removed, new total {total_files}')
             await self.file_act_notifier.send_on_delete_event(dataset.code, delete_list, oper, network.origin)
 
         except Exception as e:
             logger.exception(f'{e}')
+            if not changed:
+                error = e
 
             for ff_object in delete_list:
                 job_id = job_tracker['job_id'].get(ff_object.get('id'))
@@ -381,18 +580,24 @@ class FileOperationTasks:
                     job_id,
                 )
         finally:
-            for resource_key, operation in locked_node:
-                await self.locking_manager.unlock_resource(resource_key, operation)
+            await self._unlock_resources(locked_node)
+            self.folder_crud.reset_trees()
+            await self.task_stream_service.flush()
 
-        return
+        return error
 
     async def rename_file_worker(
         self, old_file: dict[str, Any], new_name: str, dataset: Dataset, oper: str, session_id: str
-    ) -> None:
-        """Background task responsible to copy file/folder to with new name and remove the old one."""
+    ) -> Exception | None:
+        """Background task responsible to copy file/folder to with new name and remove the old one.
+
+        Return the error that failed the rename before anything was changed, so the job can be retried.
+        """
 
         action = EActionType.data_rename.name
         job_tracker = await self.task_stream_service.initialize_file_jobs(session_id, action, [old_file], dataset.code)
+        executor = FileOperationExecutor(guard=self.locking_manager.check_leases)
+        locked_node, error, changed = [], None, False
 
         job_id = job_tracker['job_id'].get(old_file.get('id'))
         await self.task_stream_service.update_job_status(
@@ -420,16 +625,31 @@ class FileOperationTasks:
             )
             if err:
                 raise err
-
-            await self.recursive_copy(
-                current_nodes=[old_file],
-                dataset=dataset,
-                oper=oper,
-                current_root_path=old_file.get('parent_path'),  # current root path can be None for top level
-                parent_node=parent_node,
-                new_name=new_name,
-            )
-            await self.recursive_delete(current_nodes=[old_file], dataset=dataset, oper=oper)
+            changed = True
+
+            if dataset.storage_layout == StorageLayout.ID:
+                await self.recursive_relocate(
+                    current_nodes=[old_file],
+                    dataset=dataset,
+                    current_root_path=old_file.get('parent_path'),
+                    parent_node=parent_node,
+                    new_name=new_name,
+                    executor=executor,
+                )
+            else:
+                await self.recursive_copy(
+                    current_nodes=[old_file],
+                    dataset=dataset,
+                    oper=oper,
+                    current_root_path=old_file.get('parent_path'),  # current root path can be None for top level
+                    parent_node=parent_node,
+                    new_name=new_name,
+                    executor=executor,
+                )
+                # never remove the source when it was not copied completely
+                executor.raise_for_failures()
+                await self.recursive_delete(current_nodes=[old_file], dataset=dataset, oper=oper, executor=executor)
+            executor.raise_for_failures()
 
             await self.task_stream_service.update_job_status(
                 job_tracker['session_id'],
@@ -443,6 +663,8 @@ class FileOperationTasks:
 
         except Exception as e:
             logger.exception(f'{e}')
+            if not changed:
+                error = e
 
             await self.task_stream_service.update_job_status(
                 job_tracker['session_id'],
@@ -453,7 +675,60 @@ class FileOperationTasks:
                 job_id,
             )
         finally:
-            for resource_key, operation in locked_node:
-                await self.locking_manager.unlock_resource(resource_key, operation)
+            await self._unlock_resources(locked_node)
+            self.folder_crud.reset_trees()
+            await self.preview_derivatives.wait()
+            await self.task_stream_service.flush()
+
+        return error
+
+    async def _migrate_file(self, file: dict[str, Any], executor: FileOperationExecutor) -> bool:
+        """Move object of one file to the id layout and return whether it was moved."""
+
+        try:
+            return await executor.run(self.file_crud.migrate_to_id_layout, file)
+        except Exception as e:
+            executor.add_failure(file, e)
+            return False
+
+    async def migrate_storage_layout_worker(
+        self, dataset_crud: DatasetCRUD, dataset: Dataset, oper: str, network: Network
+    ) -> Exception | None:
+        """Background task responsible to move objects of dataset files from the path layout to the id layout.
+
+        The dataset is switched to the id layout only after all files are moved, until then moves keep copying objects.
+        Files moved already are skipped, so a failed migration is resumed by running it again. Return the error that
+        failed the migration.
+        """
+
+        if dataset.storage_layout == StorageLayout.ID:
+            return None
+
+        executor = FileOperationExecutor(guard=self.locking_manager.check_leases)
+        locked_node, error = [], None
+        try:
+            root_nodes = await self.folder_crud.get_children(dataset.code, None)
+            locked_node, err = await self.locking_manager.recursive_lock_delete(root_nodes)
+            if err:
+                raise err
+
+            files = await self.file_crud.metadata_service.get_files(dataset.code)
+            results = await asyncio.gather(*[self._migrate_file(file, executor) for file in files])
+            logger.info(f'dataset {dataset.code}: {sum(results)} of {len(files)} files moved to the id layout')
+            await self.file_act_notifier.send_on_storage_layout_event(
+                dataset.code, [file for file, moved in zip(files, results) if moved], oper, network.origin
+            )
+            executor.raise_for_failures()
+
+            self.locking_manager.check_leases()
+            await dataset_crud.update(dataset.id, BaseSchema(), storage_layout=StorageLayout.ID)
+            await dataset_crud.commit()
+            logger.info(f'dataset {dataset.code} switched to the id layout')
+        except Exception as e:
+            logger.exception(f'{e}')
+            error = e
+        finally:
+            await self._unlock_resources(locked_node)
+            self.folder_crud.reset_trees()
 
-        return
+        return error
@@ -8,24 +8,29 @@ import copy
 from uuid import UUID
 
 from fastapi import APIRouter
-from fastapi import BackgroundTasks
 from fastapi import Depends
 from fastapi import Header
 
 from dataset.components.dataset.crud import DatasetCRUD
 from dataset.components.dataset.dependencies import get_dataset_crud
+from dataset.components.dataset.models import StorageLayout
 from dataset.components.exceptions import Forbidden
 from dataset.components.file.crud import FileCRUD
 from dataset.components.file.dependencies import get_file_crud
 from dataset.components.file.schemas import DatasetFileDelete
 from dataset.components.file.schemas import DatasetFileMove
 from dataset.components.file.schemas import DatasetFileRename
+from dataset.components.file.schemas import DatasetStorageLayoutMigrate
 from dataset.components.file.schemas import ImportDataPost
 from dataset.components.file.schemas import LegacyFileListResponse
 from dataset.components.file.schemas import LegacyFileResponse
+from dataset.components.file.schemas import LegacyStorageLayoutResponse
+from dataset.components.file.schemas import StorageLayoutSchema
 from dataset.components.file.tasks import FileOperationTasks
 from dataset.components.folder.crud import FolderCRUD
 from dataset.components.folder.dependencies import get_folder_crud
+from dataset.components.job.dispatcher import JobDispatcher
+from dataset.components.job.schemas import JobType
 from dataset.components.request.network import Network
 from dataset.components.version.views import get_network
 from dataset.dependencies.services import get_project_service
@@ -43,9 +48,9 @@ router = APIRouter(prefix='/dataset', tags=['Files'])
 async def import_dataset(
     dataset_id: UUID,
     request_payload: ImportDataPost,
-    background_tasks: BackgroundTasks,
     dataset_crud: DatasetCRUD = Depends(get_dataset_crud),
     file_taks: FileOperationTasks = Depends(),
+    job_dispatcher: JobDispatcher = Depends(),
     file_crud: FileCRUD = Depends(get_file_crud),
     project_service: ProjectService = Depends(get_project_service),
     Session_ID: str | None = Header(None),
@@ -74,7 +79,16 @@ async def import_dataset(
     logger.info('IMPORT FILES: duplicated removed.')
 
     if len(import_list) > 0:
-        background_tasks.add_task(
+        await job_dispatcher.dispatch(
+            JobType.IMPORT_FILES,
+            {
+                'dataset_id': str(dataset.id),
+                'import_list': import_list,
+                'operator': oper,
+                'project_code': project['code'],
+                'session_id': Session_ID,
+                'network': network.dict(),
+            },
             file_taks.copy_files_worker,
             dataset_crud,
             import_list,
@@ -95,9 +109,9 @@ async def import_dataset(
 async def delete_files(
     dataset_id: UUID,
     request_payload: DatasetFileDelete,
-    background_tasks: BackgroundTasks,
     dataset_crud: DatasetCRUD = Depends(get_dataset_crud),
     file_taks: FileOperationTasks = Depends(),
+    job_dispatcher: JobDispatcher = Depends(),
     file_crud: FileCRUD = Depends(get_file_crud),
     Session_ID: str | None = Header(None),
     network: Network = Depends(get_network),
@@ -109,7 +123,15 @@ async def delete_files(
     delete_list, wrong_file = await file_crud.validate_files_folders(delete_list, dataset_obj.code)
 
     if len(delete_list) > 0:
-        background_tasks.add_task(
+        await job_dispatcher.dispatch(
+            JobType.DELETE_FILES,
+            {
+                'dataset_id': str(dataset_obj.id),
+                'delete_list': delete_list,
+                'operator': request_payload.operator,
+                'session_id': Session_ID,
+                'network': network.dict(),
+            },
             file_taks.delete_files_work,
             dataset_crud,
             delete_list,
@@ -157,9 +179,9 @@ async def list_files(
 async def move_files(
     dataset_id: UUID,
     request_payload: DatasetFileMove,
-    background_tasks: BackgroundTasks,
     dataset_crud: DatasetCRUD = Depends(get_dataset_crud),
     file_taks: FileOperationTasks = Depends(),
+    job_dispatcher: JobDispatcher = Depends(),
     file_crud: FileCRUD = Depends(get_file_crud),
     Session_ID: str | None = Header(None),
 ) -> LegacyFileResponse:
@@ -197,7 +219,15 @@ async def move_files(
             final_list.append(item)
 
     if len(move_list) > 0:
-        background_tasks.add_task(
+        await job_dispatcher.dispatch(
+            JobType.MOVE_FILES,
+            {
+                'dataset_id': str(dataset.id),
+                'move_list': final_list,
+                'operator': request_payload.operator,
+                'target_folder': target_folder,
+                'session_id': Session_ID,
+            },
             file_taks.move_file_worker,
             final_list,
             dataset,
@@ -217,9 +247,9 @@ async def rename_file(
     dataset_id: UUID,
     target_file: str,
     request_payload: DatasetFileRename,
-    background_tasks: BackgroundTasks,
     dataset_crud: DatasetCRUD = Depends(get_dataset_crud),
     file_taks: FileOperationTasks = Depends(),
+    job_dispatcher: JobDispatcher = Depends(),
     file_crud: FileCRUD = Depends(get_file_crud),
     Session_ID: str | None = Header(None),
 ) -> LegacyFileResponse:
@@ -242,7 +272,15 @@ async def rename_file(
             rename_list = []
 
     if len(rename_list) > 0:
-        background_tasks.add_task(
+        await job_dispatcher.dispatch(
+            JobType.RENAME_FILE,
+            {
+                'dataset_id': str(dataset.id),
+                'file': rename_list[0],
+                'new_name': new_name,
+                'operator': request_payload.operator,
+                'session_id': Session_ID,
+            },
             file_taks.rename_file_worker,
             rename_list[0],
             new_name,
@@ -252,3 +290,36 @@ async def rename_file(
         )
 
     return LegacyFileResponse(result={'processing': rename_list, 'ignored': wrong_file + duplicate})
+
+
+@router.post(
+    '/{dataset_id}/storage-layout',
+    summary='API will move files of the dataset to the id storage layout',
+    response_model=LegacyStorageLayoutResponse,
+)
+async def migrate_storage_layout(
+    dataset_id: UUID,
+    request_payload: DatasetStorageLayoutMigrate,
+    dataset_crud: DatasetCRUD = Depends(get_dataset_crud),
+    file_taks: FileOperationTasks = Depends(),
+    job_dispatcher: JobDispatcher = Depends(),
+    network: Network = Depends(get_network),
+) -> LegacyStorageLayoutResponse:
+    """API starts migration of dataset files to object keys that do not change on move and rename."""
+
+    dataset = await dataset_crud.retrieve_by_id(dataset_id)
+    migrating = dataset.storage_layout != StorageLayout.ID
+    if migrating:
+        await job_dispatcher.dispatch(
+            JobType.MIGRATE_STORAGE_LAYOUT,
+            {'dataset_id': str(dataset.id), 'operator': request_payload.operator, 'network': network.dict()},
+            file_taks.migrate_storage_layout_worker,
+            dataset_crud,
+            dataset,
+            request_payload.operator,
+            network,
+        )
+
+    return LegacyStorageLayoutResponse(
+        result=StorageLayoutSchema(storage_layout=dataset.storage_layout, migrating=migrating)
+    )
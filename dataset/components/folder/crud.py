@@ -10,6 +10,7 @@ from dataset.components.exceptions import AlreadyExists
 from dataset.components.folder.schemas import FolderCreateSchema
 from dataset.components.folder.schemas import FolderMetadataCreateSchema
 from dataset.components.folder.schemas import FolderResponseSchema
+from dataset.components.folder.tree import ContainerTree
 from dataset.components.object_storage.s3 import S3Client
 from dataset.services.metadata import MetadataService
 
@@ -20,6 +21,7 @@ class FolderCRUD:
     def __init__(self, s3_client: S3Client, metadata_service: MetadataService):
         self.s3_client = s3_client
         self.metadata_service = metadata_service
+        self.trees: dict[tuple[str, str], ContainerTree] = {}
 
     async def _create(self, data: dict[str, Any]) -> dict[str, Any]:
         """Send folder data to Metadata Service."""
@@ -77,14 +79,21 @@ class FolderCRUD:
         )
         return await self._create(folder_data.dict())
 
-    async def get_children(self, code: str, father_id: str, items_type: str = 'dataset') -> list[dict[str, Any]]:
-        """Returns all files/folders that have father_id as parent."""
+    async def get_tree(self, code: str, items_type: str = 'dataset') -> ContainerTree:
+        """Return container tree snapshot, listing the container only on first access."""
+
+        key = (code, items_type)
+        if key not in self.trees:
+            self.trees[key] = await ContainerTree.load(self.metadata_service, code, items_type)
+        return self.trees[key]
 
-        items = await self.metadata_service.get_objects(code, items_type=items_type)
-        children_items = []
+    def reset_trees(self) -> None:
+        """Drop all container tree snapshots so the next access lists containers again."""
 
-        for item in items:
-            if item['parent'] == father_id:
-                children_items.append(item)
+        self.trees = {}
+
+    async def get_children(self, code: str, father_id: str, items_type: str = 'dataset') -> list[dict[str, Any]]:
+        """Returns all files/folders that have father_id as parent."""
 
-        return children_items
+        tree = await self.get_tree(code, items_type)
+        return tree.get_children(father_id)
@@ -0,0 +1,77 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from collections import defaultdict
+from collections.abc import Iterator
+from typing import Any
+
+from dataset.services.metadata import MetadataService
+
+
+class ContainerTree:
+    """In-memory snapshot of all items in a container, indexed by parent, id and path."""
+
+    def __init__(self, code: str, items_type: str, items: list[dict[str, Any]]) -> None:
+        self.code = code
+        self.items_type = items_type
+        self.items = items
+
+        self._children: dict[str | None, list[dict[str, Any]]] = defaultdict(list)
+        self._by_id: dict[str, dict[str, Any]] = {}
+        self._by_path: dict[str, dict[str, Any]] = {}
+
+        for item in items:
+            self._children[item.get('parent')].append(item)
+            self._by_id[item.get('id')] = item
+            self._by_path[self.get_item_path(item)] = item
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @classmethod
+    async def load(cls, metadata_service: MetadataService, code: str, items_type: str = 'dataset') -> 'ContainerTree':
+        """Build a tree from a single listing of the container."""
+
+        items = await metadata_service.get_objects(code, items_type=items_type)
+        return cls(code, items_type, items)
+
+    @staticmethod
+    def get_item_path(item: dict[str, Any]) -> str:
+        """Return full path of the item inside the container."""
+
+        name = item.get('name') or ''
+        if item.get('parent_path'):
+            return f'{item["parent_path"]}/{name}'
+        return name
+
+    def get_children(self, parent_id: str | None) -> list[dict[str, Any]]:
+        """Return all items that have parent_id as parent."""
+
+        return list(self._children.get(parent_id, []))
+
+    def get_by_id(self, id_: str) -> dict[str, Any] | None:
+        """Return item by id or None when it is not in the container."""
+
+        return self._by_id.get(id_)
+
+    def get_by_path(self, path: str) -> dict[str, Any] | None:
+        """Return item by its full path or None when it is not in the container."""
+
+        return self._by_path.get(path)
+
+    def iter_descendants(self, parent_id: str | None) -> Iterator[dict[str, Any]]:
+        """Yield all items below parent_id, parents always before their children."""
+
+        stack = list(reversed(self._children.get(parent_id, [])))
+        while stack:
+            item = stack.pop()
+            yield item
+            stack.extend(reversed(self._children.get(item.get('id'), [])))
+
+    def get_files(self) -> list[dict[str, Any]]:
+        """Return all files from the container."""
+
+        return [item for item in self.items if item.get('type', '').lower() == 'file']
@@ -0,0 +1,42 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Any
+
+from fastapi import BackgroundTasks
+from fastapi import Depends
+from fastapi import Request
+
+from dataset.components.job.queue import JobQueue
+from dataset.components.job.queue import get_job_queue
+from dataset.components.job.schemas import JobType
+from dataset.config import get_settings
+
+settings = get_settings()
+
+
+class JobDispatcher:
+    """Hand background jobs over to the worker through the job queue or run them in the API process."""
+
+    def __init__(
+        self, background_tasks: BackgroundTasks, request: Request, job_queue: JobQueue = Depends(get_job_queue)
+    ) -> None:
+        self.background_tasks = background_tasks
+        self.request = request
+        self.job_queue = job_queue
+
+    async def dispatch(
+        self, job_type: JobType, payload: dict[str, Any], func: Callable[..., Awaitable[Any]], *args: Any
+    ) -> None:
+        """Enqueue job with serializable payload when the queue is enabled, otherwise run func(*args) in background."""
+
+        if settings.JOB_QUEUE_ENABLED:
+            await self.job_queue.enqueue(job_type, payload, self.request.headers.get('Authorization'))
+            return
+
+        self.background_tasks.add_task(func, *args)
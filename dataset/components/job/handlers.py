@@ -0,0 +1,183 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Any
+from uuid import UUID
+
+from aiokafka import AIOKafkaProducer
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+
+from dataset.components.dataset.crud import DatasetCRUD
+from dataset.components.file.activity_log import get_file_activity_log_service
+from dataset.components.file.crud import FileCRUD
+from dataset.components.file.locks import LockingManager
+from dataset.components.file.locks import create_locking_manager
+from dataset.components.file.tasks import FileOperationTasks
+from dataset.components.folder.crud import FolderCRUD
+from dataset.components.job.schemas import JobSchema
+from dataset.components.job.schemas import JobType
+from dataset.components.object_storage.s3 import S3Client
+from dataset.components.preview.derivatives import PreviewDerivatives
+from dataset.components.preview.headers import HeaderPreview
+from dataset.components.request.network import Network
+from dataset.components.version.activity_log import get_version_activity_log
+from dataset.components.version.crud import VersionCRUD
+from dataset.components.version.crud import VersionFileCRUD
+from dataset.components.version.publisher import VersionPublisher
+from dataset.components.version.schemas import VersionCreateSchema
+from dataset.services.metadata import MetadataService
+from dataset.services.task_stream import TaskStreamService
+
+
+class JobContext:
+    """Dependencies of a single job, built by the worker outside of any API request."""
+
+    def __init__(
+        self,
+        job: JobSchema,
+        db_session: AsyncSession,
+        redis_client: Redis,
+        s3_client: S3Client,
+        kafka_client: AIOKafkaProducer,
+    ) -> None:
+        headers = [(b'authorization', job.authorization.encode())] if job.authorization else []
+        self.request = Request(scope={'type': 'http', 'headers': headers})
+        self.db_session = db_session
+        self.redis_client = redis_client
+        self.s3_client = s3_client
+        self.kafka_client = kafka_client
+        self.metadata_service = MetadataService(self.request)
+        self.dataset_crud = DatasetCRUD(db_session)
+
+    def get_folder_crud(self) -> FolderCRUD:
+        """Return FolderCRUD instance."""
+        return FolderCRUD(self.s3_client, self.metadata_service)
+
+    def get_locking_manager(self, folder_crud: FolderCRUD) -> LockingManager:
+        """Return LockingManager instance of the configured backend."""
+        return create_locking_manager(folder_crud, self.redis_client)
+
+    def get_file_operation_tasks(self) -> FileOperationTasks:
+        """Return FileOperationTasks instance."""
+        folder_crud = self.get_folder_crud()
+        file_crud = FileCRUD(self.s3_client, self.metadata_service)
+        return FileOperationTasks(
+            file_crud=file_crud,
+            folder_crud=folder_crud,
+            locking_manager=self.get_locking_manager(folder_crud),
+            task_stream_service=TaskStreamService(),
+            file_act_notifier=get_file_activity_log_service(self.kafka_client),
+            preview_derivatives=PreviewDerivatives(file_crud, HeaderPreview(file_crud)),
+        )
+
+    def get_version_publisher(self) -> VersionPublisher:
+        """Return VersionPublisher instance."""
+        folder_crud = self.get_folder_crud()
+        return VersionPublisher(
+            self.redis_client,
+            VersionCRUD(self.db_session),
+            VersionFileCRUD(self.db_session),
+            self.get_locking_manager(folder_crud),
+            folder_crud,
+            self.metadata_service,
+            self.s3_client,
+            get_version_activity_log(self.kafka_client),
+        )
+
+
+async def import_files(context: JobContext, payload: dict[str, Any]) -> None:
+    """Copy files and folders from project to dataset."""
+    dataset = await context.dataset_crud.retrieve_by_id(UUID(payload['dataset_id']))
+    error = await context.get_file_operation_tasks().copy_files_worker(
+        context.dataset_crud,
+        payload['import_list'],
+        dataset,
+        payload['operator'],
+        payload['project_code'],
+        payload['session_id'],
+        Network(**payload['network']),
+    )
+    if error:
+        raise error
+
+
+async def delete_files(context: JobContext, payload: dict[str, Any]) -> None:
+    """Remove files and folders from dataset."""
+    dataset = await context.dataset_crud.retrieve_by_id(UUID(payload['dataset_id']))
+    error = await context.get_file_operation_tasks().delete_files_work(
+        context.dataset_crud,
+        payload['delete_list'],
+        dataset,
+        payload['operator'],
+        payload['session_id'],
+        Network(**payload['network']),
+    )
+    if error:
+        raise error
+
+
+async def move_files(context: JobContext, payload: dict[str, Any]) -> None:
+    """Move files and folders within dataset."""
+    dataset = await context.dataset_crud.retrieve_by_id(UUID(payload['dataset_id']))
+    error = await context.get_file_operation_tasks().move_file_worker(
+        payload['move_list'], dataset, payload['operator'], payload['target_folder'], payload['session_id']
+    )
+    if error:
+        raise error
+
+
+async def rename_file(context: JobContext, payload: dict[str, Any]) -> None:
+    """Rename file or folder within dataset."""
+    dataset = await context.dataset_crud.retrieve_by_id(UUID(payload['dataset_id']))
+    error = await context.get_file_operation_tasks().rename_file_worker(
+        payload['file'], payload['new_name'], dataset, payload['operator'], payload['session_id']
+    )
+    if error:
+        raise error
+
+
+async def migrate_storage_layout(context: JobContext, payload: dict[str, Any]) -> None:
+    """Move dataset files to the id storage layout."""
+    dataset = await context.dataset_crud.retrieve_by_id(UUID(payload['dataset_id']))
+    error = await context.get_file_operation_tasks().migrate_storage_layout_worker(
+        context.dataset_crud, dataset, payload['operator'], Network(**payload['network'])
+    )
+    if error:
+        raise error
+
+
+async def publish_version(context: JobContext, payload: dict[str, Any]) -> None:
+    """Publish dataset version."""
+    dataset = await context.dataset_crud.retrieve_by_id(UUID(payload['dataset_id']))
+    publisher = context.get_version_publisher()
+    publisher.job_key = str(dataset.id)
+    error = await publisher.publish(dataset.code, dataset.id, VersionCreateSchema(**payload['version_data']))
+    if error:
+        raise error
+
+
+async def build_version_archive(context: JobContext, payload: dict[str, Any]) -> None:
+    """Build zip of snapshot version."""
+    publisher = context.get_version_publisher()
+    publisher.job_key = payload['job_key']
+    error = await publisher.build_archive(UUID(payload['version_id']))
+    if error:
+        raise error
+
+
+JOB_HANDLERS: dict[JobType, Callable[[JobContext, dict[str, Any]], Awaitable[None]]] = {
+    JobType.IMPORT_FILES: import_files,
+    JobType.DELETE_FILES: delete_files,
+    JobType.MOVE_FILES: move_files,
+    JobType.RENAME_FILE: rename_file,
+    JobType.MIGRATE_STORAGE_LAYOUT: migrate_storage_layout,
+    JobType.PUBLISH_VERSION: publish_version,
+    JobType.BUILD_VERSION_ARCHIVE: build_version_archive,
+}
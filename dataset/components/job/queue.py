@@ -0,0 +1,154 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from time import time
+from typing import Any
+
+from fastapi import Depends
+from redis.asyncio import Redis
+
+from dataset.components.job.schemas import JobSchema
+from dataset.components.job.schemas import JobType
+from dataset.config import get_settings
+from dataset.dependencies.redis import get_redis_client
+from dataset.logger import logger
+
+settings = get_settings()
+
+RESERVE_SCRIPT = '''
+local job_id = redis.call('RPOP', KEYS[1])
+if job_id then
+    redis.call('ZADD', KEYS[2], ARGV[1], job_id)
+end
+return job_id
+'''
+
+REQUEUE_EXPIRED_SCRIPT = '''
+local job_ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, job_id in ipairs(job_ids) do
+    redis.call('ZREM', KEYS[1], job_id)
+    redis.call('RPUSH', KEYS[2], job_id)
+end
+return #job_ids
+'''
+
+
+class JobQueue:
+    """Durable job queue in Redis with visibility timeouts, retries and a dead-letter list.
+
+    Job ids wait in the pending list. A reserved job id is moved atomically into the processing sorted set, scored by
+    the time it becomes visible again. Jobs that are neither acknowledged nor touched before that time, because the
+    worker crashed or was restarted, are put back to the pending list. Failed jobs wait in the processing set for the
+    retry delay and are dead-lettered once they run out of attempts.
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        name: str = settings.JOB_QUEUE_NAME,
+        visibility_timeout: int = settings.JOB_VISIBILITY_TIMEOUT,
+        retry_delay: int = settings.JOB_RETRY_DELAY,
+    ) -> None:
+        self.redis_client = redis_client
+        self.visibility_timeout = visibility_timeout
+        self.retry_delay = retry_delay
+        self.pending_key = f'{name}:pending'
+        self.processing_key = f'{name}:processing'
+        self.dead_key = f'{name}:dead'
+        self.jobs_key = f'{name}:data'
+        self.reserve_script = redis_client.register_script(RESERVE_SCRIPT)
+        self.requeue_expired_script = redis_client.register_script(REQUEUE_EXPIRED_SCRIPT)
+
+    async def enqueue(self, job_type: JobType, payload: dict[str, Any], authorization: str | None = None) -> JobSchema:
+        """Store the job and add it to the end of the pending list."""
+
+        job = JobSchema(type=job_type, payload=payload, authorization=authorization)
+        async with self.redis_client.pipeline(transaction=True) as pipeline:
+            pipeline.hset(self.jobs_key, job.id, job.json())
+            pipeline.lpush(self.pending_key, job.id)
+            await pipeline.execute()
+
+        logger.info(f'Job "{job.id}" of type "{job.type}" enqueued')
+        return job
+
+    async def reserve(self) -> JobSchema | None:
+        """Take the next pending job and hide it from other workers for the visibility timeout."""
+
+        job_id = await self.reserve_script(
+            keys=[self.pending_key, self.processing_key], args=[time() + self.visibility_timeout]
+        )
+        if job_id is None:
+            return None
+
+        data = await self.redis_client.hget(self.jobs_key, job_id)
+        if data is None:
+            await self.redis_client.zrem(self.processing_key, job_id)
+            return None
+
+        job = JobSchema.parse_raw(data)
+        job.attempts += 1
+        if job.attempts > job.max_attempts:
+            await self.dead_letter(job, job.error or 'Job exceeded visibility timeout too many times')
+            return None
+
+        await self.redis_client.hset(self.jobs_key, job.id, job.json())
+        return job
+
+    async def touch(self, job: JobSchema) -> None:
+        """Extend the visibility timeout of a job that is still running."""
+
+        await self.redis_client.zadd(self.processing_key, {job.id: time() + self.visibility_timeout}, xx=True)
+
+    async def ack(self, job: JobSchema) -> None:
+        """Remove successfully processed job from the queue."""
+
+        async with self.redis_client.pipeline(transaction=True) as pipeline:
+            pipeline.zrem(self.processing_key, job.id)
+            pipeline.hdel(self.jobs_key, job.id)
+            await pipeline.execute()
+
+        logger.info(f'Job "{job.id}" of type "{job.type}" done')
+
+    async def retry(self, job: JobSchema, error: str) -> None:
+        """Make failed job visible again after the retry delay or dead-letter it when it runs out of attempts."""
+
+        job.error = error
+        if job.attempts >= job.max_attempts:
+            await self.dead_letter(job, error)
+            return
+
+        async with self.redis_client.pipeline(transaction=True) as pipeline:
+            pipeline.hset(self.jobs_key, job.id, job.json())
+            pipeline.zadd(self.processing_key, {job.id: time() + self.retry_delay * job.attempts})
+            await pipeline.execute()
+
+        logger.warning(f'Job "{job.id}" failed on attempt {job.attempts}, retrying: {error}')
+
+    async def dead_letter(self, job: JobSchema, error: str) -> None:
+        """Move job to the dead-letter list, its data is kept for inspection."""
+
+        job.error = error
+        async with self.redis_client.pipeline(transaction=True) as pipeline:
+            pipeline.zrem(self.processing_key, job.id)
+            pipeline.hset(self.jobs_key, job.id, job.json())
+            pipeline.lpush(self.dead_key, job.id)
+            await pipeline.execute()
+
+        logger.error(f'Job "{job.id}" of type "{job.type}" dead-lettered after {job.attempts} attempt(s): {error}')
+
+    async def requeue_expired(self, limit: int = 100) -> int:
+        """Put jobs whose visibility timeout or retry delay passed back to the pending list."""
+
+        count = await self.requeue_expired_script(keys=[self.processing_key, self.pending_key], args=[time(), limit])
+        if count:
+            logger.info(f'{count} job(s) requeued')
+        return count
+
+
+def get_job_queue(redis_client: Redis = Depends(get_redis_client)) -> JobQueue:
+    """Return an instance of JobQueue as a dependency."""
+
+    return JobQueue(redis_client)
@@ -0,0 +1,42 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from time import time
+from typing import Any
+from uuid import uuid4
+
+from pydantic import Field
+
+from dataset.components.schemas import BaseSchema
+from dataset.components.types import StrEnum
+from dataset.config import get_settings
+
+settings = get_settings()
+
+
+class JobType(StrEnum):
+    """Background jobs that can be processed by the worker."""
+
+    IMPORT_FILES = 'import_files'
+    DELETE_FILES = 'delete_files'
+    MOVE_FILES = 'move_files'
+    RENAME_FILE = 'rename_file'
+    PUBLISH_VERSION = 'publish_version'
+    BUILD_VERSION_ARCHIVE = 'build_version_archive'
+    MIGRATE_STORAGE_LAYOUT = 'migrate_storage_layout'
+
+
+class JobSchema(BaseSchema):
+    """Background job stored in the job queue."""
+
+    id: str = Field(default_factory=lambda: str(uuid4()))
+    type: JobType
+    payload: dict[str, Any]
+    authorization: str | None = None
+    attempts: int = 0
+    max_attempts: int = settings.JOB_MAX_ATTEMPTS
+    created_at: float = Field(default_factory=time)
+    error: str | None = None
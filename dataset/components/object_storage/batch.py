@@ -0,0 +1,95 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+
+from dataset.components.object_storage.s3 import S3Client
+from dataset.config import get_settings
+from dataset.logger import logger
+
+settings = get_settings()
+
+
+class ObjectDeleteFailed(Exception):
+    """Raised when S3 refused to delete one object of a batch."""
+
+    def __init__(self, bucket: str, key: str, code: str, message: str) -> None:
+        super().__init__(f'Unable to delete "{bucket}/{key}": {code} {message}')
+        self.code = code
+
+
+class DeleteObjectsBatcher:
+    """Coalesce deletes of single objects into S3 DeleteObjects requests.
+
+    Keys are grouped per bucket and sent once a batch is full or shortly after its first key was queued. Each caller
+    still awaits the delete of its own object and gets the error of that object only.
+    """
+
+    def __init__(
+        self,
+        s3_client: S3Client,
+        batch_size: int = settings.FILE_OPERATION_DELETE_BATCH_SIZE,
+        delay: float = settings.FILE_OPERATION_DELETE_BATCH_DELAY,
+        concurrency: int = settings.FILE_OPERATION_DELETE_CONCURRENCY,
+    ) -> None:
+        self.s3_client = s3_client
+        self.batch_size = batch_size
+        self.delay = delay
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.batches: dict[str, dict[str, list[asyncio.Future]]] = {}
+        self.timers: dict[str, asyncio.TimerHandle] = {}
+        self.tasks: set[asyncio.Task] = set()
+
+    async def delete(self, bucket: str, key: str) -> None:
+        """Queue object for deletion and wait until the batch containing it is processed."""
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self.batches.setdefault(bucket, {})
+        batch.setdefault(key, []).append(future)
+        if len(batch) >= self.batch_size:
+            self._flush(bucket)
+        elif bucket not in self.timers:
+            self.timers[bucket] = loop.call_later(self.delay, self._flush, bucket)
+
+        await future
+
+    def _flush(self, bucket: str) -> None:
+        """Send queued keys of the bucket in the background."""
+
+        timer = self.timers.pop(bucket, None)
+        if timer:
+            timer.cancel()
+        batch = self.batches.pop(bucket, None)
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._send(bucket, batch))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _send(self, bucket: str, batch: dict[str, list[asyncio.Future]]) -> None:
+        """Delete batch of objects and resolve futures of all waiting callers."""
+
+        try:
+            async with self.semaphore:
+                errors = await self.s3_client.delete_objects(bucket, list(batch))
+            logger.info(f'Minio {bucket}: {len(batch) - len(errors)} of {len(batch)} objects deleted')
+        except Exception as e:
+            logger.exception(f'Unable to delete {len(batch)} objects from "{bucket}"')
+            errors = {key: {'Code': type(e).__name__, 'Message': str(e)} for key in batch}
+
+        for key, futures in batch.items():
+            error = errors.get(key)
+            for future in futures:
+                if future.done():
+                    continue
+                if error:
+                    future.set_exception(
+                        ObjectDeleteFailed(bucket, key, error.get('Code', ''), error.get('Message', ''))
+                    )
+                else:
+                    future.set_result(None)
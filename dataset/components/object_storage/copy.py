@@ -0,0 +1,123 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import math
+from typing import Any
+
+from dataset.components.object_storage.s3 import S3Client
+from dataset.config import get_settings
+from dataset.logger import logger
+
+settings = get_settings()
+
+MAX_PARTS = 10000
+
+
+class ObjectCopier:
+    """Server-side copy of S3 objects, large objects are copied in parts concurrently.
+
+    Single CopyObject request is limited to 5 GB and copies the object on one stream, so objects above the threshold
+    are copied with UploadPartCopy. Failed parts are retried on their own, the upload is aborted when a part keeps
+    failing. Unlike CopyObject, multipart upload does not take over content type and user metadata of the source, so
+    they are set from the HEAD response when the upload is created.
+    """
+
+    def __init__(
+        self,
+        s3_client: S3Client,
+        threshold: int = settings.FILE_OPERATION_COPY_MULTIPART_THRESHOLD,
+        part_size: int = settings.FILE_OPERATION_COPY_PART_SIZE,
+        concurrency: int = settings.FILE_OPERATION_COPY_CONCURRENCY,
+        attempts: int = settings.FILE_OPERATION_COPY_ATTEMPTS,
+        retry_delay: float = settings.FILE_OPERATION_COPY_RETRY_DELAY,
+    ) -> None:
+        self.s3_client = s3_client
+        self.threshold = threshold
+        self.part_size = part_size
+        self.concurrency = concurrency
+        self.attempts = attempts
+        self.retry_delay = retry_delay
+
+    def get_part_ranges(self, size: int) -> list[tuple[int, int]]:
+        """Return inclusive byte ranges of parts, part size grows when the object would need too many parts."""
+
+        part_size = max(self.part_size, math.ceil(size / MAX_PARTS))
+        return [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)]
+
+    async def _copy_part(
+        self,
+        source_bucket: str,
+        source_key: str,
+        dest_bucket: str,
+        dest_key: str,
+        upload_id: str,
+        part_number: int,
+        byte_range: tuple[int, int],
+        semaphore: asyncio.Semaphore,
+    ) -> dict[str, str | int]:
+        """Copy one part, retrying failed attempts."""
+
+        async with semaphore:
+            for attempt in range(1, self.attempts + 1):
+                try:
+                    etag = await self.s3_client.upload_part_copy(
+                        dest_bucket, dest_key, upload_id, part_number, source_bucket, source_key, byte_range
+                    )
+                    return {'ETag': etag, 'PartNumber': part_number}
+                except Exception:
+                    if attempt == self.attempts:
+                        raise
+                    logger.warning(
+                        f'Copy of part {part_number} of "{source_key}" failed on attempt {attempt}, retrying'
+                    )
+                    await asyncio.sleep(self.retry_delay * attempt)
+
+    async def _copy_multipart(
+        self, source_bucket: str, source_key: str, dest_bucket: str, dest_key: str, head: dict[str, Any]
+    ) -> str | None:
+        upload_id = await self.s3_client.create_multipart_upload(
+            dest_bucket, dest_key, head.get('ContentType'), head.get('Metadata')
+        )
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [
+            asyncio.create_task(
+                self._copy_part(
+                    source_bucket, source_key, dest_bucket, dest_key, upload_id, part_number, byte_range, semaphore
+                )
+            )
+            for part_number, byte_range in enumerate(self.get_part_ranges(head['ContentLength']), start=1)
+        ]
+        try:
+            parts = await asyncio.gather(*tasks)
+            response = await self.s3_client.complete_multipart_upload(dest_bucket, dest_key, upload_id, parts)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.s3_client.abort_multipart_upload(dest_bucket, dest_key, upload_id)
+            logger.info(f'Multipart copy of "{source_key}" to "{dest_bucket}/{dest_key}" aborted')
+            raise
+
+        logger.info(f'Object "{source_key}" copied to "{dest_bucket}/{dest_key}" in {len(parts)} part(s)')
+        return response.get('VersionId')
+
+    async def copy(
+        self, source_bucket: str, source_key: str, dest_bucket: str, dest_key: str, size: int | None = None
+    ) -> str | None:
+        """Copy object and return version id of the copy, which is None when the bucket is not versioned.
+
+        The size hint from metadata saves a HEAD request for objects below the threshold. Parts are always computed
+        from the size of the object itself, so a stale hint can never truncate the copy.
+        """
+
+        if size is None or size >= self.threshold:
+            head = await self.s3_client.head_object(source_bucket, source_key)
+            if head['ContentLength'] >= self.threshold:
+                return await self._copy_multipart(source_bucket, source_key, dest_bucket, dest_key, head)
+
+        response = await self.s3_client.copy_object(source_bucket, source_key, dest_bucket, dest_key)
+        return response.get('VersionId')
@@ -4,6 +4,7 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import asyncio
 import json
 
 from common import get_minio_policy_client
@@ -43,9 +44,29 @@ class PolicyManager:
         await self.minio_policy_client.delete_IAM_policy(dataset_creator)
 
 
-async def get_policy_manager() -> PolicyManager:
-    s3_endpoint = settings.S3_HOST + ':' + str(settings.S3_PORT)
-    minio_client = await get_minio_policy_client(
-        s3_endpoint, settings.S3_ACCESS_KEY, settings.S3_SECRET_KEY, https=settings.S3_HTTPS_ENABLED
-    )
-    return PolicyManager(minio_client)
+class GetPolicyManager:
+    """Create PolicyManager once and share its MinIO policy client between all requests."""
+
+    def __init__(self) -> None:
+        self.instance = None
+        self.lock = asyncio.Lock()
+
+    async def __call__(self) -> PolicyManager:
+        """Return an instance of PolicyManager class."""
+
+        async with self.lock:
+            if not self.instance:
+                s3_endpoint = settings.S3_HOST + ':' + str(settings.S3_PORT)
+                minio_client = await get_minio_policy_client(
+                    s3_endpoint, settings.S3_ACCESS_KEY, settings.S3_SECRET_KEY, https=settings.S3_HTTPS_ENABLED
+                )
+                self.instance = PolicyManager(minio_client)
+            return self.instance
+
+    def close(self) -> None:
+        """Drop shared PolicyManager, the MinIO client has no public API to release its connection pool."""
+
+        self.instance = None
+
+
+get_policy_manager = GetPolicyManager()
@@ -4,9 +4,14 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import asyncio
+from contextlib import AsyncExitStack
 from typing import Any
 from typing import BinaryIO
 
+import aioboto3
+from aiobotocore.client import AioBaseClient
+from botocore.client import Config
 from common import get_boto3_admin_client
 from common import get_boto3_client
 from common.object_storage_adaptor.boto3_admin_client import Boto3AdminClient
@@ -22,15 +27,27 @@ class BucketNotFound(Exception):
 
 
 class S3Client:
-    """Class that combines two boto3 clients from common package for better usability."""
+    """Class that combines two boto3 clients from common package for better usability.
+
+    Reads, uploads, multipart and batch operations go through long-lived aiobotocore clients, so connections are pooled
+    and reused instead of being opened for each call. Use close() to release them.
+    """
 
     boto_client: Boto3Client
     boto_admin_client: Boto3AdminClient
+    boto_public_client: Boto3Client
+
+    def __init__(self, access_key: str, secret_key: str) -> None:
+        self._session = aioboto3.Session(aws_access_key_id=access_key, aws_secret_access_key=secret_key)
+        self._config = Config(signature_version='s3v4', max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS)
+        self._clients: dict[str, AioBaseClient] = {}
+        self._exit_stack = AsyncExitStack()
+        self._lock = asyncio.Lock()
 
     @classmethod
     async def initialize(cls, endpoint: str, access_key: str, secret_key: str, https: bool = False) -> 'S3Client':
         """Create an instance of S3Client with initialized boto3 clients."""
-        s3_client = cls()
+        s3_client = cls(access_key, secret_key)
         s3_client.boto_client = await get_boto3_client(
             endpoint=endpoint, access_key=access_key, secret_key=secret_key, https=https
         )
@@ -44,6 +61,26 @@ class S3Client:
         )
         return s3_client
 
+    async def _get_client(self, endpoint: str) -> AioBaseClient:
+        """Return long-lived aiobotocore client for the endpoint, opening it on first use."""
+
+        if endpoint in self._clients:
+            return self._clients[endpoint]
+
+        async with self._lock:
+            if endpoint not in self._clients:
+                self._clients[endpoint] = await self._exit_stack.enter_async_context(
+                    self._session.client('s3', endpoint_url=endpoint, config=self._config)
+                )
+            return self._clients[endpoint]
+
+    async def close(self) -> None:
+        """Close all long-lived aiobotocore clients."""
+
+        await self._exit_stack.aclose()
+        self._clients = {}
+        self._exit_stack = AsyncExitStack()
+
     async def create_bucket(self, bucket: str) -> dict[str, Any]:
         """Create a bucket in S3."""
         return await self.boto_admin_client.create_bucket(bucket)
@@ -61,28 +98,111 @@ class S3Client:
         return await self.boto_admin_client.delete_bucket(bucket)
 
     async def upload_file(self, bucket: str, key: str, f: BinaryIO) -> None:
-        """Upload file to S3."""
-        await self.boto_client.upload_object(bucket, key, f)
+        """Upload file to S3, large files are uploaded in parts by the managed transfer."""
+        s3 = await self._get_client(self.boto_client.endpoint)
+        await s3.upload_fileobj(f, bucket, key)
 
     async def download_file(self, bucket: str, key: str, local_path: str) -> None:
         """Download file from S3."""
         await self.boto_client.download_object(bucket, key, local_path)
 
-    async def get_download_presigned_url(self, bucket: str, file_path: str) -> str:
-        """Get generate a download presigned url."""
-        return await self.boto_public_client.get_download_presigned_url(bucket, file_path)
+    async def get_download_presigned_url(self, bucket: str, file_path: str, version_id: str | None = None) -> str:
+        """Get generate a download presigned url, optionally for specific object version."""
+        if not version_id:
+            return await self.boto_public_client.get_download_presigned_url(bucket, file_path)
+
+        s3 = await self._get_client(self.boto_public_client.endpoint)
+        params = {'Bucket': bucket, 'Key': file_path, 'VersionId': version_id}
+        return await s3.generate_presigned_url('get_object', Params=params, ExpiresIn=3600)
 
     async def get_file_body(self, bucket: str, file_path: str, file_limit_size: int = settings.MAX_PREVIEW_SIZE) -> str:
         """Get file body with file size limit."""
-        async with self.boto_client._session.client(
-            's3', endpoint_url=self.boto_client.endpoint, config=self.boto_client._config
-        ) as s3:
-            res = await s3.get_object(Bucket=bucket, Key=file_path, Range=f'bytes=0-{file_limit_size}')
-            content = await res['Body'].read()
-            return content.decode()
+        s3 = await self._get_client(self.boto_client.endpoint)
+        res = await s3.get_object(Bucket=bucket, Key=file_path, Range=f'bytes=0-{file_limit_size}')
+        async with res['Body'] as body:
+            content = await body.read()
+        return content.decode()
+
+    async def get_object(
+        self, bucket: str, file_path: str, version_id: str | None = None, byte_range: str | None = None
+    ) -> dict[str, Any]:
+        """Get object, or byte range of it, with a streaming body, the body must be read or closed by the caller."""
+        s3 = await self._get_client(self.boto_client.endpoint)
+        params = {'Bucket': bucket, 'Key': file_path}
+        if version_id:
+            params['VersionId'] = version_id
+        if byte_range:
+            params['Range'] = byte_range
+        return await s3.get_object(**params)
+
+    async def head_object(self, bucket: str, file_path: str) -> dict[str, Any]:
+        """Get object metadata including size, etag and version id."""
+        s3 = await self._get_client(self.boto_client.endpoint)
+        return await s3.head_object(Bucket=bucket, Key=file_path)
 
     async def delete_object(self, bucket: str, file_path: str) -> None:
         await self.boto_client.delete_object(bucket, file_path)
 
+    async def delete_objects(self, bucket: str, keys: list[str]) -> dict[str, dict[str, str]]:
+        """Delete up to 1000 objects with one request and return errors by object key."""
+        s3 = await self._get_client(self.boto_client.endpoint)
+        res = await s3.delete_objects(Bucket=bucket, Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True})
+        return {error['Key']: error for error in res.get('Errors', [])}
+
     async def copy_object(self, source_bucket: str, source_key: str, dest_bucket: str, dest_key: str) -> dict[str, Any]:
         return await self.boto_client.copy_object(source_bucket, source_key, dest_bucket, dest_key)
+
+    async def create_multipart_upload(
+        self, bucket: str, key: str, content_type: str | None = None, metadata: dict[str, str] | None = None
+    ) -> str:
+        """Start multipart upload and return its id, content type and user metadata are set on the assembled object."""
+        s3 = await self._get_client(self.boto_client.endpoint)
+        params = {'Bucket': bucket, 'Key': key}
+        if content_type:
+            params['ContentType'] = content_type
+        if metadata:
+            params['Metadata'] = metadata
+        res = await s3.create_multipart_upload(**params)
+        return res['UploadId']
+
+    async def upload_part(self, bucket: str, key: str, upload_id: str, part_number: int, body: bytes) -> str:
+        """Upload one part of multipart upload and return its etag."""
+        s3 = await self._get_client(self.boto_client.endpoint)
+        res = await s3.upload_part(Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=body)
+        return res['ETag']
+
+    async def upload_part_copy(
+        self,
+        bucket: str,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        source_bucket: str,
+        source_key: str,
+        byte_range: tuple[int, int],
+    ) -> str:
+        """Copy inclusive byte range of the source object as one part of multipart upload and return its etag."""
+        s3 = await self._get_client(self.boto_client.endpoint)
+        res = await s3.upload_part_copy(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            CopySource=f'{source_bucket}/{source_key}',
+            CopySourceRange=f'bytes={byte_range[0]}-{byte_range[1]}',
+        )
+        return res['CopyPartResult']['ETag']
+
+    async def complete_multipart_upload(
+        self, bucket: str, key: str, upload_id: str, parts: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        """Assemble uploaded parts into the object."""
+        s3 = await self._get_client(self.boto_client.endpoint)
+        return await s3.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={'Parts': parts}
+        )
+
+    async def abort_multipart_upload(self, bucket: str, key: str, upload_id: str) -> None:
+        """Abort multipart upload and discard uploaded parts."""
+        s3 = await self._get_client(self.boto_client.endpoint)
+        await s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
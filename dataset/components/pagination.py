@@ -5,18 +5,71 @@
 # You may not use this file except in compliance with the License.
 
 import math
+from base64 import urlsafe_b64decode
+from base64 import urlsafe_b64encode
+from typing import Any
+from uuid import UUID
 
 from pydantic import BaseModel
 from pydantic import conint
+from pydantic import parse_obj_as
+from sqlalchemy import asc
+from sqlalchemy import desc
+from sqlalchemy import tuple_
+from sqlalchemy.sql import Select
 
 from dataset.components.db_model import DBModel
+from dataset.components.exceptions import BadRequest
+from dataset.components.sorting import Sorting
+from dataset.components.sorting import SortingOrder
+
+
+class InvalidCursor(BadRequest):
+    """Raised when pagination cursor cannot be decoded or does not match the requested sorting."""
+
+    @property
+    def code(self) -> str:
+        return 'invalid_cursor'
+
+    @property
+    def details(self) -> str:
+        return 'Pagination cursor is invalid'
+
+
+class Cursor(BaseModel):
+    """Position of the last entry on the page, the next page starts right after it."""
+
+    field: str | None = None
+    value: Any = None
+    id: UUID
+
+    @classmethod
+    def from_entry(cls, entry: DBModel, field: str | None) -> 'Cursor':
+        value = None if field is None else getattr(entry, field)
+        return cls(field=field, value=value, id=entry.id)
+
+    @classmethod
+    def decode(cls, token: str) -> 'Cursor':
+        try:
+            return cls.parse_raw(urlsafe_b64decode(token.encode()))
+        except ValueError:
+            raise InvalidCursor()
+
+    def encode(self) -> str:
+        return urlsafe_b64encode(self.json().encode()).decode()
 
 
 class Pagination(BaseModel):
-    """Base pagination control parameters."""
+    """Base pagination control parameters.
+
+    When cursor is set the page is selected by the position of the last entry of the previous page instead of the
+    offset, so the cost of the page does not depend on how deep it is.
+    """
 
     page: conint(ge=0) = 0
     page_size: conint(ge=1) = 20
+    cursor: str | None = None
+    include_count: bool = True
 
     @property
     def limit(self) -> int:
@@ -24,15 +77,54 @@ class Pagination(BaseModel):
 
     @property
     def offset(self) -> int:
+        if self.cursor is not None:
+            return 0
+
         return self.page_size * self.page
 
+    def apply(self, statement: Select, model: type[DBModel], sorting: Sorting | None = None) -> Select:
+        """Return statement limited to the page ordered by sorting field and id.
+
+        One extra entry is selected to tell whether the next page exists.
+        """
+
+        field = sorting.field if sorting else None
+        order = sorting.order if sorting else SortingOrder.ASC
+
+        columns = [model.id]
+        if field is not None:
+            columns.insert(0, getattr(model, field))
+
+        if self.cursor is not None:
+            cursor = Cursor.decode(self.cursor)
+            if cursor.field != field:
+                raise InvalidCursor()
+
+            values = [cursor.id]
+            if field is not None:
+                try:
+                    values.insert(0, parse_obj_as(columns[0].type.python_type, cursor.value))
+                except ValueError:
+                    raise InvalidCursor()
+
+            if order is SortingOrder.DESC:
+                statement = statement.where(tuple_(*columns) < tuple_(*values))
+            else:
+                statement = statement.where(tuple_(*columns) > tuple_(*values))
+
+        ordering = desc if order is SortingOrder.DESC else asc
+        statement = statement.order_by(ordering(model.id))
+
+        return statement.limit(self.limit + 1).offset(self.offset)
+
 
 class Page(BaseModel):
     """Represent one page of the response."""
 
     pagination: Pagination
-    count: int
+    count: int | None
     entries: list[DBModel]
+    next_cursor: str | None = None
 
     class Config:
         arbitrary_types_allowed = True
@@ -42,5 +134,8 @@ class Page(BaseModel):
         return self.pagination.page
 
     @property
-    def total_pages(self) -> int:
+    def total_pages(self) -> int | None:
+        if self.count is None:
+            return None
+
         return math.ceil(self.count / self.pagination.page_size)
@@ -20,13 +20,21 @@ class QueryParameters(BaseModel):
 
 
 class PageParameters(QueryParameters):
-    """Base query parameters for pagination."""
+    """Base query parameters for pagination.
+
+    Cursor from the next_cursor of the previous response replaces the page number, total count can be skipped by
+    clients that only follow cursors.
+    """
 
     page: int = Query(default=0, ge=0)
     page_size: int = Query(default=20, ge=1)
+    cursor: str | None = Query(default=None)
+    include_count: bool = Query(default=True)
 
     def to_pagination(self) -> Pagination:
-        return Pagination(page=self.page, page_size=self.page_size)
+        return Pagination(
+            page=self.page, page_size=self.page_size, cursor=self.cursor, include_count=self.include_count
+        )
 
 
 class SortByFields(StrEnum):
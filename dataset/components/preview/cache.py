@@ -0,0 +1,139 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import time
+from collections import OrderedDict
+from typing import Any
+
+from fastapi import Depends
+from prometheus_client import Counter
+from redis.asyncio import Redis
+
+from dataset.components.file.crud import FileCRUD
+from dataset.components.file.schemas import FileSchema
+from dataset.config import get_settings
+from dataset.dependencies.redis import get_redis_client
+from dataset.logger import logger
+
+settings = get_settings()
+
+PREVIEW_CACHE_REQUESTS = Counter(
+    'dataset_preview_cache_requests_total', 'Formatted preview cache lookups.', ['tier', 'result']
+)
+PREVIEW_CACHE_EVICTIONS = Counter(
+    'dataset_preview_cache_evictions_total', 'Formatted previews evicted from the in-process cache.'
+)
+
+
+class PreviewLRU:
+    """In-process LRU cache of serialized previews bounded by the total size of stored values."""
+
+    def __init__(self, max_bytes: int = settings.PREVIEW_CACHE_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self.size = 0
+
+    def _remove(self, key: str) -> None:
+        _, value = self.entries.pop(key)
+        self.size -= len(value)
+
+    def get(self, key: str) -> bytes | None:
+        """Return value and mark it as recently used or None when it is missing or expired."""
+
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        """Store value and evict least recently used ones until the size limit is met."""
+
+        if len(value) > self.max_bytes:
+            return
+
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.size += len(value)
+
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+            PREVIEW_CACHE_EVICTIONS.inc()
+
+
+preview_lru = PreviewLRU()
+
+
+class PreviewCache:
+    """Two-tier cache of formatted previews, in-process LRU in front of Redis shared by all processes.
+
+    Entries are keyed by file id and object version or ETag, so a changed object is never served from the cache.
+    """
+
+    def __init__(self, redis_client: Redis, lru: PreviewLRU, ttl: int = settings.PREVIEW_CACHE_TTL) -> None:
+        self.redis_client = redis_client
+        self.lru = lru
+        self.ttl = ttl
+
+    def get_key(self, file_id: str, object_version: str) -> str:
+        return f'dataset:preview:{file_id}:{object_version}'
+
+    async def get(self, file_id: str, object_version: str) -> FileSchema | None:
+        """Return cached preview from the first tier that has it."""
+
+        key = self.get_key(file_id, object_version)
+        value = self.lru.get(key)
+        if value is not None:
+            PREVIEW_CACHE_REQUESTS.labels('memory', 'hit').inc()
+            return FileSchema.parse_raw(value)
+        PREVIEW_CACHE_REQUESTS.labels('memory', 'miss').inc()
+
+        try:
+            value = await self.redis_client.get(key)
+        except Exception:
+            logger.exception(f'Unable to get preview "{key}" from redis')
+            value = None
+        if value is None:
+            PREVIEW_CACHE_REQUESTS.labels('redis', 'miss').inc()
+            return None
+
+        PREVIEW_CACHE_REQUESTS.labels('redis', 'hit').inc()
+        self.lru.set(key, value, self.ttl)
+        return FileSchema.parse_raw(value)
+
+    async def set(self, file_id: str, object_version: str, file: FileSchema) -> None:
+        """Store preview in both tiers."""
+
+        key = self.get_key(file_id, object_version)
+        value = file.json().encode()
+        self.lru.set(key, value, self.ttl)
+        try:
+            await self.redis_client.set(key, value, ex=self.ttl)
+        except Exception:
+            logger.exception(f'Unable to store preview "{key}" in redis')
+
+    async def get_preview(self, file_crud: FileCRUD, file_id: str, file_metadata: dict[str, Any]) -> FileSchema:
+        """Return formatted preview from the cache or read it from S3 and store it."""
+
+        object_version = await file_crud.get_object_version(file_metadata)
+        file = await self.get(file_id, object_version)
+        if file is None:
+            file = await file_crud.read_file(file_metadata)
+            await self.set(file_id, object_version, file)
+        return file
+
+
+def get_preview_cache(redis_client: Redis = Depends(get_redis_client)) -> PreviewCache:
+    """Return an instance of PreviewCache as a dependency."""
+
+    return PreviewCache(redis_client, preview_lru)
@@ -0,0 +1,150 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+from io import BytesIO
+from typing import Any
+
+from botocore.exceptions import ClientError
+from fastapi import Depends
+
+from dataset.components.file.crud import FileCRUD
+from dataset.components.file.dependencies import get_file_crud
+from dataset.components.file.schemas import FileSchema
+from dataset.components.object_storage.batch import DeleteObjectsBatcher
+from dataset.components.preview.headers import HeaderPreview
+from dataset.components.preview.schemas import PreviewHeaderSchema
+from dataset.config import get_settings
+from dataset.logger import logger
+
+settings = get_settings()
+
+CONTENT_FILE_TYPES = ['csv', 'tsv', 'json']
+
+
+class PreviewDerivatives:
+    """Preview derivatives generated when files are imported and stored as sidecar objects in the dataset bucket.
+
+    Sidecars are keyed by file id, so preview requests are served with a single small GET instead of reading and
+    formatting the file. Generation never fails the import, submitted files are put into a bounded queue processed by
+    a fixed number of consumer tasks in the background.
+    """
+
+    def __init__(
+        self,
+        file_crud: FileCRUD,
+        header_preview: HeaderPreview,
+        prefix: str = settings.PREVIEW_DERIVATIVES_PREFIX,
+        concurrency: int = settings.PREVIEW_DERIVATIVES_CONCURRENCY,
+        queue_size: int = settings.PREVIEW_DERIVATIVES_QUEUE_SIZE,
+    ) -> None:
+        self.file_crud = file_crud
+        self.s3_client = file_crud.s3_client
+        self.header_preview = header_preview
+        self.prefix = prefix
+        self.concurrency = concurrency
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(queue_size)
+        self.consumers: list[asyncio.Task] = []
+
+    def get_key(self, file_id: str, kind: str) -> str:
+        return f'{self.prefix}/{file_id}/{kind}.json'
+
+    async def _put(self, bucket: str, file_id: str, kind: str, value: str) -> None:
+        await self.s3_client.upload_file(bucket, self.get_key(file_id, kind), BytesIO(value.encode()))
+
+    async def _get(self, bucket: str, file_id: str, kind: str) -> bytes | None:
+        try:
+            response = await self.s3_client.get_object(bucket, self.get_key(file_id, kind))
+        except ClientError as e:
+            if e.response['Error']['Code'] not in ['NoSuchKey', '404']:
+                logger.exception(f'Unable to get preview derivative "{kind}" of file "{file_id}"')
+            return None
+
+        async with response['Body'] as body:
+            return await body.read()
+
+    async def build(self, item: dict[str, Any]) -> None:
+        """Generate and store all derivatives applicable to the type of file metadata item."""
+
+        try:
+            file_metadata = self.file_crud.parse_file_metadata(item)
+            file_type = file_metadata['type']
+            if file_type in CONTENT_FILE_TYPES:
+                file = await self.file_crud.read_file(file_metadata)
+                await self._put(file_metadata['bucket'], item['id'], 'content', file.json())
+            if self.header_preview.is_supported(file_type):
+                header = await self.header_preview.read_header(file_metadata)
+                await self._put(file_metadata['bucket'], item['id'], 'header', header.json())
+        except Exception:
+            logger.exception(f'Unable to generate preview derivatives of file "{item["id"]}"')
+
+    async def _consume(self) -> None:
+        while True:
+            item = await self.queue.get()
+            try:
+                await self.build(item)
+            finally:
+                self.queue.task_done()
+
+    async def submit(self, item: dict[str, Any]) -> None:
+        """Queue derivative generation for file metadata item when derivatives are enabled.
+
+        Consumers are started on the first submitted item, submitting waits while the queue is full.
+        """
+
+        if not settings.PREVIEW_DERIVATIVES_ENABLED:
+            return
+
+        if not self.consumers:
+            self.consumers = [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+
+        await self.queue.put(item)
+
+    async def wait(self) -> None:
+        """Wait until all queued derivatives are generated and stop the consumers."""
+
+        await self.queue.join()
+        for consumer in self.consumers:
+            consumer.cancel()
+        await asyncio.gather(*self.consumers, return_exceptions=True)
+        self.consumers = []
+
+    async def delete(self, item: dict[str, Any], batcher: DeleteObjectsBatcher | None = None) -> None:
+        """Remove derivatives of file metadata item, missing ones are ignored.
+
+        With the batcher the sidecars are deleted together with objects of other files.
+        """
+
+        if not settings.PREVIEW_DERIVATIVES_ENABLED:
+            return
+
+        bucket = self.file_crud.parse_file_metadata(item)['bucket']
+        delete_object = batcher.delete if batcher else self.s3_client.delete_object
+        kinds = ['content', 'header']
+        results = await asyncio.gather(
+            *[delete_object(bucket, self.get_key(item['id'], kind)) for kind in kinds], return_exceptions=True
+        )
+        for kind, result in zip(kinds, results):
+            if isinstance(result, Exception):
+                logger.error(f'Unable to delete preview derivative "{kind}" of file "{item["id"]}"', exc_info=result)
+
+    async def get_content(self, file_id: str, file_metadata: dict[str, Any]) -> FileSchema | None:
+        """Return formatted preview from the sidecar or None when it was not generated."""
+
+        value = await self._get(file_metadata['bucket'], file_id, 'content')
+        return FileSchema.parse_raw(value) if value else None
+
+    async def get_header(self, file_id: str, file_metadata: dict[str, Any]) -> PreviewHeaderSchema | None:
+        """Return file format header from the sidecar or None when it was not generated."""
+
+        value = await self._get(file_metadata['bucket'], file_id, 'header')
+        return PreviewHeaderSchema.parse_raw(value) if value else None
+
+
+def get_preview_derivatives(file_crud: FileCRUD = Depends(get_file_crud)) -> PreviewDerivatives:
+    """Return an instance of PreviewDerivatives as a dependency."""
+
+    return PreviewDerivatives(file_crud, HeaderPreview(file_crud))
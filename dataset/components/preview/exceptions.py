@@ -0,0 +1,62 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from http.client import REQUESTED_RANGE_NOT_SATISFIABLE
+
+from dataset.components.exceptions import BadRequest
+from dataset.components.exceptions import ServiceException
+
+
+class PreviewNotSupported(BadRequest):
+    """Raised when requested preview is not available for the file type."""
+
+    domain: str = 'preview'
+
+    @property
+    def details(self) -> str:
+        return 'Paged preview is only available for CSV and TSV files'
+
+
+class HeaderPreviewNotSupported(BadRequest):
+    """Raised when header preview is not available for the file type."""
+
+    domain: str = 'preview'
+
+    @property
+    def details(self) -> str:
+        return 'Header preview is not available for the file type'
+
+
+class InvalidHeader(BadRequest):
+    """Raised when file header does not match the format of the file type."""
+
+    domain: str = 'preview'
+
+    @property
+    def code(self) -> str:
+        return 'invalid_header'
+
+    @property
+    def details(self) -> str:
+        return 'File header cannot be parsed'
+
+
+class RangeNotSatisfiable(ServiceException):
+    """Raised when requested byte range does not overlap the file."""
+
+    domain: str = 'preview'
+
+    @property
+    def status(self) -> int:
+        return REQUESTED_RANGE_NOT_SATISFIABLE
+
+    @property
+    def code(self) -> str:
+        return 'range_not_satisfiable'
+
+    @property
+    def details(self) -> str:
+        return 'Requested range is not satisfiable'
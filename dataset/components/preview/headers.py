@@ -0,0 +1,310 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import math
+import struct
+import zlib
+from abc import ABC
+from abc import abstractmethod
+from typing import Any
+
+from botocore.exceptions import ClientError
+from fastapi import Depends
+
+from dataset.components.file.crud import FileCRUD
+from dataset.components.file.dependencies import get_file_crud
+from dataset.components.object_storage.s3 import S3Client
+from dataset.components.preview.exceptions import HeaderPreviewNotSupported
+from dataset.components.preview.exceptions import InvalidHeader
+from dataset.components.preview.schemas import NiftiHeaderSchema
+from dataset.components.preview.schemas import PreviewHeaderSchema
+from dataset.config import get_settings
+from dataset.logger import logger
+
+settings = get_settings()
+
+COMPRESSED_SUFFIX = '.gz'
+
+NIFTI_DATATYPES = {
+    0: 'unknown',
+    1: 'binary',
+    2: 'uint8',
+    4: 'int16',
+    8: 'int32',
+    16: 'float32',
+    32: 'complex64',
+    64: 'float64',
+    128: 'rgb24',
+    256: 'int8',
+    512: 'uint16',
+    768: 'uint32',
+    1024: 'int64',
+    1280: 'uint64',
+    1536: 'float128',
+    1792: 'complex128',
+    2048: 'complex256',
+    2304: 'rgba32',
+}
+NIFTI_SPATIAL_UNITS = {0: 'unknown', 1: 'meter', 2: 'mm', 3: 'micron'}
+NIFTI_TEMPORAL_UNITS = {0: 'unknown', 8: 'sec', 16: 'msec', 24: 'usec', 32: 'hz', 40: 'ppm', 48: 'rads'}
+
+
+class ObjectPrefixReader:
+    """Read the beginning of S3 object with small ranged reads, decompressing gzip stream on the fly.
+
+    Only as many bytes as needed to produce the requested size are fetched, so the rest of the object is never
+    downloaded. Empty objects have no header and raise InvalidHeader, like objects with malformed headers.
+    """
+
+    def __init__(
+        self,
+        s3_client: S3Client,
+        bucket: str,
+        path: str,
+        version_id: str | None = None,
+        compressed: bool = False,
+        size: int | None = None,
+        chunk_size: int = settings.PREVIEW_HEADER_CHUNK_SIZE,
+        max_bytes: int = settings.PREVIEW_HEADER_MAX_BYTES,
+    ) -> None:
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.path = path
+        self.version_id = version_id
+        self.compressed = compressed
+        self.size = size
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+
+    async def _read_range(self, position: int) -> tuple[bytes, int]:
+        """Return chunk of the object starting at position and size of the whole object."""
+
+        byte_range = f'bytes={position}-{position + self.chunk_size - 1}'
+        try:
+            response = await self.s3_client.get_object(self.bucket, self.path, self.version_id, byte_range)
+        except ClientError as e:
+            # the size from metadata may be stale, ranges of empty objects are not satisfiable
+            if e.response['Error']['Code'] == 'InvalidRange':
+                raise InvalidHeader()
+            raise
+        async with response['Body'] as body:
+            chunk = await body.read()
+        # content range has "bytes <first>-<last>/<size>" format
+        return chunk, int(response['ContentRange'].rpartition('/')[2])
+
+    async def read(self, size: int) -> bytes:
+        """Return up to size bytes from the beginning of the object content."""
+
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16) if self.compressed else None
+        data = bytearray()
+        position = 0
+        object_size = self.size
+        if object_size == 0:
+            raise InvalidHeader()
+        while len(data) < size and position < self.max_bytes:
+            if object_size is not None and position >= object_size:
+                break
+
+            chunk, object_size = await self._read_range(position)
+            if not chunk:
+                break
+            position += len(chunk)
+
+            if decompressor is None:
+                data += chunk
+                continue
+            try:
+                data += decompressor.decompress(chunk, size - len(data))
+            except zlib.error:
+                raise InvalidHeader()
+            if decompressor.eof:
+                break
+
+        logger.info(f'Read {position} byte(s) of "{self.path}" for {len(data)} byte(s) of header')
+        return bytes(data[:size])
+
+
+class HeaderReader(ABC):
+    """Base class for readers of file format headers."""
+
+    format: str = ''
+    header_size: int = 0
+
+    @abstractmethod
+    def parse(self, data: bytes) -> dict[str, Any]:
+        """Return header fields parsed from the beginning of the file content."""
+
+
+class NiftiHeaderReader(HeaderReader):
+    """Reader of NIfTI-1 and NIfTI-2 headers in either byte order."""
+
+    format = 'nifti'
+    header_size = 540
+
+    def _get_byte_order(self, data: bytes) -> tuple[str, int]:
+        for byte_order in '<>':
+            (sizeof_hdr,) = struct.unpack_from(f'{byte_order}i', data)
+            if sizeof_hdr in (348, 540):
+                return byte_order, sizeof_hdr
+        raise InvalidHeader()
+
+    def _parse_nifti1(self, data: bytes, byte_order: str) -> dict[str, Any]:
+        if data[344:348] not in (b'n+1\0', b'ni1\0'):
+            raise InvalidHeader()
+
+        def unpack(fmt: str, offset: int) -> tuple[Any, ...]:
+            return struct.unpack_from(byte_order + fmt, data, offset)
+
+        return {
+            'version': 1,
+            'dim': list(unpack('8h', 40)),
+            'datatype': unpack('h', 70)[0],
+            'bitpix': unpack('h', 72)[0],
+            'pixdim': list(unpack('8f', 76)),
+            'vox_offset': unpack('f', 108)[0],
+            'scl_slope': unpack('f', 112)[0],
+            'scl_inter': unpack('f', 116)[0],
+            'xyzt_units': data[123],
+            'description': data[148:228],
+            'qform_code': unpack('h', 252)[0],
+            'sform_code': unpack('h', 254)[0],
+            'quatern': list(unpack('3f', 256)),
+            'qoffset': list(unpack('3f', 268)),
+            'srow': [list(unpack('4f', offset)) for offset in (280, 296, 312)],
+        }
+
+    def _parse_nifti2(self, data: bytes, byte_order: str) -> dict[str, Any]:
+        if len(data) < 540 or data[4:8] not in (b'n+2\0', b'ni2\0'):
+            raise InvalidHeader()
+
+        def unpack(fmt: str, offset: int) -> tuple[Any, ...]:
+            return struct.unpack_from(byte_order + fmt, data, offset)
+
+        return {
+            'version': 2,
+            'dim': list(unpack('8q', 16)),
+            'datatype': unpack('h', 12)[0],
+            'bitpix': unpack('h', 14)[0],
+            'pixdim': list(unpack('8d', 104)),
+            'vox_offset': unpack('q', 168)[0],
+            'scl_slope': unpack('d', 176)[0],
+            'scl_inter': unpack('d', 184)[0],
+            'xyzt_units': unpack('i', 500)[0],
+            'description': data[240:320],
+            'qform_code': unpack('i', 344)[0],
+            'sform_code': unpack('i', 348)[0],
+            'quatern': list(unpack('3d', 352)),
+            'qoffset': list(unpack('3d', 376)),
+            'srow': [list(unpack('4d', offset)) for offset in (400, 432, 464)],
+        }
+
+    def _get_affine(self, fields: dict[str, Any]) -> list[list[float]]:
+        """Return voxel to world transformation from sform, qform or voxel sizes in that order of preference."""
+
+        if fields['sform_code'] > 0:
+            return fields['srow'] + [[0.0, 0.0, 0.0, 1.0]]
+
+        pixdim = fields['pixdim']
+        if fields['qform_code'] <= 0:
+            return [
+                [pixdim[1], 0.0, 0.0, 0.0],
+                [0.0, pixdim[2], 0.0, 0.0],
+                [0.0, 0.0, pixdim[3], 0.0],
+                [0.0, 0.0, 0.0, 1.0],
+            ]
+
+        b, c, d = fields['quatern']
+        a = math.sqrt(max(1.0 - (b * b + c * c + d * d), 0.0))
+        qfac = -1.0 if pixdim[0] < 0 else 1.0
+        rotation = [
+            [a * a + b * b - c * c - d * d, 2 * (b * c - a * d), 2 * (b * d + a * c)],
+            [2 * (b * c + a * d), a * a + c * c - b * b - d * d, 2 * (c * d - a * b)],
+            [2 * (b * d - a * c), 2 * (c * d + a * b), a * a + d * d - b * b - c * c],
+        ]
+        scales = [pixdim[1], pixdim[2], qfac * pixdim[3]]
+        affine = [[row[i] * scales[i] for i in range(3)] + [offset] for row, offset in zip(rotation, fields['qoffset'])]
+        return affine + [[0.0, 0.0, 0.0, 1.0]]
+
+    def parse(self, data: bytes) -> dict[str, Any]:
+        if len(data) < 348:
+            raise InvalidHeader()
+
+        byte_order, sizeof_hdr = self._get_byte_order(data)
+        if sizeof_hdr == 348:
+            fields = self._parse_nifti1(data, byte_order)
+        else:
+            fields = self._parse_nifti2(data, byte_order)
+
+        ndim = fields['dim'][0]
+        if not 1 <= ndim <= 7:
+            raise InvalidHeader()
+
+        header = NiftiHeaderSchema(
+            format=f'nifti{fields["version"]}',
+            byte_order='little' if byte_order == '<' else 'big',
+            dimensions=fields['dim'][1 : ndim + 1],
+            voxel_sizes=fields['pixdim'][1 : ndim + 1],
+            datatype=NIFTI_DATATYPES.get(fields['datatype'], 'unknown'),
+            bitpix=fields['bitpix'],
+            spatial_unit=NIFTI_SPATIAL_UNITS.get(fields['xyzt_units'] & 0x07, 'unknown'),
+            temporal_unit=NIFTI_TEMPORAL_UNITS.get(fields['xyzt_units'] & 0x38, 'unknown'),
+            vox_offset=fields['vox_offset'],
+            scl_slope=fields['scl_slope'],
+            scl_inter=fields['scl_inter'],
+            qform_code=fields['qform_code'],
+            sform_code=fields['sform_code'],
+            affine=self._get_affine(fields),
+            description=fields['description'].split(b'\0', 1)[0].decode(errors='replace'),
+        )
+        return header.dict()
+
+
+HEADER_READERS: dict[str, HeaderReader] = {
+    'nii': NiftiHeaderReader(),
+}
+
+
+class HeaderPreview:
+    """Preview of file format headers read without downloading the rest of the file."""
+
+    def __init__(self, file_crud: FileCRUD, readers: dict[str, HeaderReader] = HEADER_READERS) -> None:
+        self.file_crud = file_crud
+        self.readers = readers
+
+    def is_supported(self, file_type: str) -> bool:
+        return file_type.removesuffix(COMPRESSED_SUFFIX) in self.readers
+
+    async def read_header(self, file_metadata: dict[str, Any]) -> PreviewHeaderSchema:
+        """Return header of the file, the gzip compressed variant of each format is supported as well."""
+
+        file_type = file_metadata['type']
+        compressed = file_type.endswith(COMPRESSED_SUFFIX)
+        reader = self.readers.get(file_type.removesuffix(COMPRESSED_SUFFIX))
+        if reader is None:
+            raise HeaderPreviewNotSupported()
+
+        prefix_reader = ObjectPrefixReader(
+            self.file_crud.s3_client,
+            file_metadata['bucket'],
+            file_metadata['path'],
+            file_metadata['version'],
+            compressed,
+            file_metadata['size'],
+        )
+        data = await prefix_reader.read(reader.header_size)
+        return PreviewHeaderSchema(type=file_type, format=reader.format, header=reader.parse(data))
+
+    async def get_header(self, file_id: str) -> PreviewHeaderSchema:
+        """Return header of the file by file id."""
+
+        file_metadata = await self.file_crud.get_file_metadata(file_id)
+        return await self.read_header(file_metadata)
+
+
+def get_header_preview(file_crud: FileCRUD = Depends(get_file_crud)) -> HeaderPreview:
+    """Return an instance of HeaderPreview as a dependency."""
+
+    return HeaderPreview(file_crud)
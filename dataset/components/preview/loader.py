@@ -0,0 +1,97 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+from typing import Any
+
+from fastapi import Depends
+
+from dataset.components.exceptions import NotFound
+from dataset.components.exceptions import ServiceException
+from dataset.components.exceptions import UnhandledException
+from dataset.components.file.crud import FileCRUD
+from dataset.components.file.dependencies import get_file_crud
+from dataset.components.preview.cache import PreviewCache
+from dataset.components.preview.cache import get_preview_cache
+from dataset.components.preview.derivatives import PreviewDerivatives
+from dataset.components.preview.derivatives import get_preview_derivatives
+from dataset.components.preview.schemas import PreviewBatchItemSchema
+from dataset.components.preview.schemas import PreviewResponseSchema
+from dataset.config import get_settings
+from dataset.logger import logger
+
+settings = get_settings()
+
+
+class PreviewLoader:
+    """Load formatted previews from derivatives, the preview cache or S3 in that order."""
+
+    def __init__(
+        self,
+        file_crud: FileCRUD,
+        preview_cache: PreviewCache,
+        preview_derivatives: PreviewDerivatives,
+        concurrency: int = settings.PREVIEW_BATCH_CONCURRENCY,
+    ) -> None:
+        self.file_crud = file_crud
+        self.preview_cache = preview_cache
+        self.preview_derivatives = preview_derivatives
+        self.concurrency = concurrency
+
+    async def _load(self, file_id: str, file_metadata: dict[str, Any]) -> PreviewResponseSchema:
+        file = None
+        if settings.PREVIEW_DERIVATIVES_ENABLED:
+            file = await self.preview_derivatives.get_content(file_id, file_metadata)
+        if file is None and settings.PREVIEW_CACHE_ENABLED:
+            file = await self.preview_cache.get_preview(self.file_crud, file_id, file_metadata)
+        elif file is None:
+            file = await self.file_crud.read_file(file_metadata)
+
+        is_concatenated = file.size >= settings.MAX_PREVIEW_SIZE
+        return PreviewResponseSchema(content=file.content, type=file.type, is_concatenated=is_concatenated)
+
+    async def get_preview(self, file_id: str) -> PreviewResponseSchema:
+        """Return formatted preview of the file."""
+
+        file_metadata = await self.file_crud.get_file_metadata(file_id)
+        return await self._load(file_id, file_metadata)
+
+    async def get_previews(self, file_ids: list[str]) -> list[PreviewBatchItemSchema]:
+        """Return previews of files in the requested order with per file errors.
+
+        Metadata of all files is resolved with a single request, bodies are loaded concurrently up to the limit.
+        """
+
+        items = await self.file_crud.metadata_service.get_by_ids(list(dict.fromkeys(file_ids)))
+        items_by_id = {item['id']: item for item in items if item.get('type') == 'file'}
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def get_item(file_id: str) -> PreviewBatchItemSchema:
+            async with semaphore:
+                try:
+                    item = items_by_id.get(file_id)
+                    if item is None:
+                        raise NotFound()
+                    file_metadata = self.file_crud.parse_file_metadata(item)
+                    preview = await self._load(file_id, file_metadata)
+                    return PreviewBatchItemSchema(file_id=file_id, result=preview)
+                except ServiceException as e:
+                    return PreviewBatchItemSchema(file_id=file_id, error=e.dict())
+                except Exception:
+                    logger.exception(f'Unable to load preview of file "{file_id}"')
+                    return PreviewBatchItemSchema(file_id=file_id, error=UnhandledException().dict())
+
+        return await asyncio.gather(*[get_item(file_id) for file_id in file_ids])
+
+
+def get_preview_loader(
+    file_crud: FileCRUD = Depends(get_file_crud),
+    preview_cache: PreviewCache = Depends(get_preview_cache),
+    preview_derivatives: PreviewDerivatives = Depends(get_preview_derivatives),
+) -> PreviewLoader:
+    """Return an instance of PreviewLoader as a dependency."""
+
+    return PreviewLoader(file_crud, preview_cache, preview_derivatives)
@@ -0,0 +1,93 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from datetime import datetime
+from email.utils import format_datetime
+from email.utils import parsedate_to_datetime
+
+from dataset.components.file.schemas import FileStatSchema
+from dataset.components.preview.exceptions import RangeNotSatisfiable
+
+
+def _parse_http_date(value: str) -> datetime | None:
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison of etag against the comma separated list of entity tags from the header."""
+
+    if header.strip() == '*':
+        return True
+    tags = [tag.strip().removeprefix('W/') for tag in header.split(',')]
+    return etag in tags
+
+
+def _if_range_matches(if_range: str, file_stat: FileStatSchema) -> bool:
+    """Strong comparison of If-Range entity tag or date against the current file."""
+
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == file_stat.etag
+    return file_stat.last_modified.replace(microsecond=0) == _parse_http_date(if_range)
+
+
+def get_validator_headers(file_stat: FileStatSchema) -> dict[str, str]:
+    """Return validator headers which let clients cache the file and resume its download."""
+
+    return {
+        'Accept-Ranges': 'bytes',
+        'ETag': file_stat.etag,
+        'Last-Modified': format_datetime(file_stat.last_modified, usegmt=True),
+    }
+
+
+def is_not_modified(if_none_match: str | None, if_modified_since: str | None, file_stat: FileStatSchema) -> bool:
+    """Evaluate conditional headers, If-Modified-Since is ignored when If-None-Match is present."""
+
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, file_stat.etag)
+
+    if if_modified_since is not None:
+        since = _parse_http_date(if_modified_since)
+        if since is not None and since.tzinfo is not None:
+            return file_stat.last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+def parse_range(range_header: str | None, if_range: str | None, file_stat: FileStatSchema) -> tuple[int, int] | None:
+    """Return first and last byte position requested by a single range header.
+
+    None means the whole file should be sent, that is the case for missing, malformed or multiple ranges and for
+    If-Range not matching the current file.
+    """
+
+    if not range_header or not range_header.startswith('bytes=') or ',' in range_header:
+        return None
+
+    if if_range is not None and not _if_range_matches(if_range, file_stat):
+        return None
+
+    first, _, last = range_header.removeprefix('bytes=').strip().partition('-')
+    if not (first or last) or (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+
+    size = file_stat.size
+    if not first:
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiable()
+        return max(size - suffix, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size:
+        raise RangeNotSatisfiable()
+    if end < start:
+        return None
+    return start, min(end, size - 1)
@@ -0,0 +1,192 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import bisect
+import csv
+from io import StringIO
+from typing import Any
+
+from fastapi import Depends
+from redis.asyncio import Redis
+
+from dataset.components.file.crud import FileCRUD
+from dataset.components.file.dependencies import get_file_crud
+from dataset.components.file.normalizer import RowSplitter
+from dataset.components.file.normalizer import decode_rows
+from dataset.components.file.normalizer import sniff_dialect
+from dataset.components.preview.exceptions import PreviewNotSupported
+from dataset.components.preview.schemas import PreviewRowsSchema
+from dataset.components.preview.schemas import RowIndexSchema
+from dataset.config import get_settings
+from dataset.dependencies.redis import get_redis_client
+from dataset.logger import logger
+
+settings = get_settings()
+
+
+class RowPager:
+    """Serve pages of csv rows using ranged reads guided by a sparse row offset index.
+
+    The index stores the byte offset of every n-th row and the detected csv format. It is built lazily, only as far as
+    requested pages need, and cached in Redis by file id and object version.
+    """
+
+    def __init__(
+        self,
+        file_crud: FileCRUD,
+        redis_client: Redis,
+        interval: int = settings.PREVIEW_ROW_INDEX_INTERVAL,
+        chunk_size: int = settings.PREVIEW_CHUNK_SIZE,
+        ttl: int = settings.PREVIEW_ROW_INDEX_TTL,
+    ) -> None:
+        self.file_crud = file_crud
+        self.s3_client = file_crud.s3_client
+        self.redis_client = redis_client
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.ttl = ttl
+
+    def get_key(self, file_id: str, object_version: str) -> str:
+        return f'dataset:preview:index:{file_id}:{object_version}'
+
+    async def _load_index(self, key: str) -> RowIndexSchema | None:
+        try:
+            value = await self.redis_client.get(key)
+        except Exception:
+            logger.exception(f'Unable to get row index "{key}" from redis')
+            return None
+        return RowIndexSchema.parse_raw(value) if value else None
+
+    async def _save_index(self, key: str, index: RowIndexSchema) -> None:
+        try:
+            await self.redis_client.set(key, index.json(), ex=self.ttl)
+        except Exception:
+            logger.exception(f'Unable to store row index "{key}" in redis')
+
+    def _add_rows(self, index: RowIndexSchema, rows: list[tuple[int, bytes]]) -> None:
+        for start, row in rows:
+            if index.rows % self.interval == 0:
+                index.checkpoints.append((index.rows, start))
+            index.rows += 1
+            index.position = start + len(row)
+
+    async def _create_index(self, bucket: str, path: str, object_version: str | None) -> RowIndexSchema:
+        """Detect csv format and header from the beginning of the object."""
+
+        response = await self.s3_client.get_object(bucket, path, object_version, f'bytes=0-{self.chunk_size - 1}')
+        async with response['Body'] as body:
+            sample = await body.read()
+
+        dialect = sniff_dialect(sample[:1024].decode(errors='ignore'))
+        splitter = RowSplitter(dialect['quotechar'])
+        rows = splitter.feed(sample) or splitter.finish()
+        header = decode_rows([rows[0][1]], dialect)[0] if rows else []
+        return RowIndexSchema(dialect=dialect, header=header, complete=not sample)
+
+    async def _extend_index(
+        self, index: RowIndexSchema, bucket: str, path: str, object_version: str | None, size: int, rows: int
+    ) -> None:
+        """Scan the object from the last indexed row until the index covers the number of rows or the object ends."""
+
+        splitter = RowSplitter(index.dialect['quotechar'], index.position)
+        response = await self.s3_client.get_object(bucket, path, object_version, f'bytes={index.position}-')
+        async with response['Body'] as body:
+            while index.rows < rows:
+                chunk = await body.read(self.chunk_size)
+                if not chunk:
+                    self._add_rows(index, splitter.finish())
+                    index.complete = True
+                    break
+                self._add_rows(index, splitter.feed(chunk))
+
+        if index.position >= size:
+            index.complete = True
+        logger.info(f'Row index of "{path}" extended to {index.rows} rows')
+
+    async def _read_rows(
+        self,
+        bucket: str,
+        path: str,
+        object_version: str | None,
+        dialect: dict[str, Any],
+        start: tuple[int, int],
+        end: int | None,
+        offset: int,
+        limit: int,
+    ) -> list[bytes]:
+        """Read limit rows starting at offset with one ranged read beginning at the start checkpoint."""
+
+        start_row, start_byte = start
+        byte_range = f'bytes={start_byte}-{end - 1}' if end else f'bytes={start_byte}-'
+        splitter = RowSplitter(dialect['quotechar'], start_byte)
+        rows = []
+        row_number = start_row
+        response = await self.s3_client.get_object(bucket, path, object_version, byte_range)
+        async with response['Body'] as body:
+            while len(rows) < limit:
+                chunk = await body.read(self.chunk_size)
+                found = splitter.feed(chunk) if chunk else splitter.finish()
+                for _, row in found:
+                    if row_number >= offset and len(rows) < limit:
+                        rows.append(row)
+                    row_number += 1
+                if not chunk:
+                    break
+        return rows
+
+    async def get_page(self, file_id: str, offset: int, limit: int) -> PreviewRowsSchema:
+        """Return limit rows of csv file starting at offset row, the header row has offset 0."""
+
+        file_metadata = await self.file_crud.get_file_metadata(file_id)
+        if file_metadata['type'] not in ['csv', 'tsv']:
+            raise PreviewNotSupported()
+
+        bucket, path = file_metadata['bucket'], file_metadata['path']
+        object_version = await self.file_crud.get_object_version(file_metadata)
+        version_id = file_metadata['version']
+        key = self.get_key(file_id, object_version)
+
+        index = await self._load_index(key)
+        changed = index is None
+        if index is None:
+            index = await self._create_index(bucket, path, version_id)
+        if not index.complete and index.rows < offset + limit:
+            await self._extend_index(index, bucket, path, version_id, file_metadata['size'], offset + limit)
+            changed = True
+        if changed:
+            await self._save_index(key, index)
+
+        rows = []
+        if offset < index.rows:
+            checkpoint_rows = [row for row, _ in index.checkpoints]
+            start = index.checkpoints[bisect.bisect_right(checkpoint_rows, offset) - 1]
+            end = None
+            if index.rows >= offset + limit:
+                next_checkpoint = bisect.bisect_left(checkpoint_rows, offset + limit)
+                if next_checkpoint < len(index.checkpoints):
+                    end = index.checkpoints[next_checkpoint][1]
+                else:
+                    end = index.position
+            rows = await self._read_rows(bucket, path, version_id, index.dialect, start, end, offset, limit)
+
+        csv_out = StringIO()
+        csv.writer(csv_out, delimiter=',').writerows(decode_rows(rows, index.dialect))
+        return PreviewRowsSchema(
+            type=file_metadata['type'],
+            offset=offset,
+            limit=limit,
+            total=index.rows if index.complete else None,
+            header=index.header,
+            content=csv_out.getvalue(),
+        )
+
+
+def get_row_pager(
+    file_crud: FileCRUD = Depends(get_file_crud), redis_client: Redis = Depends(get_redis_client)
+) -> RowPager:
+    """Return an instance of RowPager as a dependency."""
+
+    return RowPager(file_crud, redis_client)
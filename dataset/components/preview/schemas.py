@@ -4,7 +4,14 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from typing import Any
+
+from pydantic import Field
+
 from dataset.components.schemas import BaseSchema
+from dataset.config import get_settings
+
+settings = get_settings()
 
 
 class PreviewResponseSchema(BaseSchema):
@@ -15,7 +22,89 @@ class PreviewResponseSchema(BaseSchema):
     content: str
 
 
+class PreviewBatchSchema(BaseSchema):
+    """Schema for batched preview request."""
+
+    file_ids: list[str] = Field(min_items=1, max_items=settings.PREVIEW_BATCH_MAX_FILES)
+
+
+class PreviewBatchItemSchema(BaseSchema):
+    """Schema for preview of single file in batch, either result or error is set."""
+
+    file_id: str
+    result: PreviewResponseSchema | None = None
+    error: dict[str, str] | None = None
+
+
+class LegacyPreviewBatchResponseSchema(BaseSchema):
+    """Legacy schema for batched preview results in response."""
+
+    result: list[PreviewBatchItemSchema]
+
+
 class LegacyPreviewResultResponseSchema(BaseSchema):
     """Legacy schema for single preview result in response."""
 
     result: PreviewResponseSchema
+
+
+class RowIndexSchema(BaseSchema):
+    """Sparse row offset index of csv object with its detected format."""
+
+    dialect: dict[str, Any]
+    header: list[str]
+    checkpoints: list[tuple[int, int]] = []
+    rows: int = 0
+    position: int = 0
+    complete: bool = False
+
+
+class PreviewRowsSchema(BaseSchema):
+    """Schema for page of csv preview rows."""
+
+    type: str
+    offset: int
+    limit: int
+    total: int | None
+    header: list[str]
+    content: str
+
+
+class LegacyPreviewRowsResponseSchema(BaseSchema):
+    """Legacy schema for page of csv preview rows in response."""
+
+    result: PreviewRowsSchema
+
+
+class NiftiHeaderSchema(BaseSchema):
+    """Schema for NIfTI-1 or NIfTI-2 header fields."""
+
+    format: str
+    byte_order: str
+    dimensions: list[int]
+    voxel_sizes: list[float]
+    datatype: str
+    bitpix: int
+    spatial_unit: str
+    temporal_unit: str
+    vox_offset: float
+    scl_slope: float
+    scl_inter: float
+    qform_code: int
+    sform_code: int
+    affine: list[list[float]]
+    description: str
+
+
+class PreviewHeaderSchema(BaseSchema):
+    """Schema for file format header preview."""
+
+    type: str
+    format: str
+    header: dict[str, Any]
+
+
+class LegacyPreviewHeaderResponseSchema(BaseSchema):
+    """Legacy schema for file format header preview in response."""
+
+    result: PreviewHeaderSchema
@@ -4,14 +4,36 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from http.client import NOT_MODIFIED
+from http.client import PARTIAL_CONTENT
+
 from fastapi import APIRouter
 from fastapi import Depends
+from fastapi import Header
+from fastapi import Query
+from fastapi import Response
 from fastapi.responses import StreamingResponse
 
 from dataset.components.file.crud import FileCRUD
 from dataset.components.file.dependencies import get_file_crud
+from dataset.components.file.normalizer import CSVNormalizer
+from dataset.components.file.normalizer import normalize_csv
+from dataset.components.preview.derivatives import PreviewDerivatives
+from dataset.components.preview.derivatives import get_preview_derivatives
+from dataset.components.preview.headers import HeaderPreview
+from dataset.components.preview.headers import get_header_preview
+from dataset.components.preview.loader import PreviewLoader
+from dataset.components.preview.loader import get_preview_loader
+from dataset.components.preview.ranges import get_validator_headers
+from dataset.components.preview.ranges import is_not_modified
+from dataset.components.preview.ranges import parse_range
+from dataset.components.preview.rows import RowPager
+from dataset.components.preview.rows import get_row_pager
+from dataset.components.preview.schemas import LegacyPreviewBatchResponseSchema
+from dataset.components.preview.schemas import LegacyPreviewHeaderResponseSchema
 from dataset.components.preview.schemas import LegacyPreviewResultResponseSchema
-from dataset.components.preview.schemas import PreviewResponseSchema
+from dataset.components.preview.schemas import LegacyPreviewRowsResponseSchema
+from dataset.components.preview.schemas import PreviewBatchSchema
 from dataset.config import get_settings
 from dataset.logger import logger
 
@@ -24,32 +46,110 @@ router = APIRouter(tags=['Preview'])
     response_model=LegacyPreviewResultResponseSchema,
     summary='CSV/JSON/TSV File preview',
 )
-async def get_preview(file_id: str, file_crud: FileCRUD = Depends(get_file_crud)):
+async def get_preview(file_id: str, preview_loader: PreviewLoader = Depends(get_preview_loader)):
     """Get file preview."""
     logger.info(f'Get preview for: {str(file_id)}')
-    file = await file_crud.download_file(file_id)
-    if file.size >= settings.MAX_PREVIEW_SIZE:
-        is_concatenated = True
-    else:
-        is_concatenated = False
-    preview_schema = PreviewResponseSchema(content=file.content, type=file.type, is_concatenated=is_concatenated)
+    preview_schema = await preview_loader.get_preview(file_id)
 
     return LegacyPreviewResultResponseSchema(result=preview_schema)
 
 
+@router.post(
+    '/previews',
+    response_model=LegacyPreviewBatchResponseSchema,
+    summary='CSV/JSON/TSV Files batched preview',
+)
+async def get_previews(
+    data: PreviewBatchSchema, preview_loader: PreviewLoader = Depends(get_preview_loader)
+) -> LegacyPreviewBatchResponseSchema:
+    """Get previews of multiple files with per file errors."""
+    logger.info(f'Get previews for {len(data.file_ids)} files')
+    previews = await preview_loader.get_previews(data.file_ids)
+
+    return LegacyPreviewBatchResponseSchema(result=previews)
+
+
+@router.get(
+    '/{file_id}/preview/rows',
+    response_model=LegacyPreviewRowsResponseSchema,
+    summary='CSV/TSV File paged preview',
+)
+async def get_preview_rows(
+    file_id: str,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=settings.PREVIEW_ROWS_MAX_LIMIT),
+    row_pager: RowPager = Depends(get_row_pager),
+) -> LegacyPreviewRowsResponseSchema:
+    """Get page of csv rows, the header row has offset 0."""
+    logger.info(f'Get preview rows {offset}-{offset + limit} for: {str(file_id)}')
+    page = await row_pager.get_page(file_id, offset, limit)
+
+    return LegacyPreviewRowsResponseSchema(result=page)
+
+
+@router.get(
+    '/{file_id}/preview/header',
+    response_model=LegacyPreviewHeaderResponseSchema,
+    summary='Neuroimaging File header preview',
+)
+async def get_preview_header(
+    file_id: str,
+    file_crud: FileCRUD = Depends(get_file_crud),
+    header_preview: HeaderPreview = Depends(get_header_preview),
+    preview_derivatives: PreviewDerivatives = Depends(get_preview_derivatives),
+) -> LegacyPreviewHeaderResponseSchema:
+    """Get file format header, e.g. dimensions, voxel sizes and affine of NIfTI file."""
+    logger.info(f'Get preview header for: {str(file_id)}')
+    file_metadata = await file_crud.get_file_metadata(file_id)
+    header = None
+    if settings.PREVIEW_DERIVATIVES_ENABLED:
+        header = await preview_derivatives.get_header(file_id, file_metadata)
+    if header is None:
+        header = await header_preview.read_header(file_metadata)
+
+    return LegacyPreviewHeaderResponseSchema(result=header)
+
+
 @router.get(
     '/{file_id}/preview/stream',
     summary='CSV/JSON/TSV File preview stream',
     response_class=StreamingResponse,
 )
-async def stream(file_id: str, file_crud: FileCRUD = Depends(get_file_crud)):
-    """Get a file preview stream."""
+async def stream(
+    file_id: str,
+    range_header: str | None = Header(default=None, alias='Range'),
+    if_range: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
+    if_modified_since: str | None = Header(default=None),
+    normalize: bool = Query(
+        default=False, description='Convert csv/tsv rows to comma separated, disables ranges and conditional requests'
+    ),
+    file_crud: FileCRUD = Depends(get_file_crud),
+):
+    """Get a file preview stream, supports single byte range and conditional requests."""
     logger.info(f'Get preview for: {str(file_id)}')
 
-    file_stream = await file_crud.stream_file(file_id)
+    file_stat = await file_crud.get_file_stat(file_id)
+    if normalize and file_stat.type in ['csv', 'tsv']:
+        # Validators of the stored object do not describe the normalized content, so it is not cached by clients
+        file_stream = await file_crud.stream_file(file_stat)
+        content = normalize_csv(file_stream.content, CSVNormalizer())
+        return StreamingResponse(content, media_type='text/csv')
+
+    headers = get_validator_headers(file_stat)
+    if is_not_modified(if_none_match, if_modified_since, file_stat):
+        return Response(status_code=NOT_MODIFIED, headers=headers)
+
+    byte_range = parse_range(range_header, if_range, file_stat)
+    file_stream = await file_crud.stream_file(file_stat, byte_range)
     if file_stream.type in ['csv', 'tsv']:
         mimetype = 'text/csv'
     else:
         mimetype = 'application/json'
 
-    return StreamingResponse(file_stream.content, media_type=mimetype)
+    headers['Content-Length'] = str(file_stream.size)
+    if byte_range is None:
+        return StreamingResponse(file_stream.content, media_type=mimetype, headers=headers)
+
+    headers['Content-Range'] = f'bytes {byte_range[0]}-{byte_range[1]}/{file_stat.size}'
+    return StreamingResponse(file_stream.content, status_code=PARTIAL_CONTENT, media_type=mimetype, headers=headers)
@@ -4,6 +4,8 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from typing import Any
+
 from sqlalchemy import select
 from sqlalchemy.orm import contains_eager
 from sqlalchemy.sql import Select
@@ -32,11 +34,10 @@ class SchemaCRUD(CRUD):
         '23505': AlreadyExists(),  # duplicated entry
     }
 
-    @property
-    def select_query(self) -> Select:
-        """Return base select including join with Dataset model."""
+    def join_relationships(self, statement: Select, entity: Any) -> Select:
+        """Join Dataset model."""
 
-        return select(self.model).outerjoin(Dataset).options(contains_eager(self.model.dataset))
+        return statement.outerjoin(Dataset, entity.dataset_id == Dataset.id).options(contains_eager(entity.dataset))
 
     async def get_schema_list(self, request_payload: POSTSchemaList) -> list[SchemaResponse]:
         """Get List of Schemas with the essential schema on top."""
@@ -95,4 +96,4 @@ class SchemaCRUD(CRUD):
                 'creator': dataset.creator,
             }
         )
-        return await self.create(schema_data)
+        return await self.create(schema_data, load_relationships=True)
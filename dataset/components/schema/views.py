@@ -39,7 +39,7 @@ async def create(
     """Create a new schema."""
 
     async with schema_crud:
-        schema = await schema_crud.create(data)
+        schema = await schema_crud.create(data, load_relationships=True)
     api_response = LegacySchemaResponse(result=schema)
     await activity_log.send_schema_create_event(schema, data.creator)
 
@@ -66,7 +66,7 @@ async def update(
     """Update a schema."""
 
     async with schema_crud:
-        schema = await schema_crud.update(schema_id, UpdateSchema(**data.dict()))
+        schema = await schema_crud.update(schema_id, UpdateSchema(**data.dict()), load_relationships=True)
     if schema.name == settings.ESSENTIALS_NAME:
         dataset_schema = DatasetUpdateSchema.from_schema(schema.content)
         await dataset_crud.update(schema.dataset.id, dataset_schema)
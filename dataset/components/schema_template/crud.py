@@ -4,6 +4,7 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from typing import Any
 from uuid import UUID
 
 from sqlalchemy import select
@@ -20,10 +21,10 @@ class SchemaTemplateCRUD(CRUD):
 
     model = SchemaTemplate
 
-    @property
-    def select_query(self) -> Select:
-        """Return base select including join with Dataset model."""
-        return select(self.model).outerjoin(Dataset).options(contains_eager(self.model.dataset))
+    def join_relationships(self, statement: Select, entity: Any) -> Select:
+        """Join Dataset model."""
+
+        return statement.outerjoin(Dataset, entity.dataset_id == Dataset.id).options(contains_eager(entity.dataset))
 
     async def get_template_by_dataset_or_system_defined(self, dataset_id: UUID | str) -> list[SchemaTemplate]:
         if isinstance(dataset_id, UUID):
@@ -33,7 +33,7 @@ async def create_schema_template(
 ):
     request_payload.dataset_id = dataset_id
     async with schema_template_crud:
-        new_template = await schema_template_crud.create(request_payload)
+        new_template = await schema_template_crud.create(request_payload, load_relationships=True)
     await activity_log.send_schema_template_on_create_event(new_template, new_template.dataset)
 
     return LegacySchemaTemplateResponse(result=new_template)
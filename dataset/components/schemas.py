@@ -28,14 +28,21 @@ class BaseSchema(BaseModel):
 class ListResponseSchema(BaseSchema):
     """Default schema for multiple base schemas in response."""
 
-    num_of_pages: int
+    num_of_pages: int | None
     page: int
-    total: int
+    total: int | None
     result: list[BaseSchema]
+    next_cursor: str | None
 
     @classmethod
     def from_page(cls, page: Page):
-        return cls(num_of_pages=page.total_pages, page=page.number, total=page.count, result=page.entries)
+        return cls(
+            num_of_pages=page.total_pages,
+            page=page.number,
+            total=page.count,
+            result=page.entries,
+            next_cursor=page.next_cursor,
+        )
 
 
 class LegacyResponseSchema(BaseSchema):
@@ -9,6 +9,7 @@ from fastapi import Depends
 from dataset.components.activity_log.dataset_activity_log import BaseDatasetActivityLog
 from dataset.components.activity_log.schemas import DatasetActivityLogSchema
 from dataset.components.version.models import Version
+from dataset.components.version.models import VersionFile
 from dataset.dependencies.kafka import KafkaProducerClient
 from dataset.dependencies.kafka import get_kafka_client
 
@@ -42,6 +43,22 @@ class VersionActivityLog(BaseDatasetActivityLog):
 
         return await self._message_send(log_schema.dict())
 
+    async def send_version_file_download_event(
+        self, version: Version, version_file: VersionFile, operator: str, network_origin: str = 'unknown'
+    ):
+        """Announce that a file of snapshot version has been downloaded."""
+
+        log_schema = DatasetActivityLogSchema(
+            activity_type='download',
+            version=version.version,
+            container_code=version.dataset.code,
+            user=operator,
+            target_name=version_file.path,
+            network_origin=network_origin,
+        )
+
+        return await self._message_send(log_schema.dict())
+
 
 def get_version_activity_log(
     kafka_producer_client: KafkaProducerClient = Depends(get_kafka_client),
@@ -0,0 +1,167 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import io
+import math
+import zipfile
+from typing import Any
+
+from starlette.concurrency import run_in_threadpool
+
+from dataset.components.object_storage.copy import MAX_PARTS
+from dataset.components.object_storage.s3 import S3Client
+from dataset.config import get_settings
+from dataset.logger import logger
+
+settings = get_settings()
+
+# fixed metadata of archive entries, archive of the same files is the same whenever it is created
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+ZIP_FILE_MODE = 0o100644
+ZIP_DIR_MODE = 0o040755
+
+
+def get_zip_info(arcname: str) -> zipfile.ZipInfo:
+    """Return zip entry with fixed timestamp and permissions, names ending with slash are directories."""
+
+    zip_info = zipfile.ZipInfo(arcname, date_time=ZIP_DATE_TIME)
+    if zip_info.is_dir():
+        # MS-DOS directory flag
+        zip_info.external_attr = ZIP_DIR_MODE << 16 | 0x10
+    else:
+        zip_info.external_attr = ZIP_FILE_MODE << 16
+        zip_info.compress_type = zipfile.ZIP_DEFLATED
+    return zip_info
+
+
+class ZipOutputBuffer(io.RawIOBase):
+    """Write-only, non-seekable buffer collecting zip output until it is taken as an upload part.
+
+    Zipfile detects that the buffer is not seekable and writes sizes and checksums in data descriptors after each
+    member, so the output can be sent away as soon as it is produced.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        self.buffer += data
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def take(self, size: int | None = None) -> bytes:
+        """Remove and return up to size bytes from the beginning of the buffer."""
+
+        if size is None:
+            size = len(self.buffer)
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+
+class StreamingZipUpload:
+    """Zip archive written directly into an S3 multipart upload.
+
+    Memory use is bounded by two parts, the one being uploaded and the one being filled. The upload is aborted when the
+    context exits with an exception or when the upload cannot be completed. Part size grows with the total size of
+    archived objects, so large archives still fit into the maximum number of parts.
+    """
+
+    def __init__(
+        self,
+        s3_client: S3Client,
+        bucket: str,
+        key: str,
+        total_size: int = 0,
+        part_size: int = settings.VERSION_PUBLISH_PART_SIZE,
+        chunk_size: int = settings.VERSION_PUBLISH_CHUNK_SIZE,
+    ) -> None:
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        # deflate may grow incompressible objects slightly and every member adds its headers, 1% covers both
+        self.part_size = max(part_size, math.ceil(total_size * 1.01 / MAX_PARTS))
+        self.chunk_size = chunk_size
+        self.output = ZipOutputBuffer()
+        self.zip_file = None
+        self.upload_id = None
+        self.parts: list[dict[str, Any]] = []
+        self.pending_part: asyncio.Task | None = None
+
+    async def __aenter__(self) -> 'StreamingZipUpload':
+        self.upload_id = await self.s3_client.create_multipart_upload(self.bucket, self.key)
+        self.zip_file = zipfile.ZipFile(self.output, mode='w', compression=zipfile.ZIP_DEFLATED)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None:
+            await self._abort()
+            return
+
+        try:
+            await run_in_threadpool(self.zip_file.close)
+            await self._flush(final=True)
+            await self.s3_client.complete_multipart_upload(self.bucket, self.key, self.upload_id, self.parts)
+        except BaseException:
+            await self._abort()
+            raise
+        logger.info(f'Zip file "{self.key}" uploaded to bucket "{self.bucket}" in {len(self.parts)} part(s)')
+
+    async def _abort(self) -> None:
+        if self.pending_part:
+            await asyncio.gather(self.pending_part, return_exceptions=True)
+        await self.s3_client.abort_multipart_upload(self.bucket, self.key, self.upload_id)
+        logger.info(f'Multipart upload of "{self.key}" to bucket "{self.bucket}" aborted')
+
+    async def _upload_part(self, part_number: int, body: bytes) -> None:
+        etag = await self.s3_client.upload_part(self.bucket, self.key, self.upload_id, part_number, body)
+        self.parts.append({'ETag': etag, 'PartNumber': part_number})
+
+    async def _flush(self, final: bool = False) -> None:
+        """Upload full parts from the output buffer, or everything that is left when final."""
+
+        while len(self.output.buffer) >= self.part_size or (final and self.output.buffer):
+            body = self.output.take(self.part_size)
+            if self.pending_part:
+                await self.pending_part
+            self.pending_part = asyncio.create_task(self._upload_part(len(self.parts) + 1, body))
+
+        if final and self.pending_part:
+            await self.pending_part
+            self.pending_part = None
+
+    async def write_object(
+        self, arcname: str, bucket: str, key: str, size: int | None = None, version_id: str | None = None
+    ) -> None:
+        """Stream S3 object, or specific version of it, into the archive in chunks."""
+
+        zip_info = get_zip_info(arcname)
+        zip_info.file_size = size or 0
+
+        response = await self.s3_client.get_object(bucket, key, version_id)
+        member = self.zip_file.open(zip_info, mode='w', force_zip64=size is None)
+        try:
+            async with response['Body'] as body:
+                while chunk := await body.read(self.chunk_size):
+                    await run_in_threadpool(member.write, chunk)
+                    await self._flush()
+        finally:
+            await run_in_threadpool(member.close)
+        await self._flush()
+
+    async def write_str(self, arcname: str, data: str) -> None:
+        """Add text file into the archive."""
+
+        await run_in_threadpool(self.zip_file.writestr, get_zip_info(arcname), data)
+        await self._flush()
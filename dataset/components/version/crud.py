@@ -4,10 +4,12 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from typing import Any
 from uuid import UUID
 
 from sqlalchemy import and_
-from sqlalchemy import select
+from sqlalchemy import insert
+from sqlalchemy import update
 from sqlalchemy.orm import contains_eager
 from sqlalchemy.sql import Select
 
@@ -16,6 +18,8 @@ from dataset.components.dataset.models import Dataset
 from dataset.components.exceptions import AlreadyExists
 from dataset.components.exceptions import NotFound
 from dataset.components.version.models import Version
+from dataset.components.version.models import VersionFile
+from dataset.components.version.schemas import VersionFileSchema
 
 
 class VersionCRUD(CRUD):
@@ -23,10 +27,9 @@ class VersionCRUD(CRUD):
 
     model = Version
 
-    @property
-    def select_query(self) -> Select:
-        """Return base select including join with Dataset model."""
-        return select(self.model).join(Dataset).options(contains_eager(self.model.dataset))
+    def join_relationships(self, statement: Select, entity: Any) -> Select:
+        """Join Dataset model."""
+        return statement.join(Dataset, entity.dataset_id == Dataset.id).options(contains_eager(entity.dataset))
 
     async def get_dataset_version_by_version_number(self, dataset_id: UUID, version: str) -> Version:
         """Retrieve version by specific dataset id and version number."""
@@ -51,3 +54,30 @@ class VersionCRUD(CRUD):
         except NotFound:
             return
         raise AlreadyExists
+
+    async def set_location(self, version_id: UUID, location: str) -> None:
+        """Set location of the version zip once it is built."""
+        statement = update(self.model).where(self.model.id == version_id).values(location=location)
+        await self._update_one(statement)
+
+
+class VersionFileCRUD(CRUD):
+    """CRUD for managing version file database models."""
+
+    model = VersionFile
+
+    async def create_many(self, entries: list[VersionFileSchema]) -> None:
+        """Create multiple entries with a single statement."""
+        if not entries:
+            return
+        await self.execute(insert(self.model), [entry.dict() for entry in entries])
+
+    async def list_by_version_id(self, version_id: UUID) -> list[VersionFile]:
+        """Retrieve all files of the version ordered by key."""
+        statement = self.select_query.where(self.model.version_id == version_id).order_by(self.model.key)
+        return await self._retrieve_many(statement)
+
+    async def get_version_file(self, version_id: UUID, file_id: str) -> VersionFile:
+        """Retrieve file of the version by metadata item id."""
+        statement = self.select_query.where(and_(self.model.version_id == version_id, self.model.file_id == file_id))
+        return await self._retrieve_one(statement)
@@ -16,6 +16,7 @@ from dataset.components.object_storage.s3 import S3Client
 from dataset.components.version.activity_log import VersionActivityLog
 from dataset.components.version.activity_log import get_version_activity_log
 from dataset.components.version.crud import VersionCRUD
+from dataset.components.version.crud import VersionFileCRUD
 from dataset.components.version.publisher import VersionPublisher
 from dataset.dependencies import get_db_session
 from dataset.dependencies.redis import get_redis_client
@@ -30,9 +31,16 @@ def get_version_crud(db_session: AsyncSession = Depends(get_db_session)) -> Vers
     return VersionCRUD(db_session)
 
 
+def get_version_file_crud(db_session: AsyncSession = Depends(get_db_session)) -> VersionFileCRUD:
+    """Return an instance of VersionFileCRUD as a dependency."""
+
+    return VersionFileCRUD(db_session)
+
+
 async def get_version_publisher(
     redis_client: StrictRedis = Depends(get_redis_client),
     version_crud: VersionCRUD = Depends(get_version_crud),
+    version_file_crud: VersionFileCRUD = Depends(get_version_file_crud),
     locking_manager: LockingManager = Depends(get_locking_manager),
     folder_crud: FolderCRUD = Depends(get_folder_crud),
     metadata_service: MetadataService = Depends(get_metadata_service),
@@ -41,5 +49,12 @@ async def get_version_publisher(
 ) -> VersionPublisher:
     """Return an instance of VersionPublisher as a dependency."""
     return VersionPublisher(
-        redis_client, version_crud, locking_manager, folder_crud, metadata_service, s3_client, activity_log
+        redis_client,
+        version_crud,
+        version_file_crud,
+        locking_manager,
+        folder_crud,
+        metadata_service,
+        s3_client,
+        activity_log,
     )
@@ -0,0 +1,21 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from dataset.components.exceptions import BadRequest
+
+
+class VersionNotSnapshot(BadRequest):
+    """Raised when files are requested for version that does not pin them."""
+
+    domain: str = 'version'
+
+    @property
+    def code(self) -> str:
+        return 'not_snapshot'
+
+    @property
+    def details(self) -> str:
+        return 'Files are only available for snapshot versions'
@@ -10,6 +10,7 @@ from sqlalchemy.sql import Select
 
 from dataset.components.filtering import Filtering
 from dataset.components.version.models import Version
+from dataset.components.version.models import VersionFile
 
 
 class VersionFiltering(Filtering):
@@ -24,3 +25,17 @@ class VersionFiltering(Filtering):
             statement = statement.where(model.dataset_id == self.dataset_id)
 
         return statement
+
+
+class VersionFileFiltering(Filtering):
+    """Version file filtering control parameters."""
+
+    version_id: UUID | None = None
+
+    def apply(self, statement: Select, model: type[VersionFile]) -> Select:
+        """Return statement with applied filtering."""
+
+        if self.version_id:
+            statement = statement.where(model.version_id == self.version_id)
+
+        return statement
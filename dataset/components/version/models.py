@@ -7,6 +7,8 @@
 from pathlib import Path
 from uuid import uuid4
 
+from sqlalchemy import BigInteger
+from sqlalchemy import Boolean
 from sqlalchemy import Column
 from sqlalchemy import ForeignKey
 from sqlalchemy import String
@@ -33,12 +35,35 @@ class Version(DBModel):
     created_at = Column(TIMESTAMP(timezone=True), default=func.now(), nullable=False)
     location = Column(String())
     notes = Column(String())
+    snapshot = Column(Boolean(), default=False, server_default='false', nullable=False)
 
     dataset = relationship('Dataset', back_populates='versions')
     sharing_requests = relationship('VersionSharingRequest', back_populates='version', cascade='all,delete-orphan')
+    files = relationship('VersionFile', back_populates='version', cascade='all,delete-orphan')
 
     @property
     def filename(self) -> str:
         """Return the filename of the version zip file."""
 
+        if self.location is None:
+            return f'{self.dataset_code}_{self.version}.zip'
+
         return Path(self.location).name
+
+
+class VersionFile(DBModel):
+    """File of a snapshot version pinned to the S3 object version it had when the version was published."""
+
+    __tablename__ = 'version_files'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    version_id = Column(UUID(as_uuid=True), ForeignKey('version.id', ondelete='CASCADE'), index=True, nullable=False)
+    file_id = Column(String(), nullable=False)
+    path = Column(String(), nullable=False)
+    bucket = Column(String(), nullable=False)
+    key = Column(String(), nullable=False)
+    object_version_id = Column(String(), nullable=True)
+    size = Column(BigInteger(), nullable=False)
+    etag = Column(String(), nullable=False)
+
+    version = relationship('Version', back_populates='files')
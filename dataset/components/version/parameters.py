@@ -19,6 +19,13 @@ class VersionSortByFields(SortByFields):
     CREATED_AT = 'created_at'
 
 
+class VersionFileSortByFields(SortByFields):
+    """Fields by which version files can be sorted."""
+
+    PATH = 'path'
+    SIZE = 'size'
+
+
 class VersionFilterParameters(FilterParameters):
     """Query parameters for versions filtering."""
 
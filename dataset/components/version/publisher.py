@@ -4,11 +4,15 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import asyncio
+import io
 import json
 import os
 import shutil
 import time
+import zipfile
 from datetime import datetime
+from typing import Any
 from uuid import UUID
 
 from redis.asyncio import StrictRedis
@@ -21,8 +25,13 @@ from dataset.components.folder.crud import FolderCRUD
 from dataset.components.object_storage.s3 import S3Client
 from dataset.components.schema.models import SchemaDataset
 from dataset.components.version.activity_log import VersionActivityLog
+from dataset.components.version.archive import StreamingZipUpload
+from dataset.components.version.archive import get_zip_info
 from dataset.components.version.crud import VersionCRUD
+from dataset.components.version.crud import VersionFileCRUD
+from dataset.components.version.models import Version
 from dataset.components.version.schemas import VersionCreateSchema
+from dataset.components.version.schemas import VersionFileSchema
 from dataset.components.version.schemas import VersionSchema
 from dataset.config import get_settings
 from dataset.logger import logger
@@ -31,6 +40,48 @@ from dataset.services.metadata import MetadataService
 settings = get_settings()
 
 
+class NotEnoughDiskSpace(Exception):
+    """Raised when dataset files do not fit into the disk budget for publishing."""
+
+
+class ObjectVersionMissing(Exception):
+    """Raised when S3 object has no version to pin in snapshot, the bucket does not have versioning enabled."""
+
+    def __init__(self, bucket: str, key: str) -> None:
+        super().__init__(f'Object "{key}" in bucket "{bucket}" has no version, bucket versioning is not enabled')
+
+
+class DiskBudget:
+    """Disk space for publishing shared by all jobs running in the process.
+
+    Jobs reserve space for downloaded files and the zip before they start downloading and count bytes as they are
+    written. Space reserved but not written yet is subtracted from free space of the disk, so concurrent jobs cannot
+    overcommit it.
+    """
+
+    def __init__(self) -> None:
+        self.reserved = 0
+        self.written = 0
+
+    def get_available(self, path: str) -> int:
+        if settings.VERSION_PUBLISH_DISK_BUDGET:
+            return settings.VERSION_PUBLISH_DISK_BUDGET - self.reserved
+        return shutil.disk_usage(path).free - (self.reserved - self.written)
+
+    def reserve(self, path: str, size: int) -> None:
+        available = self.get_available(path)
+        if size > available:
+            raise NotEnoughDiskSpace(f'Publishing requires {size} bytes of disk, {available} bytes available')
+        self.reserved += size
+
+    def release(self, reserved: int, written: int) -> None:
+        self.reserved -= reserved
+        self.written -= written
+
+
+disk_budget = DiskBudget()
+
+
 class VersionPublisher:
     """Class that runs in background, creating the zip in minio and a new version in the database."""
 
@@ -40,6 +91,7 @@ class VersionPublisher:
         self,
         redis_client: StrictRedis,
         version_crud: VersionCRUD,
+        version_file_crud: VersionFileCRUD,
         locking_manager: LockingManager,
         folder_crud: FolderCRUD,
         metadata_service: MetadataService,
@@ -49,6 +101,7 @@ class VersionPublisher:
         self.dataset_files = []
         self.s3_client = s3_client
         self.version_crud = version_crud
+        self.version_file_crud = version_file_crud
         self.locking_manager = locking_manager
         self.folder_crud = folder_crud
         self.metadata_service = metadata_service
@@ -57,6 +110,10 @@ class VersionPublisher:
         self.job_key = None
         self.zip_path = None
         self.tmp_folder = self.TMP_BASE + str(time.time())
+        self.progress = {'files_done': 0, 'files_total': 0, 'bytes_done': 0, 'bytes_total': 0}
+        self.progress_reported_at = 0.0
+        self.disk_reserved = 0
+        self.disk_written = 0
 
     async def create_job(self, job_key: str) -> None:
         """Ensure only one version is created by dataset at time."""
@@ -67,16 +124,33 @@ class VersionPublisher:
                 raise AlreadyExists()
         self.job_key = job_key
 
+    async def start_job(self, job_key: str) -> None:
+        """Ensure the job is not already running and mark it in progress until the worker picks it up."""
+        await self.create_job(job_key)
+        await self._update_status('inprogress')
+
     async def _update_status(self, status, error_msg=''):
         """Updates job status in redis."""
         redis_status = json.dumps(
             {
                 'status': status,
                 'error_msg': error_msg,
+                'progress': self.progress,
             }
         )
         await self.redis_client.set(self.job_key, redis_status, ex=1 * 60 * 60)
 
+    async def _advance_progress(self, bytes_done: int) -> None:
+        """Count downloaded file and report progress at most once per progress interval."""
+        self.progress['files_done'] += 1
+        self.progress['bytes_done'] += bytes_done
+
+        now = time.monotonic()
+        finished = self.progress['files_done'] == self.progress['files_total']
+        if finished or now - self.progress_reported_at >= settings.VERSION_PUBLISH_PROGRESS_INTERVAL:
+            self.progress_reported_at = now
+            await self._update_status('inprogress')
+
     def _parse_minio_location(self, location):
         """Extract bucket and object key from minio path."""
 
@@ -84,11 +158,19 @@ class VersionPublisher:
         _, bucket, obj_path = tuple(minio_path.split('/', 2))
         return {'bucket': bucket, 'path': obj_path}
 
-    async def _add_schemas(self, dataset_id: str):
-        """Saves schema json files to folder that will zipped."""
+    def _get_file_path(self, file: dict[str, Any], location_data: dict[str, str]) -> str:
+        """Return path of the file within the version, objects in the id layout are placed by display path."""
+
+        if not location_data['path'].startswith(f'{settings.DATASET_OBJECT_FOLDER}/'):
+            return location_data['path']
+
+        parent_path = file.get('parent_path')
+        path = f'{parent_path}/{file["name"]}' if parent_path else file['name']
+        return f'{settings.DATASET_FILE_FOLDER}/{path}'
+
+    async def _get_schemas(self, dataset_id: str) -> list[tuple[str, str]]:
+        """Return file names and json content of published schemas that are added to the version."""
         db_session = self.version_crud.session
-        if not os.path.isdir(self.tmp_folder):
-            os.makedirs(self.tmp_folder + '/data')
 
         query = select(SchemaDataset).where(SchemaDataset.dataset_id == dataset_id, SchemaDataset.is_draft.is_(False))
         query_default = query.where(SchemaDataset.standard == 'default')
@@ -97,86 +179,312 @@ class VersionPublisher:
         schemas_default = (await db_session.execute(query_default)).scalars().all()
         schemas_open_minds = (await db_session.execute(query_open_minds)).scalars().all()
 
-        for schema in schemas_default:
-            with open(self.tmp_folder + '/default_' + schema.name, 'w') as w:
-                w.write(json.dumps(schema.content, indent=4, ensure_ascii=False))
+        schema_files = []
+        for prefix, schemas in (('default_', schemas_default), ('openMINDS_', schemas_open_minds)):
+            for schema in schemas:
+                schema_files.append((prefix + schema.name, json.dumps(schema.content, indent=4, ensure_ascii=False)))
+        return schema_files
 
-        for schema in schemas_open_minds:
-            with open(self.tmp_folder + '/openMINDS_' + schema.name, 'w') as w:
-                w.write(json.dumps(schema.content, indent=4, ensure_ascii=False))
+    async def _add_schemas(self, dataset_id: str):
+        """Saves schema json files to folder that will zipped."""
+        if not os.path.isdir(self.tmp_folder):
+            os.makedirs(self.tmp_folder + '/data')
+
+        for file_name, content in await self._get_schemas(dataset_id):
+            with open(self.tmp_folder + '/' + file_name, 'w') as w:
+                w.write(content)
+
+    async def publish(self, dataset_code: str, dataset_id: UUID, version_data: VersionCreateSchema) -> Exception | None:
+        """Background job that creates the zip all files and create the dataset version.
 
-    async def publish(self, dataset_code: str, dataset_id: UUID, version_data: VersionCreateSchema) -> None:
-        """Background job that creates the zip all files and create the dataset version."""
+        Return the error that failed the publishing before the version was committed, so the job can be retried.
+        """
 
         await self._update_status('inprogress')
         self.zip_path = f'{self.TMP_BASE}{dataset_code}_{str(datetime.now())}'
-        locked_node = []
+        locked_node, error, committed = [], None, False
         try:
             level1_nodes = await self.folder_crud.get_children(dataset_code, None)
             locked_node, err = await self.locking_manager.recursive_lock_publish(level1_nodes)
             if err:
                 logger.error('Error occured while calling recursive_lock_publish.')
                 raise err
-            self.dataset_files = await self.metadata_service.get_files(dataset_code)
-            await self._download_dataset_files()
-            await self._add_schemas(str(dataset_id))
-            await run_in_threadpool(self._zip_files)
-            minio_location = await self._upload_version(dataset_code)
-            version_schema = VersionSchema(
-                notes=version_data.notes,
-                created_by=version_data.operator,
-                version=version_data.version,
-                dataset_code=dataset_code,
-                dataset_id=dataset_id,
-                location=minio_location,
-            )
-            dataset_version = await self.version_crud.create(version_schema)
+            dataset_tree = await self.folder_crud.get_tree(dataset_code)
+            self.dataset_files = dataset_tree.get_files()
+            if version_data.snapshot:
+                dataset_version = await self._create_snapshot(dataset_code, dataset_id, version_data)
+            else:
+                if settings.VERSION_PUBLISH_STREAMING:
+                    minio_location = await self._stream_version(dataset_code, str(dataset_id))
+                else:
+                    await self._download_dataset_files()
+                    await self._add_schemas(str(dataset_id))
+                    await run_in_threadpool(self._zip_files)
+                    self._count_written(os.path.getsize(f'{self.zip_path}.zip'))
+                    minio_location = await self._upload_version(dataset_code)
+                version_schema = VersionSchema(
+                    notes=version_data.notes,
+                    created_by=version_data.operator,
+                    version=version_data.version,
+                    dataset_code=dataset_code,
+                    dataset_id=dataset_id,
+                    location=minio_location,
+                )
+                dataset_version = await self.version_crud.create(version_schema, load_relationships=True)
+            self.locking_manager.check_leases()
             await self.version_crud.commit()
+            committed = True
 
             await self.activity_log.send_publish_version_succeed(dataset_version)
             await self._update_status('success')
             logger.info(f'Successfully published {dataset_id} version {version_data.version}')
-        except Exception:
+        except Exception as e:
             error_msg = f'Error publishing {dataset_id}'
             logger.exception(error_msg)
             await self._update_status('failed', error_msg=error_msg)
+            if not committed:
+                error = e
         finally:
-            for resource_key, operation in locked_node:
-                await self.locking_manager.unlock_resource(resource_key, operation)
+            try:
+                await self.locking_manager.unlock_resources(locked_node)
+            except Exception:
+                logger.exception('Error occurred while unlocking resources.')
+            self.folder_crud.reset_trees()
+            self._remove_local_files()
+
+        return error
+
+    def _count_written(self, size: int) -> None:
+        """Count bytes written to disk, metadata may understate file sizes so the reservation is checked again."""
+
+        self.disk_written += size
+        disk_budget.written += size
+        if self.disk_written > self.disk_reserved:
+            raise NotEnoughDiskSpace(f'Publishing wrote {self.disk_written} bytes, {self.disk_reserved} bytes reserved')
+
+    def _remove_local_files(self) -> None:
+        """Remove downloaded files and the zip and release their disk reservation."""
+
+        shutil.rmtree(self.tmp_folder, ignore_errors=True)
+        if self.zip_path and os.path.exists(f'{self.zip_path}.zip'):
+            os.remove(f'{self.zip_path}.zip')
+        disk_budget.release(self.disk_reserved, self.disk_written)
+        self.disk_reserved = self.disk_written = 0
+
+    async def _download_file(self, file: dict[str, Any], semaphore: asyncio.Semaphore) -> str:
+        """Download file from minio, retrying failed attempts."""
+
+        location_data = self._parse_minio_location(file['storage']['location_uri'])
+        local_path = self.tmp_folder + '/' + self._get_file_path(file, location_data)
+        async with semaphore:
+            for attempt in range(1, settings.VERSION_PUBLISH_DOWNLOAD_ATTEMPTS + 1):
+                try:
+                    await self.s3_client.download_file(location_data['bucket'], location_data['path'], local_path)
+                    break
+                except Exception:
+                    if attempt == settings.VERSION_PUBLISH_DOWNLOAD_ATTEMPTS:
+                        raise
+                    logger.warning(f'Download of "{location_data["path"]}" failed on attempt {attempt}, retrying')
+                    await asyncio.sleep(settings.VERSION_PUBLISH_DOWNLOAD_RETRY_DELAY * attempt)
+
+        self._count_written(os.path.getsize(local_path))
+        await self._advance_progress(file.get('size') or 0)
+        return local_path
 
     async def _download_dataset_files(self):
-        """Download files from minio."""
+        """Download files from minio concurrently."""
 
-        file_paths = []
-        for file in self.dataset_files:
-            location_data = self._parse_minio_location(file['storage']['location_uri'])
-            await self.s3_client.download_file(
-                location_data['bucket'], location_data['path'], self.tmp_folder + '/' + location_data['path']
-            )
-            file_paths.append(self.tmp_folder + '/' + location_data['path'])
+        bytes_total = sum(file.get('size') or 0 for file in self.dataset_files)
+        # downloaded files and the zip created from them are on disk at the same time
+        disk_budget.reserve(self.TMP_BASE, bytes_total * 2)
+        self.disk_reserved = bytes_total * 2
+        self.progress.update(files_done=0, files_total=len(self.dataset_files), bytes_done=0, bytes_total=bytes_total)
+        await self._update_status('inprogress')
+
+        semaphore = asyncio.Semaphore(settings.VERSION_PUBLISH_DOWNLOAD_CONCURRENCY)
+        tasks = [asyncio.create_task(self._download_file(file, semaphore)) for file in self.dataset_files]
+        try:
+            file_paths = await asyncio.gather(*tasks)
+        except Exception:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
 
         logger.info(f'{len(file_paths)} files downloaded to {self.tmp_folder}')
 
         return file_paths
 
     def _zip_files(self):
-        """Create zip file."""
+        """Create zip file that only depends on downloaded files, not on when or in which order they were downloaded.
+
+        Entries are added in sorted order of their relative paths with fixed timestamp and permissions.
+        """
 
-        shutil.make_archive(self.zip_path, 'zip', self.tmp_folder)
+        arcnames = []
+        for dirpath, dirnames, filenames in os.walk(self.tmp_folder):
+            relpath = os.path.relpath(dirpath, self.tmp_folder)
+            arcnames += [os.path.normpath(os.path.join(relpath, name)) + '/' for name in dirnames]
+            arcnames += [os.path.normpath(os.path.join(relpath, name)) for name in filenames]
+
+        with zipfile.ZipFile(f'{self.zip_path}.zip', 'w', compression=zipfile.ZIP_DEFLATED) as zip_file:
+            for arcname in sorted(arcnames):
+                zip_info = get_zip_info(arcname)
+                if zip_info.is_dir():
+                    zip_file.writestr(zip_info, b'')
+                    continue
+                path = os.path.join(self.tmp_folder, arcname)
+                zip_info.file_size = os.path.getsize(path)
+                with open(path, 'rb') as source, zip_file.open(zip_info, mode='w') as member:
+                    shutil.copyfileobj(source, member, settings.VERSION_PUBLISH_CHUNK_SIZE)
         logger.info(f'Zip file "{self.zip_path}" created')
 
         return self.zip_path
 
+    def _get_version_file_path(self) -> str:
+        """Return object key of the version zip within dataset bucket."""
+
+        return 'versions/' + self.zip_path.split('/')[-1] + '.zip'
+
+    def _get_minio_location(self, bucket: str, file_path: str) -> str:
+        """Return minio location of the version zip."""
+
+        minio_http = ('https://' if settings.S3_INTERNAL_HTTPS else 'http://') + settings.S3_INTERNAL
+        return f'minio://{minio_http}/{bucket}/{file_path}'
+
     async def _upload_version(self, dataset_code: str):
         """Upload version zip to minio."""
 
         bucket = dataset_code
-        file_path = 'versions/' + self.zip_path.split('/')[-1] + '.zip'
+        file_path = self._get_version_file_path()
         with open(f'{self.zip_path}.zip', mode='rb') as file:
             await self.s3_client.upload_file(bucket, file_path, file)
 
         logger.info(f'Zip file "{file_path}" uploaded to bucket "{bucket}"')
 
-        minio_http = ('https://' if settings.S3_INTERNAL_HTTPS else 'http://') + settings.S3_INTERNAL
-        minio_location = f'minio://{minio_http}/{bucket}/{file_path}'
-        return minio_location
+        return self._get_minio_location(bucket, file_path)
+
+    async def _stream_version(self, dataset_code: str, dataset_id: str) -> str:
+        """Stream dataset files and schemas into version zip uploaded to minio without local files."""
+
+        bucket = dataset_code
+        file_path = self._get_version_file_path()
+        bytes_total = sum(file.get('size') or 0 for file in self.dataset_files)
+        self.progress.update(files_done=0, files_total=len(self.dataset_files), bytes_done=0, bytes_total=bytes_total)
+        async with StreamingZipUpload(self.s3_client, bucket, file_path, bytes_total) as archive:
+            for file in self.dataset_files:
+                location_data = self._parse_minio_location(file['storage']['location_uri'])
+                await archive.write_object(
+                    self._get_file_path(file, location_data),
+                    location_data['bucket'],
+                    location_data['path'],
+                    file.get('size'),
+                )
+                await self._advance_progress(file.get('size') or 0)
+            for file_name, content in await self._get_schemas(dataset_id):
+                await archive.write_str(file_name, content)
+
+        logger.info(f'{len(self.dataset_files)} files streamed into zip file "{file_path}"')
+
+        return self._get_minio_location(bucket, file_path)
+
+    async def _get_object_version(
+        self, file_id: str, path: str, bucket: str, key: str, semaphore: asyncio.Semaphore
+    ) -> dict[str, Any]:
+        """Return current version, size and etag of S3 object."""
+
+        async with semaphore:
+            head = await self.s3_client.head_object(bucket, key)
+
+        object_version_id = head.get('VersionId')
+        if object_version_id in (None, 'null'):
+            raise ObjectVersionMissing(bucket, key)
+
+        await self._advance_progress(head['ContentLength'])
+        return {
+            'file_id': file_id,
+            'path': path,
+            'bucket': bucket,
+            'key': key,
+            'object_version_id': object_version_id,
+            'size': head['ContentLength'],
+            'etag': head['ETag'].strip('"'),
+        }
+
+    async def _create_snapshot(self, dataset_code: str, dataset_id: UUID, version_data: VersionCreateSchema) -> Version:
+        """Create version that pins dataset files to their current S3 object versions instead of copying them.
+
+        Schemas live in the database and may change, so their content is stored as objects under the version prefix.
+        """
+
+        objects = []
+        for file in self.dataset_files:
+            location_data = self._parse_minio_location(file['storage']['location_uri'])
+            file_path = self._get_file_path(file, location_data)
+            objects.append((file['id'], file_path, location_data['bucket'], location_data['path']))
+
+        schema_prefix = f'versions/{dataset_code}_{version_data.version}/'
+        for file_name, content in await self._get_schemas(str(dataset_id)):
+            await self.s3_client.upload_file(dataset_code, schema_prefix + file_name, io.BytesIO(content.encode()))
+            objects.append((file_name, file_name, dataset_code, schema_prefix + file_name))
+
+        self.progress.update(files_done=0, files_total=len(objects), bytes_done=0, bytes_total=0)
+        semaphore = asyncio.Semaphore(settings.VERSION_PUBLISH_DOWNLOAD_CONCURRENCY)
+        object_versions = await asyncio.gather(*[self._get_object_version(*obj, semaphore) for obj in objects])
+
+        version_schema = VersionSchema(
+            notes=version_data.notes,
+            created_by=version_data.operator,
+            version=version_data.version,
+            dataset_code=dataset_code,
+            dataset_id=dataset_id,
+            location=None,
+            snapshot=True,
+        )
+        dataset_version = await self.version_crud.create(version_schema, load_relationships=True)
+        await self.version_file_crud.create_many(
+            [VersionFileSchema(version_id=dataset_version.id, **object_version) for object_version in object_versions]
+        )
+
+        logger.info(f'{len(object_versions)} files pinned in snapshot version "{dataset_version.id}"')
+
+        return dataset_version
+
+    async def build_archive(self, version_id: UUID) -> Exception | None:
+        """Background job that builds the zip of snapshot version from pinned object versions.
+
+        Return the error that failed the build.
+        """
+
+        await self._update_status('inprogress')
+        error = None
+        try:
+            version = await self.version_crud.retrieve_by_id(version_id)
+            version_files = await self.version_file_crud.list_by_version_id(version_id)
+            bytes_total = sum(version_file.size for version_file in version_files)
+            self.progress.update(files_done=0, files_total=len(version_files), bytes_done=0, bytes_total=bytes_total)
+
+            bucket = version.dataset_code
+            file_path = f'versions/{version.dataset_code}_{version.version}.zip'
+            async with StreamingZipUpload(self.s3_client, bucket, file_path, bytes_total) as archive:
+                for version_file in version_files:
+                    await archive.write_object(
+                        version_file.path,
+                        version_file.bucket,
+                        version_file.key,
+                        version_file.size,
+                        version_file.object_version_id,
+                    )
+                    await self._advance_progress(version_file.size)
+
+            await self.version_crud.set_location(version_id, self._get_minio_location(bucket, file_path))
+            await self.version_crud.commit()
+            await self._update_status('success')
+            logger.info(f'Successfully built archive of version "{version_id}"')
+        except Exception as e:
+            error_msg = f'Error building archive of version {version_id}'
+            logger.exception(error_msg)
+            await self._update_status('failed', error_msg=error_msg)
+            error = e
+
+        return error
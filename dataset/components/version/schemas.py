@@ -22,6 +22,7 @@ class VersionCreateSchema(BaseSchema):
     operator: str
     notes: constr(max_length=250)
     version: constr(regex=settings.DATASET_VERSION_NUMBER_REGEX, strip_whitespace=True)
+    snapshot: bool = False
 
 
 class VersionSchema(BaseSchema):
@@ -29,10 +30,11 @@ class VersionSchema(BaseSchema):
 
     dataset_id: UUID
     dataset_code: str
-    location: str
+    location: str | None = None
     created_by: str
     notes: str
     version: str
+    snapshot: bool = False
 
 
 class VersionResponseSchema(VersionSchema):
@@ -49,3 +51,31 @@ class VersionListResponseSchema(ListResponseSchema):
     """Legacy schema for multiple versions in response."""
 
     result: list[VersionResponseSchema]
+
+
+class VersionFileSchema(BaseSchema):
+    """General schema for file of snapshot version."""
+
+    version_id: UUID
+    file_id: str
+    path: str
+    bucket: str
+    key: str
+    object_version_id: str | None
+    size: int
+    etag: str
+
+
+class VersionFileResponseSchema(VersionFileSchema):
+    """General schema for single version file response."""
+
+    id: UUID
+
+    class Config:
+        orm_mode = True
+
+
+class VersionFileListResponseSchema(ListResponseSchema):
+    """Schema for multiple version files in response."""
+
+    result: list[VersionFileResponseSchema]
@@ -10,7 +10,6 @@ from uuid import UUID
 
 import jwt
 from fastapi import APIRouter
-from fastapi import BackgroundTasks
 from fastapi import Depends
 from fastapi.requests import Request
 from fastapi.security import HTTPAuthorizationCredentials
@@ -19,10 +18,13 @@ from redis.asyncio import StrictRedis
 
 from dataset.components.dataset.crud import DatasetCRUD
 from dataset.components.dataset.dependencies import get_dataset_crud
+from dataset.components.exceptions import AlreadyExists
 from dataset.components.exceptions import NotFound
 from dataset.components.exceptions import Unauthorized
 from dataset.components.file.crud import FileCRUD
 from dataset.components.file.dependencies import get_file_crud
+from dataset.components.job.dispatcher import JobDispatcher
+from dataset.components.job.schemas import JobType
 from dataset.components.object_storage.s3 import S3Client
 from dataset.components.parameters import PageParameters
 from dataset.components.parameters import SortParameters
@@ -31,12 +33,18 @@ from dataset.components.schemas import LegacyResponseSchema
 from dataset.components.version.activity_log import VersionActivityLog
 from dataset.components.version.activity_log import get_version_activity_log
 from dataset.components.version.crud import VersionCRUD
+from dataset.components.version.crud import VersionFileCRUD
 from dataset.components.version.dependencies import get_version_crud
+from dataset.components.version.dependencies import get_version_file_crud
 from dataset.components.version.dependencies import get_version_publisher
+from dataset.components.version.exceptions import VersionNotSnapshot
+from dataset.components.version.filtering import VersionFileFiltering
+from dataset.components.version.parameters import VersionFileSortByFields
 from dataset.components.version.parameters import VersionFilterParameters
 from dataset.components.version.parameters import VersionSortByFields
 from dataset.components.version.publisher import VersionPublisher
 from dataset.components.version.schemas import VersionCreateSchema
+from dataset.components.version.schemas import VersionFileListResponseSchema
 from dataset.components.version.schemas import VersionListResponseSchema
 from dataset.components.version.schemas import VersionResponseSchema
 from dataset.dependencies.redis import get_redis_client
@@ -54,16 +62,23 @@ router = APIRouter(prefix='/dataset', tags=['Version'])
 async def publish(
     dataset_id: str,
     data: VersionCreateSchema,
-    background_tasks: BackgroundTasks,
     dataset_crud: DatasetCRUD = Depends(get_dataset_crud),
     version_crud: VersionCRUD = Depends(get_version_crud),
     version_published: VersionPublisher = Depends(get_version_publisher),
+    job_dispatcher: JobDispatcher = Depends(),
 ) -> LegacyResponseSchema:
     """Create a version in Minio."""
     await version_crud.check_duplicate_versions(data.version, dataset_id)
     dataset = await dataset_crud.retrieve_by_id(dataset_id)
-    await version_published.create_job(str(dataset_id))
-    background_tasks.add_task(version_published.publish, dataset.code, dataset.id, data)
+    await version_published.start_job(str(dataset_id))
+    await job_dispatcher.dispatch(
+        JobType.PUBLISH_VERSION,
+        {'dataset_id': str(dataset.id), 'version_data': data.dict()},
+        version_published.publish,
+        dataset.code,
+        dataset.id,
+        data,
+    )
     return LegacyResponseSchema(result={'status_id': dataset_id})
 
 
@@ -126,6 +141,37 @@ async def get_version(
     return VersionResponseSchema.from_orm(version)
 
 
+@router.get(
+    '/versions/{version_id}/files',
+    response_model=VersionFileListResponseSchema,
+    summary='Get snapshot version files',
+)
+async def list_version_files(
+    version_id: UUID,
+    page_parameters: PageParameters = Depends(),
+    sort_parameters: SortParameters.with_sort_by_fields(VersionFileSortByFields) = Depends(),
+    version_crud: VersionCRUD = Depends(get_version_crud),
+    version_file_crud: VersionFileCRUD = Depends(get_version_file_crud),
+) -> VersionFileListResponseSchema:
+    """Get list of files pinned in snapshot version."""
+    async with version_crud:
+        version = await version_crud.retrieve_by_id(version_id)
+    if not version.snapshot:
+        raise VersionNotSnapshot()
+
+    filtering = VersionFileFiltering(version_id=version_id)
+    sorting = sort_parameters.to_sorting()
+    if not sorting:
+        sorting.field = VersionFileSortByFields.PATH.value
+    pagination = page_parameters.to_pagination()
+
+    async with version_file_crud:
+        page = await version_file_crud.paginate(pagination, sorting, filtering)
+    response = VersionFileListResponseSchema.from_page(page)
+
+    return response
+
+
 def get_operator(credentials: Annotated[HTTPAuthorizationCredentials, Depends(HTTPBearer())]) -> str:
     """Get operator from the authorization header."""
 
@@ -143,6 +189,33 @@ def get_network(request: Request) -> Network:
     return Network.from_headers(request.headers)
 
 
+@router.get(
+    '/versions/{version_id}/files/{file_id}/download/pre',
+    summary='Download file of snapshot version',
+    response_model=LegacyResponseSchema,
+)
+async def download_version_file_url(
+    version_id: UUID,
+    file_id: str,
+    version_crud: VersionCRUD = Depends(get_version_crud),
+    version_file_crud: VersionFileCRUD = Depends(get_version_file_crud),
+    s3_client: S3Client = Depends(get_s3_client),
+    activity_log: VersionActivityLog = Depends(get_version_activity_log),
+    operator: str = Depends(get_operator),
+    network: Network = Depends(get_network),
+) -> LegacyResponseSchema:
+    """Get download url for the object version pinned in snapshot version."""
+
+    version = await version_crud.retrieve_by_id(version_id)
+    version_file = await version_file_crud.get_version_file(version_id, file_id)
+    presigned_url = await s3_client.get_download_presigned_url(
+        version_file.bucket, version_file.key, version_file.object_version_id
+    )
+    await activity_log.send_version_file_download_event(version, version_file, operator, network.origin)
+
+    return LegacyResponseSchema(result={'source': presigned_url})
+
+
 @router.get(
     '/{dataset_id}/download/pre',
     summary='Download dataset version',
@@ -157,10 +230,30 @@ async def download_url(
     activity_log: VersionActivityLog = Depends(get_version_activity_log),
     operator: str = Depends(get_operator),
     network: Network = Depends(get_network),
+    version_published: VersionPublisher = Depends(get_version_publisher),
+    job_dispatcher: JobDispatcher = Depends(),
 ) -> LegacyResponseSchema:
-    """Get download url for dataset version."""
+    """Get download url for dataset version.
+
+    Zip of snapshot version is built on first request, the build status is available under returned status id.
+    """
 
     version = await version_crud.get_version(dataset_id, version)
+    if version.location is None:
+        status_id = f'archive-{version.id}'
+        try:
+            await version_published.start_job(status_id)
+        except AlreadyExists:
+            return LegacyResponseSchema(result={'source': None, 'status_id': status_id})
+
+        await job_dispatcher.dispatch(
+            JobType.BUILD_VERSION_ARCHIVE,
+            {'version_id': str(version.id), 'job_key': status_id},
+            version_published.build_archive,
+            version.id,
+        )
+        return LegacyResponseSchema(result={'source': None, 'status_id': status_id})
+
     minio_dict = file_crud._parse_location(version.location)
     presigned_url = await s3_client.get_download_presigned_url(minio_dict['bucket'], minio_dict['path'])
     await activity_log.send_version_download_event(version, operator, network.origin)
@@ -5,9 +5,9 @@
 # You may not use this file except in compliance with the License.
 
 from typing import Annotated
+from typing import Any
 
 from fastapi import Depends
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import contains_eager
 from sqlalchemy.sql import Select
@@ -24,15 +24,13 @@ class VersionSharingRequestCRUD(CRUD):
 
     model = VersionSharingRequest
 
-    @property
-    def select_query(self) -> Select:
-        """Return base select including join with Version and Dataset models."""
+    def join_relationships(self, statement: Select, entity: Any) -> Select:
+        """Join Version and Dataset models."""
 
         return (
-            select(self.model)
-            .join(Version)
-            .join(Dataset)
-            .options(contains_eager(self.model.version).contains_eager(Version.dataset))
+            statement.join(Version, entity.version_id == Version.id)
+            .join(Dataset, Version.dataset_id == Dataset.id)
+            .options(contains_eager(entity.version).contains_eager(Version.dataset))
         )
 
 
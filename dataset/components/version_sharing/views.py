@@ -74,7 +74,7 @@ async def create_version_sharing_request(
     """Create a new Version Sharing Request."""
 
     async with version_sharing_request_crud:
-        version_sharing_request = await version_sharing_request_crud.create(body)
+        version_sharing_request = await version_sharing_request_crud.create(body, load_relationships=True)
 
     await version_sharing_activity_log.send_sharing_request_update(version_sharing_request)
 
@@ -95,7 +95,9 @@ async def update_version_sharing_request(
     """Update a Version Sharing Request."""
 
     async with version_sharing_request_crud:
-        version_sharing_request = await version_sharing_request_crud.update(version_sharing_request_id, body)
+        version_sharing_request = await version_sharing_request_crud.update(
+            version_sharing_request_id, body, load_relationships=True
+        )
 
     await version_sharing_activity_log.send_sharing_request_update(version_sharing_request)
 
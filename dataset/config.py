@@ -29,6 +29,9 @@ class Settings(BaseSettings):
     LOGGING_FORMAT: str = 'json'
 
     DATASET_FILE_FOLDER: str = 'data'
+    # layout of object keys for new datasets, "path" mirrors display paths, "id" uses immutable object ids
+    DATASET_STORAGE_LAYOUT: str = 'path'
+    DATASET_OBJECT_FOLDER: str = 'objects'
 
     DATASET_CODE_REGEX: str = r'^[a-z0-9]{3,32}$'
     DATASET_VERSION_NUMBER_REGEX: str = r'^\d+\.\d+$'
@@ -47,6 +50,7 @@ class Settings(BaseSettings):
     S3_ACCESS_KEY: str = Field('ACCESSKEY/GMIMPKTWGOKHIQYYQHPO', env={'S3_ACCESS_KEY', 'MINIO_ACCESS_KEY'})
     S3_SECRET_KEY: str = Field('SECRETKEY/HJGKVAS/TRglfFvzDrbYpdknbc', env={'S3_SECRET_KEY', 'MINIO_SECRET_KEY'})
     S3_BUCKET_ENCRYPTION_ENABLED: bool = False
+    S3_MAX_POOL_CONNECTIONS: int = 50
 
     # External services
     QUEUE_SERVICE: str
@@ -54,6 +58,22 @@ class Settings(BaseSettings):
     METADATA_SERVICE: str
     PROJECT_SERVICE: str
 
+    # Outbound HTTP connection pools, one per external service
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = 5.0
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_METADATA_MAX_CONNECTIONS: int = 100
+    HTTP_METADATA_TIMEOUT: float = 5.0
+    HTTP_PROJECT_MAX_CONNECTIONS: int = 20
+    HTTP_PROJECT_TIMEOUT: float = 5.0
+    HTTP_QUEUE_MAX_CONNECTIONS: int = 20
+    HTTP_QUEUE_TIMEOUT: float = 5.0
+    HTTP_DATA_OPS_MAX_CONNECTIONS: int = 100
+    HTTP_DATA_OPS_TIMEOUT: float = 5.0
+
+    # Metadata service item search pagination
+    METADATA_PAGE_SIZE: int = 100
+    METADATA_PAGE_CONCURRENCY: int = 5
+
     # Postgres
     OPSDB_UTILITY_HOST: str = '127.0.0.1'
     OPSDB_UTILITY_PORT: str = '5432'
@@ -73,6 +93,78 @@ class Settings(BaseSettings):
 
     MAX_PREVIEW_SIZE: int = 500000
 
+    # Formatted preview cache, in-process LRU in front of Redis
+    PREVIEW_CACHE_ENABLED: bool = True
+    PREVIEW_CACHE_TTL: int = 3600
+    PREVIEW_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # Paged csv preview, sparse row offset index keeps byte offset of every n-th row
+    PREVIEW_CHUNK_SIZE: int = 64 * 1024
+    PREVIEW_ROW_INDEX_INTERVAL: int = 1000
+    PREVIEW_ROW_INDEX_TTL: int = 24 * 60 * 60
+    PREVIEW_ROWS_MAX_LIMIT: int = 1000
+
+    # Header preview of neuroimaging formats, max bytes limits compressed prefix read from gzip files
+    PREVIEW_HEADER_CHUNK_SIZE: int = 4096
+    PREVIEW_HEADER_MAX_BYTES: int = 1024 * 1024
+
+    # Preview derivatives generated on import into sidecar objects under the prefix in the dataset bucket, concurrency
+    # is the number of consumers of the queue, importing waits while the queue is full
+    PREVIEW_DERIVATIVES_ENABLED: bool = False
+    PREVIEW_DERIVATIVES_PREFIX: str = '.preview'
+    PREVIEW_DERIVATIVES_CONCURRENCY: int = 4
+    PREVIEW_DERIVATIVES_QUEUE_SIZE: int = 100
+
+    # Batched preview of multiple files
+    PREVIEW_BATCH_MAX_FILES: int = 100
+    PREVIEW_BATCH_CONCURRENCY: int = 10
+
+    # File operations (import, move, rename, delete)
+    FILE_OPERATION_JOB_CONCURRENCY: int = 10
+    FILE_OPERATION_PROCESS_CONCURRENCY: int = 50
+    FILE_OPERATION_DELETE_BATCH_SIZE: int = 1000
+    FILE_OPERATION_DELETE_BATCH_DELAY: float = 0.05
+    FILE_OPERATION_DELETE_CONCURRENCY: int = 4
+    FILE_OPERATION_COPY_MULTIPART_THRESHOLD: int = 256 * 1024 * 1024
+    FILE_OPERATION_COPY_PART_SIZE: int = 64 * 1024 * 1024
+    FILE_OPERATION_COPY_CONCURRENCY: int = 8
+    FILE_OPERATION_COPY_ATTEMPTS: int = 3
+    FILE_OPERATION_COPY_RETRY_DELAY: float = 1.0
+    # Lock mode "prefix" write locks a folder with one key and read locks keys of its ancestors instead of locking every
+    # descendant. Other services that lock keys of single files through DataOps without read locks on the ancestor
+    # folders are not excluded by a folder lock in this mode
+    FILE_OPERATION_LOCK_MODE: str = 'key'
+    FILE_OPERATION_LOCK_CONCURRENCY: int = 50
+    FILE_OPERATION_LOCK_BACKEND: str = 'dataops'
+    FILE_OPERATION_LOCK_REDIS_PREFIX: str = 'dataset:locks'
+    FILE_OPERATION_LOCK_TTL: int = 300
+    TASK_STREAM_FLUSH_INTERVAL: float = 0.5
+    TASK_STREAM_FLUSH_CONCURRENCY: int = 10
+
+    # Background jobs, processed by "python -m dataset.worker" when the queue is enabled. File operations are retried
+    # only when they failed before changing anything, with the Authorization header of the original request, attempts
+    # made after the token expired fail until the job is dead-lettered. Locks of an attempt that crashed are kept by
+    # DataOps until released manually, the redis lock backend lets them expire after FILE_OPERATION_LOCK_TTL.
+    JOB_QUEUE_ENABLED: bool = False
+    JOB_QUEUE_NAME: str = 'dataset:jobs'
+    JOB_VISIBILITY_TIMEOUT: int = 300
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_DELAY: int = 30
+    WORKER_CONCURRENCY: int = 4
+    WORKER_POLL_INTERVAL: float = 1.0
+
+    # Version publishing, streaming mode zips S3 objects straight into a multipart upload without local files. Part
+    # size is the minimum, it grows with the archive size so the upload fits into 10000 parts
+    VERSION_PUBLISH_STREAMING: bool = False
+    VERSION_PUBLISH_PART_SIZE: int = Field(16 * 1024 * 1024, ge=5 * 1024 * 1024)
+    VERSION_PUBLISH_CHUNK_SIZE: int = 1024 * 1024
+    # Download stage of the disk-based mode, disk budget 0 means free space of the temporary folder
+    VERSION_PUBLISH_DOWNLOAD_CONCURRENCY: int = 10
+    VERSION_PUBLISH_DOWNLOAD_ATTEMPTS: int = 3
+    VERSION_PUBLISH_DOWNLOAD_RETRY_DELAY: float = 1.0
+    VERSION_PUBLISH_DISK_BUDGET: int = 0
+    VERSION_PUBLISH_PROGRESS_INTERVAL: float = 1.0
+
     # dataset schema default
     ESSENTIALS_NAME: str = 'essential.schema.json'
     ESSENTIALS_TEMPLATE_NAME: str = 'Essential'
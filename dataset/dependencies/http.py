@@ -0,0 +1,57 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import httpx
+
+from dataset.components.types import StrEnum
+from dataset.config import get_settings
+from dataset.logger import logger
+
+settings = get_settings()
+
+
+class Upstream(StrEnum):
+    """Services this application sends HTTP requests to."""
+
+    METADATA = 'metadata'
+    PROJECT = 'project'
+    QUEUE = 'queue'
+    DATA_OPS = 'data_ops'
+
+
+class GetHTTPClient:
+    """Create one pooled httpx.AsyncClient per upstream, shared by all outbound calls in the process."""
+
+    def __init__(self) -> None:
+        self.instances: dict[Upstream, httpx.AsyncClient] = {}
+
+    def __call__(self, upstream: Upstream) -> httpx.AsyncClient:
+        """Return an instance of httpx.AsyncClient for the upstream."""
+
+        if upstream not in self.instances:
+            max_connections = getattr(settings, f'HTTP_{upstream.name}_MAX_CONNECTIONS')
+            timeout = getattr(settings, f'HTTP_{upstream.name}_TIMEOUT')
+            self.instances[upstream] = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                    keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(timeout, connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT),
+            )
+            logger.info(f'HTTP client for upstream "{upstream}" created')
+        return self.instances[upstream]
+
+    async def close(self) -> None:
+        """Close all connection pools."""
+
+        for upstream, client in self.instances.items():
+            await client.aclose()
+            logger.info(f'HTTP client for upstream "{upstream}" closed')
+        self.instances = {}
+
+
+get_http_client = GetHTTPClient()
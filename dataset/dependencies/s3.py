@@ -4,15 +4,41 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import asyncio
+
 from dataset.components.object_storage.s3 import S3Client
 from dataset.config import get_settings
+from dataset.logger import logger
 
 settings = get_settings()
 
 
-async def get_s3_client() -> S3Client:
-    s3_endpoint = f'{settings.S3_HOST}:{settings.S3_PORT}'
-    client = await S3Client.initialize(
-        s3_endpoint, settings.S3_ACCESS_KEY, settings.S3_SECRET_KEY, settings.S3_HTTPS_ENABLED
-    )
-    return client
+class GetS3Client:
+    """Create S3Client once and share it between all requests and background tasks."""
+
+    def __init__(self) -> None:
+        self.instance = None
+        self.lock = asyncio.Lock()
+
+    async def __call__(self) -> S3Client:
+        """Return an instance of S3Client class."""
+
+        async with self.lock:
+            if not self.instance:
+                s3_endpoint = f'{settings.S3_HOST}:{settings.S3_PORT}'
+                self.instance = await S3Client.initialize(
+                    s3_endpoint, settings.S3_ACCESS_KEY, settings.S3_SECRET_KEY, settings.S3_HTTPS_ENABLED
+                )
+                logger.info('S3 client created')
+            return self.instance
+
+    async def close(self) -> None:
+        """Close S3Client connection pools."""
+
+        if self.instance:
+            await self.instance.close()
+            self.instance = None
+            logger.info('S3 client closed')
+
+
+get_s3_client = GetS3Client()
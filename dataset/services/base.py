@@ -10,14 +10,23 @@ import httpx
 from fastapi import Request
 
 from dataset.components.exceptions import Unauthorized
+from dataset.dependencies.http import Upstream
+from dataset.dependencies.http import get_http_client
 
 
 class BaseService:
     """Base class for managing service calls."""
 
+    UPSTREAM: Upstream
+
     def __init__(self, request: Request):
         self.headers = request.headers
 
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Return pooled client for the service upstream."""
+        return get_http_client(self.UPSTREAM)
+
     def _get_authorization_token(self) -> str:
         """Retrieve token from authorization header."""
         token = self.headers.get('Authorization')
@@ -27,32 +36,28 @@ class BaseService:
 
     async def get(self, url: str, params: dict[str, Any] = None) -> dict[str, Any]:
         """Retrieve request for service."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params, headers={'Authorization': self._get_authorization_token()})
+        response = await self.client.get(url, params=params, headers={'Authorization': self._get_authorization_token()})
         response.raise_for_status()
 
         return response.json()
 
     async def create(self, url: str, payload: dict[str, Any] = None) -> dict[str, Any]:
         """Create request for service."""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, headers={'Authorization': self._get_authorization_token()})
+        response = await self.client.post(url, json=payload, headers={'Authorization': self._get_authorization_token()})
         response.raise_for_status()
 
         return response.json()
 
     async def update(self, url: str, payload: dict[str, Any] = None, params: dict[str, Any] = None) -> None:
         """Update request for service."""
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                url, json=payload, params=params, headers={'Authorization': self._get_authorization_token()}
-            )
+        response = await self.client.put(
+            url, json=payload, params=params, headers={'Authorization': self._get_authorization_token()}
+        )
         response.raise_for_status()
 
     async def delete(self, url: str, params: dict[str, Any] = None) -> None:
         """Delete request for service."""
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                url, params=params, headers={'Authorization': self._get_authorization_token()}
-            )
+        response = await self.client.delete(
+            url, params=params, headers={'Authorization': self._get_authorization_token()}
+        )
         response.raise_for_status()
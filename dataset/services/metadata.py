@@ -5,6 +5,9 @@
 # You may not use this file except in compliance with the License.
 
 import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import aclosing
 from typing import Any
 
 import httpx
@@ -12,6 +15,7 @@ from fastapi import HTTPException
 
 from dataset.components.exceptions import NotFound
 from dataset.config import get_settings
+from dataset.dependencies.http import Upstream
 from dataset.logger import logger
 from dataset.services.base import BaseService
 
@@ -22,38 +26,84 @@ class MetadataService(BaseService):
     """Class to access Metadata Service."""
 
     SERVICE_NAME = 'MetadataService'
+    UPSTREAM = Upstream.METADATA
     BASE_URL = settings.METADATA_SERVICE
     ITEM_URL = f'{BASE_URL}/v1/item/'
     SEARCH_URL = f'{BASE_URL}/v1/items/search/'
+    BATCH_URL = f'{BASE_URL}/v1/items/batch/'
+
+    def _get_search_params(
+        self, code: str, items_type: str, extra: dict[str, Any] | None, page: int, page_size: int
+    ) -> dict[str, Any]:
+        """Return search query parameters for one page."""
 
-    async def get_objects(
-        self, code: str, items_type: str = 'dataset', extra: dict[str, Any] = None
-    ) -> list[dict[str, Any]]:
-        """List items by container_code."""
-        page = 0
         params = {
             'recursive': True,
             'zone': 1,
             'container_type': items_type,
-            'page_size': 100,
+            'page_size': page_size,
             'page': page,
             'container_code': code,
         }
         if extra:
             params.update(**extra)
-        response = await self.get(self.SEARCH_URL, params)
+        return params
+
+    async def iter_pages(
+        self,
+        code: str,
+        items_type: str = 'dataset',
+        extra: dict[str, Any] | None = None,
+        page_size: int | None = None,
+        concurrency: int | None = None,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Yield pages of items by container_code in page order.
+
+        The first page tells the number of pages, the rest are fetched concurrently with at most `concurrency` requests
+        in flight, so only that many pages are held in memory at once.
+        """
+
+        page_size = page_size or settings.METADATA_PAGE_SIZE
+        concurrency = concurrency or settings.METADATA_PAGE_CONCURRENCY
+
+        response = await self.get(self.SEARCH_URL, self._get_search_params(code, items_type, extra, 0, page_size))
         total_pages = response['num_of_pages']
-        objects_list = response['result']
-        if total_pages > 1:
-            tasks = []
-            for page in range(1, total_pages):
-                params['page'] = page
-                task = asyncio.create_task(self.get(self.SEARCH_URL, params))
-                tasks.append(task)
-                results = await asyncio.gather(*tasks)
-                for response in results:
-                    objects_list.extend(response['result'])
-        return objects_list
+        yield response['result']
+
+        pending: deque[asyncio.Task] = deque()
+        next_page = 1
+        try:
+            while next_page < total_pages or pending:
+                while next_page < total_pages and len(pending) < concurrency:
+                    params = self._get_search_params(code, items_type, extra, next_page, page_size)
+                    pending.append(asyncio.create_task(self.get(self.SEARCH_URL, params)))
+                    next_page += 1
+                response = await pending.popleft()
+                yield response['result']
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def iter_objects(
+        self,
+        code: str,
+        items_type: str = 'dataset',
+        extra: dict[str, Any] | None = None,
+        page_size: int | None = None,
+        concurrency: int | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield items by container_code one by one without loading all pages."""
+
+        async for page in self.iter_pages(code, items_type, extra, page_size, concurrency):
+            for item in page:
+                yield item
+
+    async def get_objects(
+        self, code: str, items_type: str = 'dataset', extra: dict[str, Any] = None
+    ) -> list[dict[str, Any]]:
+        """List items by container_code."""
+
+        return [item async for item in self.iter_objects(code, items_type, extra)]
 
     async def get_by_id(self, id_: str) -> dict[str, Any]:
         """Get item by id in medatadata service."""
@@ -67,6 +117,11 @@ class MetadataService(BaseService):
                     raise NotFound()
             raise exc
 
+    async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        """Get items by ids in one request, ids not found are missing from the result."""
+
+        return (await self.get(self.BATCH_URL, {'ids': ids}))['result']
+
     async def create_object(self, payload: dict[str, Any]) -> dict[str, Any]:
         """Creates item in medatadata service."""
 
@@ -114,7 +169,7 @@ class MetadataService(BaseService):
     async def is_duplicated_name_item(self, code: str, name: str, parent_id: str) -> bool:
         """Returns True when there is another item with the same name under the same parent."""
 
-        items = await self.get_objects(code, extra={'name': name})
-        for item in items:
-            if item['parent'] == parent_id:
-                return True
+        async with aclosing(self.iter_objects(code, extra={'name': name})) as items:
+            async for item in items:
+                if item['parent'] == parent_id:
+                    return True
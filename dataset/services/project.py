@@ -7,12 +7,14 @@
 from typing import Any
 
 from dataset.config import get_settings
+from dataset.dependencies.http import Upstream
 from dataset.services.base import BaseService
 
 settings = get_settings()
 
 
 class ProjectService(BaseService):
+    UPSTREAM = Upstream.PROJECT
     BASE_URL = settings.PROJECT_SERVICE
 
     async def get_by_id(self, id_: str) -> dict[str, Any]:
@@ -9,6 +9,7 @@ from typing import Any
 from uuid import UUID
 
 from dataset.config import get_settings
+from dataset.dependencies.http import Upstream
 from dataset.logger import logger
 from dataset.services.base import BaseService
 
@@ -16,6 +17,7 @@ settings = get_settings()
 
 
 class QueueService(BaseService):
+    UPSTREAM = Upstream.QUEUE
     BASE_URL = settings.QUEUE_SERVICE
     HEADERS = {'Content-type': 'application/json; charset=utf-8'}
 
@@ -4,36 +4,84 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import asyncio
 import re
 from time import time
 from typing import Any
 
-import httpx
-
 from dataset.components.file.types import EActionType
 from dataset.components.file.types import EFileStatus
 from dataset.components.file.types import FileStatus
 from dataset.config import get_settings
+from dataset.dependencies.http import Upstream
+from dataset.dependencies.http import get_http_client
 from dataset.logger import logger
 
 settings = get_settings()
 
 
 class TaskStreamService:
+    """Report file job statuses to DataOps.
+
+    Statuses are buffered per job and written on a short debounce interval, a newer status of the same job replaces
+    the pending one, so jobs that complete within the interval skip intermediate states. Workers must call flush()
+    at the end of the operation to write the remaining statuses.
+    """
 
     TASK_URL = settings.DATA_UTILITY_SERVICE_V1 + '/task-stream/'
 
+    def __init__(self) -> None:
+        self.flush_interval = settings.TASK_STREAM_FLUSH_INTERVAL
+        self.flush_concurrency = settings.TASK_STREAM_FLUSH_CONCURRENCY
+        self.pending: dict[tuple[str, str, str], FileStatus] = {}
+        self.flush_task: asyncio.Task | None = None
+        self.flush_lock = asyncio.Lock()
+
     async def _write_file_status_event(self, file_status: FileStatus) -> dict[str, Any]:
         """Send file status to DataOps to be written into Redis."""
 
         post_json = file_status.dict()
-        async with httpx.AsyncClient() as client:
-            res = await client.post(self.TASK_URL, json=post_json)
+        res = await get_http_client(Upstream.DATA_OPS).post(self.TASK_URL, json=post_json)
         if res.status_code != 200:
             raise Exception(f'Send file status error {res.status_code}: {res.text}')
         logger.info('Created file status', extra={'payload': post_json, 'url': self.TASK_URL})
         return res.json()
 
+    async def _send_file_status(self, file_status: FileStatus, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            try:
+                await self._write_file_status_event(file_status)
+            except Exception:
+                logger.exception(f'Unable to send status "{file_status.status}" of job "{file_status.job_id}"')
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        self.flush_task = None
+        await self.flush()
+
+    def _queue_file_status(self, file_status: FileStatus) -> None:
+        """Buffer file status replacing the pending status of the same job and schedule the flush."""
+
+        key = (file_status.session_id, file_status.action_type, file_status.job_id)
+        self.pending[key] = file_status
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self._flush_later())
+
+    async def flush(self) -> None:
+        """Write all buffered file statuses concurrently."""
+
+        if self.flush_task is not None and self.flush_task is not asyncio.current_task():
+            self.flush_task.cancel()
+            self.flush_task = None
+
+        async with self.flush_lock:
+            pending, self.pending = self.pending, {}
+            if not pending:
+                return
+            semaphore = asyncio.Semaphore(self.flush_concurrency)
+            await asyncio.gather(*[self._send_file_status(file_status, semaphore) for file_status in pending.values()])
+            logger.info(f'Flushed {len(pending)} file status(es)')
+
     def _extract_uuid(self, s: str) -> str:
         """Removes the action type and timestamp from a job identifier string."""
 
@@ -69,13 +117,13 @@ class TaskStreamService:
             status=status,
             job_id=job_id,
         )
-        await self._write_file_status_event(file_status)
+        self._queue_file_status(file_status)
         return {source_geid: return_id}
 
     async def initialize_file_jobs(
         self, session_id: str, action: EActionType, batch_list: list[dict[str, Any]], dataset_code: str
     ) -> dict[str, Any]:
-        """Creates and sends the initial status of a batch of files to the DataOps service to be written into Redis."""
+        """Creates the initial status of a batch of files, statuses are sent to DataOps service on the next flush."""
 
         job_ids = {}
         session_id = 'local_test' if not session_id else session_id
@@ -97,8 +145,8 @@ class TaskStreamService:
         status: EFileStatus,
         dataset_code,
         job_id: str,
-    ) -> dict[str, Any]:
-        """Updates the status of a file job and sends it to the DataOps service to be written into Redis."""
+    ) -> None:
+        """Updates the status of a file job, it is sent to the DataOps service on the next flush."""
 
         logger.info('update_job_status', extra={'file': source_file, 'job_id': job_id, 'status': status})
         job_id = self._extract_uuid(job_id)
@@ -115,5 +163,4 @@ class TaskStreamService:
             status=status,
             job_id=job_id,
         )
-        res = await self._write_file_status_event(file_status)
-        return res
+        self._queue_file_status(file_status)
@@ -0,0 +1,152 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import signal
+
+from common import configure_logging
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from dataset.components.job.handlers import JOB_HANDLERS
+from dataset.components.job.handlers import JobContext
+from dataset.components.job.queue import JobQueue
+from dataset.components.job.schemas import JobSchema
+from dataset.config import get_settings
+from dataset.dependencies.db import get_db_engine
+from dataset.dependencies.http import get_http_client
+from dataset.dependencies.kafka import get_kafka_client
+from dataset.dependencies.redis import redis_client
+from dataset.dependencies.s3 import get_s3_client
+from dataset.logger import logger
+
+settings = get_settings()
+
+
+class Worker:
+    """Consume jobs from the job queue running at most `concurrency` jobs at once."""
+
+    def __init__(
+        self,
+        job_queue: JobQueue,
+        concurrency: int = settings.WORKER_CONCURRENCY,
+        poll_interval: float = settings.WORKER_POLL_INTERVAL,
+    ) -> None:
+        self.job_queue = job_queue
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.stopping = asyncio.Event()
+        self.tasks: set[asyncio.Task] = set()
+
+    def stop(self) -> None:
+        """Stop taking new jobs, running jobs are finished."""
+
+        logger.info('Worker is stopping')
+        self.stopping.set()
+
+    async def _sleep(self, delay: float) -> None:
+        """Sleep until delay passes or the worker is stopped."""
+
+        try:
+            await asyncio.wait_for(self.stopping.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _reserve(self) -> JobSchema | None:
+        """Return visible again jobs to the queue and reserve the next one."""
+
+        try:
+            await self.job_queue.requeue_expired()
+            return await self.job_queue.reserve()
+        except Exception:
+            logger.exception('Unable to reserve job')
+            return None
+
+    async def _heartbeat(self, job: JobSchema) -> None:
+        """Keep the job hidden from other workers while it is running."""
+
+        while True:
+            await asyncio.sleep(self.job_queue.visibility_timeout / 3)
+            try:
+                await self.job_queue.touch(job)
+            except Exception:
+                logger.exception(f'Unable to extend visibility timeout of job "{job.id}"')
+
+    async def execute(self, job: JobSchema) -> None:
+        """Run the job handler with its own database session."""
+
+        engine = await get_db_engine(settings)
+        async with AsyncSession(bind=engine, expire_on_commit=False) as db_session:
+            context = JobContext(
+                job, db_session, await redis_client(), await get_s3_client(), await get_kafka_client(settings)
+            )
+            await JOB_HANDLERS[job.type](context, job.payload)
+            await db_session.commit()
+
+    async def process(self, job: JobSchema) -> None:
+        """Execute the job and acknowledge or retry it depending on the result."""
+
+        logger.info(f'Job "{job.id}" of type "{job.type}" started, attempt {job.attempts}')
+        error = None
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            await self.execute(job)
+        except Exception as exc:
+            logger.exception(f'Job "{job.id}" of type "{job.type}" failed')
+            error = str(exc) or exc.__class__.__name__
+        finally:
+            heartbeat.cancel()
+
+        try:
+            if error is None:
+                await self.job_queue.ack(job)
+            else:
+                await self.job_queue.retry(job, error)
+        except Exception:
+            logger.exception(f'Unable to update job "{job.id}", it is requeued after the visibility timeout')
+        finally:
+            self.semaphore.release()
+
+    async def run(self) -> None:
+        """Take jobs from the queue until stopped, then wait for the running ones."""
+
+        logger.info(f'Worker started with concurrency {self.concurrency}')
+        while not self.stopping.is_set():
+            await self.semaphore.acquire()
+            job = await self._reserve()
+            if job is None:
+                self.semaphore.release()
+                await self._sleep(self.poll_interval)
+                continue
+
+            task = asyncio.create_task(self.process(job))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        logger.info('Worker stopped')
+
+
+async def main() -> None:
+    configure_logging(settings.LOGGING_LEVEL, settings.LOGGING_FORMAT)
+
+    worker = Worker(JobQueue(await redis_client()))
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, worker.stop)
+
+    try:
+        await worker.run()
+    finally:
+        await get_s3_client.close()
+        await get_http_client.close()
+        if get_kafka_client.instance:
+            await get_kafka_client.instance.stop()
+        await (await redis_client()).aclose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
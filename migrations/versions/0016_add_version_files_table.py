@@ -0,0 +1,47 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Add Version Files table for snapshot versions.
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-17 16:30:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = '0016'
+down_revision = '0015'
+branch_labels = None
+depends_on = '0015'
+
+
+def upgrade():
+    op.add_column('version', sa.Column('snapshot', sa.Boolean(), server_default='false', nullable=False))
+
+    op.create_table(
+        'version_files',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('version_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('file_id', sa.String(), nullable=False),
+        sa.Column('path', sa.String(), nullable=False),
+        sa.Column('bucket', sa.String(), nullable=False),
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('object_version_id', sa.String(), nullable=True),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('etag', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['version_id'], ['version.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_version_files_version_id'), 'version_files', ['version_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_version_files_version_id'), table_name='version_files')
+    op.drop_table('version_files')
+
+    op.drop_column('version', 'snapshot')
@@ -0,0 +1,34 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Add storage layout column to datasets table.
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-17 18:00:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = '0017'
+down_revision = '0016'
+branch_labels = None
+depends_on = '0016'
+
+storage_layout = postgresql.ENUM('path', 'id', name='storage_layout', create_type=False)
+
+
+def upgrade():
+    storage_layout.create(op.get_bind())
+
+    op.add_column('datasets', sa.Column('storage_layout', storage_layout, server_default='path', nullable=False))
+
+
+def downgrade():
+    op.drop_column('datasets', 'storage_layout')
+
+    storage_layout.drop(op.get_bind())
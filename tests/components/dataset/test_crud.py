@@ -0,0 +1,62 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from uuid import uuid4
+
+import pytest
+
+from dataset.components.dataset.exceptions import DatasetNotFound
+from dataset.components.dataset.schemas import DatasetUpdateSchema
+from dataset.components.exceptions import NotFound
+from dataset.components.version.schemas import VersionSchema
+
+
+class TestDatasetCRUD:
+    async def test_increment_counters_adds_deltas_to_stored_values(self, dataset_crud, dataset_factory):
+        dataset = await dataset_factory.create(total_files=2, size=100)
+
+        await dataset_crud.increment_counters(dataset.id, 3, 50)
+        counters = await dataset_crud.increment_counters(dataset.id, -1, -20)
+
+        assert counters == (4, 130)
+
+    async def test_increment_counters_clamps_counters_at_zero(self, dataset_crud, dataset_factory):
+        dataset = await dataset_factory.create(total_files=1, size=10)
+
+        counters = await dataset_crud.increment_counters(dataset.id, -5, -100)
+
+        assert counters == (0, 0)
+
+    async def test_increment_counters_raises_not_found_for_unknown_dataset(self, dataset_crud):
+        with pytest.raises(DatasetNotFound):
+            await dataset_crud.increment_counters(uuid4(), 1, 1)
+
+    async def test_update_returns_entry_with_updated_attributes(self, dataset_crud, dataset_factory):
+        dataset = await dataset_factory.create(title='old title')
+
+        updated = await dataset_crud.update(
+            dataset.id, DatasetUpdateSchema(title='new title', authors=['admin'], description='description')
+        )
+
+        assert updated.id == dataset.id
+        assert updated.title == 'new title'
+
+    async def test_update_raises_not_found_for_unknown_dataset(self, dataset_crud):
+        with pytest.raises(NotFound):
+            await dataset_crud.update(
+                uuid4(), DatasetUpdateSchema(title='new title', authors=['admin'], description='description')
+            )
+
+    async def test_create_loads_relationships_on_request(self, version_crud, dataset_factory):
+        dataset = await dataset_factory.create()
+        entry = VersionSchema(
+            notes='notes', created_by='admin', version='1.0', dataset_code=dataset.code, dataset_id=dataset.id
+        )
+
+        version = await version_crud.create(entry, load_relationships=True)
+
+        assert version.dataset_id == dataset.id
+        assert version.dataset.code == dataset.code
@@ -84,6 +84,38 @@ class TestDatasetViews:
         assert received_values == expected_values
         assert received_total == 3
 
+    @pytest.mark.parametrize('sort_order', SortingOrder.values())
+    async def test_list_datasets_returns_all_datasets_when_following_next_cursor(
+        self, sort_order, client, jq, dataset_factory
+    ):
+        created_datasets = await dataset_factory.bulk_create(5)
+        expected_ids = [
+            str(dataset.id)
+            for dataset in sorted(
+                created_datasets, key=lambda dataset: (dataset.created_at, dataset.id), reverse=sort_order == 'desc'
+            )
+        ]
+        params = {'sort_by': 'created_at', 'sort_order': sort_order, 'page_size': 2, 'include_count': False}
+
+        received_ids = []
+        while True:
+            response = await client.get('/v1/datasets/', params=params)
+            body = jq(response)
+            received_ids.extend(body('.result[].id').all())
+            assert body('.total').first() is None
+            next_cursor = body('.next_cursor').first()
+            if next_cursor is None:
+                break
+            params['cursor'] = next_cursor
+
+        assert received_ids == expected_ids
+
+    async def test_list_datasets_returns_400_status_code_when_cursor_is_invalid(self, client):
+        response = await client.get('/v1/datasets/', params={'cursor': 'invalid'})
+
+        assert response.status_code == 400
+        assert response.json()['error']['code'] == 'global.invalid_cursor'
+
     @pytest.mark.parametrize('parameter', ['creator', 'code'])
     async def test_list_datasets_returns_dataset_filtered_by_parameter_full_match(
         self, parameter, client, jq, dataset_factory
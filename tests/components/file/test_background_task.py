@@ -12,14 +12,21 @@ import pytest
 import pytest_asyncio
 
 from dataset.components.activity_log.schemas import FileFolderActivityLogSchema
+from dataset.components.dataset.models import StorageLayout
 from dataset.components.file.activity_log import FileActivityLogService
+from dataset.components.file.crud import FileCRUD
 from dataset.components.file.dependencies import get_file_crud
 from dataset.components.file.dependencies import get_locking_manager
+from dataset.components.file.executor import FileOperationExecutor
 from dataset.components.file.schemas import ItemStatusSchema
 from dataset.components.file.tasks import FileOperationTasks
+from dataset.components.folder.crud import FolderCRUD
 from dataset.components.folder.dependencies import get_folder_crud
+from dataset.components.preview.derivatives import PreviewDerivatives
+from dataset.components.preview.headers import HeaderPreview
 from dataset.components.request.network import Network
 from dataset.dependencies.s3 import get_s3_client
+from dataset.services.metadata import MetadataService
 from dataset.services.task_stream import TaskStreamService
 
 OPER = 'admin'
@@ -80,7 +87,10 @@ async def file_tasks(metadata_service, kafka_producer_client):
     locking_manager = await get_locking_manager(folder_crud)
     task_stream_service = TaskStreamService()
     file_activity_log_service = FileActivityLogService(kafka_producer_client=kafka_producer_client)
-    return FileOperationTasks(file_crud, folder_crud, locking_manager, task_stream_service, file_activity_log_service)
+    preview_derivatives = PreviewDerivatives(file_crud, HeaderPreview(file_crud))
+    return FileOperationTasks(
+        file_crud, folder_crud, locking_manager, task_stream_service, file_activity_log_service, preview_derivatives
+    )
 
 
 @mock.patch.object(FileActivityLogService, '_message_send')
@@ -168,6 +178,46 @@ async def test_copy_file_worker_raise_exception_should_import_file_cancelled(
     assert content['status'] == 'FAILED'
 
 
+def test_exclude_failed_excludes_folders_containing_failed_items():
+    file_tasks = FileOperationTasks(FileCRUD(mock.Mock(), mock.Mock()), *[mock.Mock() for _ in range(5)])
+    folder = {'id': str(uuid4()), 'parent_path': None, 'type': 'folder', 'name': 'folder'}
+    other_folder = {'id': str(uuid4()), 'parent_path': None, 'type': 'folder', 'name': 'folder2'}
+    file = {'id': str(uuid4()), 'parent_path': None, 'type': 'file', 'name': 'file.txt'}
+    failed_file = {'id': str(uuid4()), 'parent_path': 'folder/subfolder', 'type': 'file', 'name': 'file.txt'}
+    executor = FileOperationExecutor()
+    executor.add_failure(failed_file, Exception('broken'))
+
+    assert file_tasks._exclude_failed([folder, other_folder, file], executor) == [other_folder, file]
+
+
+@mock.patch.object(FileActivityLogService, '_message_send')
+@mock.patch.object(TaskStreamService, 'flush')
+@mock.patch('dataset.components.file.locks.LockingManager.unlock_resources')
+@mock.patch('dataset.components.file.locks.LockingManager.recursive_lock_import')
+async def test_copy_file_worker_flushes_task_stream_when_unlock_fails(
+    mock_recursive_lock_import,
+    mock_unlock_resources,
+    mock_flush,
+    mock_kafka_msg,
+    file_tasks,
+    dataset_crud,
+    dataset_factory,
+):
+    dataset = await dataset_factory.create()
+    mock_recursive_lock_import.return_value = [('bucket', 'data/file.txt')], None
+    mock_unlock_resources.side_effect = Exception('unlock failed')
+
+    with mock.patch.object(FileOperationTasks, 'recursive_copy') as mock_recursive_copy:
+        mock_recursive_copy.return_value = 1, 1, None
+        error = await file_tasks.copy_files_worker(
+            dataset_crud, [root_file], dataset, OPER, 'project_code', SESSION_ID, Network(origin='internal')
+        )
+
+    assert error is None
+    mock_unlock_resources.assert_awaited_once()
+    mock_flush.assert_awaited_once()
+
+
 @mock.patch.object(FileActivityLogService, '_message_send')
 @pytest.mark.parametrize(
     'target_folder,item_type',
@@ -443,3 +493,101 @@ async def test_rename_file_worker_should_rename_file_succeed(
     assert mock_kafka_msg.call_count == 1
     file_folder = FileFolderActivityLogSchema.parse_obj(mock_kafka_msg.call_args[0][0])
     assert file_folder.activity_type == 'update'
+
+
+@mock.patch.object(FileActivityLogService, '_message_send')
+@mock.patch('dataset.components.file.locks.LockingManager.recursive_lock_move_rename')
+async def test_move_file_worker_in_id_layout_updates_only_metadata_of_moved_items(
+    mock_recursive_lock_move_rename, mock_kafka_msg, external_requests, file_tasks, httpx_mock, dataset_factory
+):
+    dataset = await dataset_factory.create(storage_layout=StorageLayout.ID)
+    code = dataset.code
+    mock_recursive_lock_move_rename.return_value = [], False
+    target_folder = {'id': str(uuid4()), 'parent': None, 'parent_path': None, 'name': 'target'}
+    folder = {
+        'id': str(uuid4()),
+        'parent': None,
+        'parent_path': None,
+        'status': ItemStatusSchema.ACTIVE.name,
+        'type': 'folder',
+        'name': 'folder',
+        'container_code': code,
+        'container_type': 'dataset',
+    }
+    file = {
+        'id': str(uuid4()),
+        'parent': folder['id'],
+        'parent_path': 'folder',
+        'status': ItemStatusSchema.ACTIVE.name,
+        'type': 'file',
+        'name': 'file.txt',
+        'container_code': code,
+        'container_type': 'dataset',
+        'storage': {'location_uri': f'minio://http://10.3.7.220/{code}/objects/{uuid4()}'},
+    }
+    httpx_mock.add_response(
+        method='GET',
+        url=(
+            'http://metadata_service/v1/items/search/?'
+            f'recursive=true&zone=1&container_code={code}&container_type=dataset&page_size=100&page=0'
+        ),
+        json={'result': [folder, file], 'page': 0, 'num_of_pages': 1},
+    )
+    for item in [folder, file]:
+        httpx_mock.add_response(method='PUT', url=f'http://metadata_service/v1/item/?id={item["id"]}', json={})
+
+    with mock.patch.object(FileOperationTasks, 'recursive_copy') as mock_recursive_copy:
+        await file_tasks.move_file_worker([folder], dataset, OPER, target_folder, SESSION_ID)
+
+    updates = [json.loads(request.content) for request in httpx_mock.get_requests(method='PUT')]
+    assert {'id': folder['id'], 'parent': target_folder['id'], 'parent_path': 'target', 'name': 'folder'} in updates
+    assert {'id': file['id'], 'parent': folder['id'], 'parent_path': 'target/folder', 'name': 'file.txt'} in updates
+    mock_recursive_copy.assert_not_called()
+    assert mock_kafka_msg.call_count == 1
+
+
+def make_dataset_file(name: str) -> dict:
+    return {'id': str(uuid4()), 'parent_path': None, 'type': 'file', 'name': name}
+
+
+@mock.patch.object(FileActivityLogService, '_message_send')
+@mock.patch.object(FolderCRUD, 'get_children', return_value=[])
+@mock.patch('dataset.components.file.locks.LockingManager.recursive_lock_delete')
+async def test_migrate_storage_layout_worker_switches_dataset_to_id_layout(
+    mock_recursive_lock_delete, mock_get_children, mock_kafka_msg, file_tasks, dataset_crud, dataset_factory
+):
+    dataset = await dataset_factory.create(storage_layout=StorageLayout.PATH)
+    mock_recursive_lock_delete.return_value = [], False
+    files = [make_dataset_file('file.txt'), make_dataset_file('file2.txt')]
+
+    with mock.patch.object(MetadataService, 'get_files', return_value=files):
+        with mock.patch.object(FileCRUD, 'migrate_to_id_layout', return_value=True) as mock_migrate:
+            await file_tasks.migrate_storage_layout_worker(dataset_crud, dataset, OPER, Network(origin='internal'))
+
+    assert mock_migrate.call_count == 2
+    dataset = await dataset_crud.retrieve_by_id(dataset.id)
+    assert dataset.storage_layout == StorageLayout.ID
+    assert mock_kafka_msg.call_count == 2
+    file_folder = FileFolderActivityLogSchema.parse_obj(mock_kafka_msg.call_args[0][0])
+    assert file_folder.activity_type == 'update'
+    assert file_folder.user == OPER
+    assert file_folder.network_origin == 'internal'
+
+
+@mock.patch.object(FileActivityLogService, '_message_send')
+@mock.patch.object(FolderCRUD, 'get_children', return_value=[])
+@mock.patch('dataset.components.file.locks.LockingManager.recursive_lock_delete')
+async def test_migrate_storage_layout_worker_keeps_path_layout_when_some_files_failed(
+    mock_recursive_lock_delete, mock_get_children, mock_kafka_msg, file_tasks, dataset_crud, dataset_factory
+):
+    dataset = await dataset_factory.create(storage_layout=StorageLayout.PATH)
+    mock_recursive_lock_delete.return_value = [], False
+    files = [make_dataset_file('file.txt'), make_dataset_file('file2.txt')]
+
+    with mock.patch.object(MetadataService, 'get_files', return_value=files):
+        with mock.patch.object(FileCRUD, 'migrate_to_id_layout', side_effect=[True, Exception('copy failed')]):
+            await file_tasks.migrate_storage_layout_worker(dataset_crud, dataset, OPER, Network(origin='internal'))
+
+    dataset = await dataset_crud.retrieve_by_id(dataset.id)
+    assert dataset.storage_layout == StorageLayout.PATH
+    assert mock_kafka_msg.call_count == 1
@@ -83,22 +83,8 @@ async def test_file_delete_from_dataset_when_file_should_start_background_task_a
         'status': 'WAITING',
         'job_id': file_id,
     }
-    waiting_stream_task_payload = {**base_stream_task_payload, **{'status': 'WAITING'}}
-    running_stream_task_payload = {**base_stream_task_payload, **{'status': 'RUNNING'}}
     succeed_stream_task_payload = {**base_stream_task_payload, **{'status': 'SUCCEED'}}
 
-    httpx_mock.add_response(
-        method='POST',
-        url='http://data_ops_util/v1/task-stream/',
-        json={},
-        match_content=json.dumps(waiting_stream_task_payload).encode(),
-    )
-    httpx_mock.add_response(
-        method='POST',
-        url='http://data_ops_util/v1/task-stream/',
-        json={},
-        match_content=json.dumps(running_stream_task_payload).encode(),
-    )
     httpx_mock.add_response(
         method='POST',
         url='http://data_ops_util/v1/task-stream/',
@@ -194,22 +180,8 @@ async def test_file_delete_from_dataset_when_folder_should_start_background_task
         'status': 'WAITING',
         'job_id': folder_id,
     }
-    waiting_stream_task_payload = {**base_stream_task_payload, **{'status': 'WAITING'}}
-    running_stream_task_payload = {**base_stream_task_payload, **{'status': 'RUNNING'}}
     succeed_stream_task_payload = {**base_stream_task_payload, **{'status': 'SUCCEED'}}
 
-    httpx_mock.add_response(
-        method='POST',
-        url='http://data_ops_util/v1/task-stream/',
-        json={},
-        match_content=json.dumps(waiting_stream_task_payload).encode(),
-    )
-    httpx_mock.add_response(
-        method='POST',
-        url='http://data_ops_util/v1/task-stream/',
-        json={},
-        match_content=json.dumps(running_stream_task_payload).encode(),
-    )
     httpx_mock.add_response(
         method='POST',
         url='http://data_ops_util/v1/task-stream/',
@@ -0,0 +1,64 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+from unittest import mock
+
+import pytest
+
+from dataset.components.file.exceptions import LockLeaseLost
+from dataset.components.file.executor import FileOperationExecutor
+from dataset.components.file.executor import OperationFailed
+
+
+class TestFileOperationExecutor:
+    async def test_run_never_exceeds_job_concurrency(self):
+        executor = FileOperationExecutor(concurrency=2)
+        in_flight = 0
+        max_in_flight = 0
+
+        async def step() -> None:
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+        await asyncio.gather(*[executor.run(step) for _ in range(10)])
+
+        assert max_in_flight == 2
+
+    async def test_run_returns_step_result(self):
+        executor = FileOperationExecutor()
+
+        async def step(value: int) -> int:
+            return value * 2
+
+        assert await executor.run(step, 21) == 42
+
+    async def test_run_does_not_run_step_when_guard_raises(self):
+        def guard() -> None:
+            raise LockLeaseLost()
+
+        executor = FileOperationExecutor(guard=guard)
+        step = mock.AsyncMock()
+
+        with pytest.raises(LockLeaseLost):
+            await executor.run(step)
+
+        step.assert_not_called()
+
+    def test_raise_for_failures_raises_with_recorded_items(self):
+        executor = FileOperationExecutor()
+        executor.add_failure({'id': 'any', 'name': 'file.txt'}, ValueError('broken'))
+
+        with pytest.raises(OperationFailed) as exc_info:
+            executor.raise_for_failures()
+
+        assert exc_info.value.failures == [{'id': 'any', 'name': 'file.txt', 'error': 'broken'}]
+
+    def test_raise_for_failures_does_nothing_without_failures(self):
+        FileOperationExecutor().raise_for_failures()
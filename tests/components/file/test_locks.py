@@ -0,0 +1,239 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import json
+from unittest import mock
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from redis.asyncio import Redis
+
+from dataset.components.file.exceptions import LockLeaseLost
+from dataset.components.file.exceptions import ResourceLocked
+from dataset.components.file.locks import LockingManager
+from dataset.components.file.locks import RedisLockingManager
+from dataset.components.file.schemas import ItemStatusSchema
+
+LOCK_URL = 'http://data_ops_util/v2/resource/lock/'
+
+
+@pytest.fixture
+def nodes():
+    return [
+        {
+            'id': 'ded5bf1e-80f5-4b39-bbfd-f7c74054f41d',
+            'parent': None,
+            'parent_path': None,
+            'status': ItemStatusSchema.ACTIVE.name,
+            'type': 'folder',
+            'name': 'folder1',
+            'owner': 'admin',
+            'container_code': 'testdataset',
+            'container_type': 'dataset',
+        },
+        {
+            'id': '6e3305af-859f-4f6a-a3ff-a23a6ab1b9a5',
+            'parent': '077fe46b-3bff-4da3-a4fb-4d6cbf9ce470',
+            'parent_path': 'folder2',
+            'status': ItemStatusSchema.ACTIVE.name,
+            'type': 'file',
+            'name': 'file.txt',
+            'owner': 'admin',
+            'container_code': 'testdataset',
+            'container_type': 'dataset',
+            'storage': {'location_uri': 'minio://http://minio.minio:9000/testdataset/data/folder2/file.txt'},
+        },
+    ]
+
+
+@pytest.fixture
+async def redis_client(redis_url) -> Redis:
+    redis_client = Redis(host=redis_url[0], port=redis_url[1])
+    yield redis_client
+    await redis_client.aclose()
+
+
+@pytest.fixture
+def lock_prefix() -> str:
+    return f'test:{uuid4()}'
+
+
+def get_locks(httpx_mock, method):
+    return {
+        json.loads(request.content)['resource_key']: json.loads(request.content)['operation']
+        for request in httpx_mock.get_requests(method=method, url=LOCK_URL)
+    }
+
+
+async def test_recursive_lock_delete_in_prefix_mode_locks_folder_prefix_without_walking_children(httpx_mock, nodes):
+    httpx_mock.add_response(method='POST', url=LOCK_URL, json={})
+    folder_crud = mock.AsyncMock()
+    locking_manager = LockingManager(folder_crud, mode='prefix')
+
+    locked_node, err = await locking_manager.recursive_lock_delete(nodes)
+
+    assert err is None
+    folder_crud.get_children.assert_not_called()
+    assert get_locks(httpx_mock, 'POST') == {
+        'testdataset/data': 'read',
+        'testdataset/data/folder1': 'write',
+        'testdataset/data/folder2': 'read',
+        'testdataset/data/folder2/file.txt': 'write',
+    }
+    assert sorted(locked_node) == sorted(get_locks(httpx_mock, 'POST').items())
+
+
+async def test_recursive_lock_delete_in_prefix_mode_locks_file_in_id_layout_by_display_path(httpx_mock, nodes):
+    httpx_mock.add_response(method='POST', url=LOCK_URL, json={})
+    file = {**nodes[1], 'storage': {'location_uri': f'minio://http://minio.minio:9000/testdataset/objects/{uuid4()}'}}
+    locking_manager = LockingManager(mock.AsyncMock(), mode='prefix')
+
+    locked_node, err = await locking_manager.recursive_lock_delete([file])
+
+    assert err is None
+    assert get_locks(httpx_mock, 'POST') == {
+        'testdataset/data': 'read',
+        'testdataset/data/folder2': 'read',
+        'testdataset/data/folder2/file.txt': 'write',
+    }
+
+
+async def test_recursive_lock_publish_in_prefix_mode_read_locks_keys_of_folder_children(httpx_mock, nodes):
+    httpx_mock.add_response(method='POST', url=LOCK_URL, json={})
+    folder_crud = mock.AsyncMock()
+    folder_crud.get_children.return_value = [nodes[1]]
+    locking_manager = LockingManager(folder_crud, mode='prefix')
+
+    locked_node, err = await locking_manager.recursive_lock_publish(nodes[:1])
+
+    assert err is None
+    folder_crud.get_children.assert_called_once()
+    assert get_locks(httpx_mock, 'POST') == {
+        'testdataset/data': 'read',
+        'testdataset/data/folder1': 'read',
+        'testdataset/data/folder2': 'read',
+        'testdataset/data/folder2/file.txt': 'read',
+    }
+
+
+async def test_recursive_lock_publish_in_prefix_mode_returns_acquired_locks_on_failure(httpx_mock, nodes):
+    httpx_mock.add_response(
+        method='POST',
+        url=LOCK_URL,
+        status_code=409,
+        json={},
+        match_json={'resource_key': 'testdataset/data/folder1', 'operation': 'read'},
+    )
+    httpx_mock.add_response(method='POST', url=LOCK_URL, json={})
+    folder_crud = mock.AsyncMock()
+    folder_crud.get_children.return_value = []
+    locking_manager = LockingManager(folder_crud, mode='prefix')
+
+    locked_node, err = await locking_manager.recursive_lock_publish(nodes[:1])
+
+    assert err is not None
+    assert locked_node == [('testdataset/data', 'read')]
+
+
+async def test_unlock_resources_unlocks_all_resources_before_raising(httpx_mock):
+    httpx_mock.add_response(
+        method='DELETE',
+        url=LOCK_URL,
+        status_code=400,
+        json={},
+        match_json={'resource_key': 'key2', 'operation': 'write'},
+    )
+    httpx_mock.add_response(method='DELETE', url=LOCK_URL, json={})
+    locking_manager = LockingManager(mock.AsyncMock())
+
+    with pytest.raises(HTTPException):
+        await locking_manager.unlock_resources([('key1', 'read'), ('key2', 'write'), ('key3', 'read')])
+
+    assert set(get_locks(httpx_mock, 'DELETE')) == {'key1', 'key2', 'key3'}
+
+
+class TestRedisLockingManager:
+    async def test_recursive_lock_delete_acquires_all_locks_or_none(self, redis_client, lock_prefix, nodes):
+        owner = RedisLockingManager(mock.AsyncMock(), redis_client, mode='prefix', prefix=lock_prefix)
+        other = RedisLockingManager(mock.AsyncMock(), redis_client, mode='prefix', prefix=lock_prefix)
+        await other.lock_resource('testdataset/data/folder2/file.txt', 'read')
+
+        locked_node, err = await owner.recursive_lock_delete(nodes)
+
+        assert isinstance(err, ResourceLocked)
+        assert locked_node == []
+        assert await redis_client.exists(f'{{{lock_prefix}}}:testdataset/data/folder1') == 0
+        await other.unlock_resources(list(other.held))
+
+    async def test_read_locks_are_shared_and_exclude_write_locks(self, redis_client, lock_prefix):
+        first = RedisLockingManager(mock.AsyncMock(), redis_client, prefix=lock_prefix)
+        second = RedisLockingManager(mock.AsyncMock(), redis_client, prefix=lock_prefix)
+
+        await first.lock_resource('bucket/file.txt', 'read')
+        await second.lock_resource('bucket/file.txt', 'read')
+        with pytest.raises(ResourceLocked):
+            await second.lock_resource('bucket/file.txt', 'write')
+
+        await first.unlock_resources([('bucket/file.txt', 'read')])
+        await second.unlock_resources([('bucket/file.txt', 'read')])
+        await second.lock_resource('bucket/file.txt', 'write')
+
+        assert ('bucket/file.txt', 'write') in second.held
+        await second.unlock_resources(list(second.held))
+
+    async def test_lease_expires_when_it_is_not_renewed(self, redis_client, lock_prefix):
+        crashed = RedisLockingManager(mock.AsyncMock(), redis_client, prefix=lock_prefix, ttl=1)
+        other = RedisLockingManager(mock.AsyncMock(), redis_client, prefix=lock_prefix, ttl=1)
+        await crashed.lock_resource('bucket/file.txt', 'write')
+        crashed.renew_task.cancel()
+
+        await asyncio.sleep(1.1)
+        await other.lock_resource('bucket/file.txt', 'write')
+
+        assert ('bucket/file.txt', 'write') in other.held
+        await other.unlock_resources(list(other.held))
+
+    async def test_check_leases_raises_when_lease_was_lost(self, redis_client, lock_prefix):
+        locking_manager = RedisLockingManager(mock.AsyncMock(), redis_client, prefix=lock_prefix, ttl=1)
+        await locking_manager.lock_resource('bucket/file.txt', 'write')
+        locking_manager.check_leases()
+        await redis_client.delete(f'{{{lock_prefix}}}:bucket/file.txt')
+
+        await asyncio.sleep(0.5)
+
+        with pytest.raises(LockLeaseLost):
+            locking_manager.check_leases()
+        await locking_manager.unlock_resources(list(locking_manager.held))
+        locking_manager.check_leases()
+
+    async def test_check_leases_raises_when_lease_was_not_renewed_in_time(self, redis_client, lock_prefix):
+        locking_manager = RedisLockingManager(mock.AsyncMock(), redis_client, prefix=lock_prefix, ttl=1)
+        await locking_manager.lock_resource('bucket/file.txt', 'write')
+        locking_manager.renew_task.cancel()
+
+        await asyncio.sleep(1.1)
+
+        with pytest.raises(LockLeaseLost):
+            locking_manager.check_leases()
+        await locking_manager.unlock_resources(list(locking_manager.held))
+
+    async def test_folder_lock_excludes_lock_of_child_file_in_id_layout(self, redis_client, lock_prefix, nodes):
+        folder = {**nodes[0], 'name': 'folder2'}
+        file = {
+            **nodes[1],
+            'storage': {'location_uri': f'minio://http://minio.minio:9000/testdataset/objects/{uuid4()}'},
+        }
+        owner = RedisLockingManager(mock.AsyncMock(), redis_client, mode='prefix', prefix=lock_prefix)
+        other = RedisLockingManager(mock.AsyncMock(), redis_client, mode='prefix', prefix=lock_prefix)
+        locked_node, err = await owner.recursive_lock_delete([folder])
+        assert err is None
+
+        _, err = await other.recursive_lock_delete([file])
+
+        assert isinstance(err, ResourceLocked)
+        await owner.unlock_resources(locked_node)
@@ -35,11 +35,11 @@ async def background_task_requests(httpx_mock):
 
 
 @mock.patch.object(S3Client, 'copy_object')
-@mock.patch.object(S3Client, 'delete_object')
+@mock.patch.object(S3Client, 'delete_objects', return_value={})
 @mock.patch.object(FileActivityLogService, 'send_on_move_event')
 async def test_move_file_to_folder_should_create_file_with_correct_data(
     mock_send_on_move_event,
-    mock_delete_object,
+    mock_delete_objects,
     mock_copy_object,
     client,
     httpx_mock,
@@ -149,7 +149,7 @@ async def test_move_file_to_folder_should_create_file_with_correct_data(
     mock_copy_object.assert_called_with(
         dataset.code, 'data/164132046.png', dataset.code, 'data/folder_name/164132046.png'
     )
-    mock_delete_object.assert_called_with(dataset.code, 'data/164132046.png')
+    mock_delete_objects.assert_called_with(dataset.code, ['data/164132046.png'])
     mock_send_on_move_event.assert_called_with(
         dataset.code, {**file_dict, 'feedback': 'exist'}, 'admin', '/164132046.png', '/folder_name/164132046.png'
     )
@@ -267,11 +267,11 @@ async def test_move_folder_to_a_subfolder_should_create_file_with_correct_data(
 
 
 @mock.patch.object(S3Client, 'copy_object')
-@mock.patch.object(S3Client, 'delete_object')
+@mock.patch.object(S3Client, 'delete_objects', return_value={})
 @mock.patch.object(FileActivityLogService, 'send_on_move_event')
 async def test_move_file_to_dataset_root_should_create_new_file_and_remove_old_one(
     mock_send_on_move_event,
-    mock_delete_object,
+    mock_delete_objects,
     mock_copy_object,
     client,
     httpx_mock,
@@ -378,7 +378,7 @@ async def test_move_file_to_dataset_root_should_create_new_file_and_remove_old_o
     mock_copy_object.assert_called_with(
         dataset.code, 'data/folder_name/164132046.png', dataset.code, 'data/164132046.png'
     )
-    mock_delete_object.assert_called_with(dataset.code, 'data/folder_name/164132046.png')
+    mock_delete_objects.assert_called_with(dataset.code, ['data/folder_name/164132046.png'])
     mock_send_on_move_event.assert_called_with(
         dataset.code, {**file_dict, 'feedback': 'exist'}, 'admin', '/folder_name/164132046.png', '/164132046.png'
     )
@@ -412,11 +412,11 @@ async def test_move_wrong_file_ignored_when_relation_doesnt_exist(
 
 
 @mock.patch.object(S3Client, 'copy_object')
-@mock.patch.object(S3Client, 'delete_object')
+@mock.patch.object(S3Client, 'delete_objects', return_value={})
 @mock.patch.object(FileActivityLogService, 'send_on_move_event')
 async def test_move_file_from_a_subfolder_to_another_subfolder_should_create_file_with_correct_data(
     mock_send_on_move_event,
-    mock_delete_object,
+    mock_delete_objects,
     mock_copy_object,
     client,
     httpx_mock,
@@ -553,18 +553,18 @@ async def test_move_file_from_a_subfolder_to_another_subfolder_should_create_fil
     processing_file = [x.get('id') for x in res.json().get('result').get('processing')]
     assert processing_file == [file_dict['id']]
     mock_copy_object.assert_called_with(dataset.code, f'data/{old_file_path}', dataset.code, f'data/{new_file_path}')
-    mock_delete_object.assert_called_with(dataset.code, f'data/{old_file_path}')
+    mock_delete_objects.assert_called_with(dataset.code, [f'data/{old_file_path}'])
     mock_send_on_move_event.assert_called_with(
         dataset.code, {**file_dict, 'feedback': 'exist'}, 'admin', f'/{old_file_path}', f'/{new_file_path}'
     )
 
 
 @mock.patch.object(S3Client, 'copy_object')
-@mock.patch.object(S3Client, 'delete_object')
+@mock.patch.object(S3Client, 'delete_objects', return_value={})
 @mock.patch.object(FileActivityLogService, 'send_on_move_event')
 async def test_move_subfolder_to_dataset_root_should_create_file_with_correct_data(
     mock_send_on_move_event,
-    mock_delete_object,
+    mock_delete_objects,
     mock_copy_object,
     client,
     httpx_mock,
@@ -723,18 +723,18 @@ async def test_move_subfolder_to_dataset_root_should_create_file_with_correct_da
     processing_file = [x.get('id') for x in res.json().get('result').get('processing')]
     assert processing_file == [folder_sub1['id']]
     mock_copy_object.assert_called_with(dataset.code, f'data/{old_file_path}', dataset.code, f'data/{new_file_path}')
-    mock_delete_object.assert_called_with(dataset.code, f'data/{old_file_path}')
+    mock_delete_objects.assert_called_with(dataset.code, [f'data/{old_file_path}'])
     mock_send_on_move_event.assert_called_with(
         dataset.code, {**folder_sub1, 'feedback': 'exist'}, 'admin', '/', f'/{moved_folder["name"]}'
     )
 
 
 @mock.patch.object(S3Client, 'copy_object')
-@mock.patch.object(S3Client, 'delete_object')
+@mock.patch.object(S3Client, 'delete_objects', return_value={})
 @mock.patch.object(FileActivityLogService, 'send_on_move_event')
 async def test_move_subfolder_with_file_to_subfolder_should_create_file_with_correct_data(
     mock_send_on_move_event,
-    mock_delete_object,
+    mock_delete_objects,
     mock_copy_object,
     client,
     httpx_mock,
@@ -910,18 +910,18 @@ async def test_move_subfolder_with_file_to_subfolder_should_create_file_with_cor
     processing_file = [x.get('id') for x in res.json().get('result').get('processing')]
     assert processing_file == [folder_sub1['id']]
     mock_copy_object.assert_called_with(dataset.code, f'data/{old_file_path}', dataset.code, f'data/{new_file_path}')
-    mock_delete_object.assert_called_with(dataset.code, f'data/{old_file_path}')
+    mock_delete_objects.assert_called_with(dataset.code, [f'data/{old_file_path}'])
     mock_send_on_move_event.assert_called_with(
         dataset.code, {**folder_sub1, 'feedback': 'exist'}, 'admin', 'folder_name', '/folder_name/sub2/sub1'
     )
 
 
 @mock.patch.object(S3Client, 'copy_object')
-@mock.patch.object(S3Client, 'delete_object')
+@mock.patch.object(S3Client, 'delete_objects', return_value={})
 @mock.patch.object(FileActivityLogService, 'send_on_move_event')
 async def test_move_subfolder_with_files_and_folders_to_dataset_root_should_create_file_with_correct_data(
     mock_send_on_move_event,
-    mock_delete_object,
+    mock_delete_objects,
     mock_copy_object,
     client,
     httpx_mock,
@@ -1130,18 +1130,18 @@ async def test_move_subfolder_with_files_and_folders_to_dataset_root_should_crea
     processing_file = [x.get('id') for x in res.json().get('result').get('processing')]
     assert processing_file == [folder_sub1['id']]
     mock_copy_object.assert_called_with(dataset.code, f'data/{old_file_path}', dataset.code, f'data/{new_file_path}')
-    mock_delete_object.assert_called_with(dataset.code, f'data/{old_file_path}')
+    mock_delete_objects.assert_called_with(dataset.code, [f'data/{old_file_path}'])
     mock_send_on_move_event.assert_called_with(
         dataset.code, {**folder_sub1, 'feedback': 'exist'}, 'admin', '/', '/sub1'
     )
 
 
 @mock.patch.object(S3Client, 'copy_object')
-@mock.patch.object(S3Client, 'delete_object')
+@mock.patch.object(S3Client, 'delete_objects', return_value={})
 @mock.patch.object(FileActivityLogService, 'send_on_move_event')
 async def test_move_subfolder_with_files_and_folders_to_folder_should_create_file_with_correct_data(
     mock_send_on_move_event,
-    mock_delete_object,
+    mock_delete_objects,
     mock_copy_object,
     client,
     httpx_mock,
@@ -1372,7 +1372,7 @@ async def test_move_subfolder_with_files_and_folders_to_folder_should_create_fil
     processing_file = [x.get('id') for x in res.json().get('result').get('processing')]
     assert processing_file == [folder_sub1['id']]
     mock_copy_object.assert_called_with(dataset.code, f'data/{old_file_path}', dataset.code, f'data/{new_file_path}')
-    mock_delete_object.assert_called_with(dataset.code, f'data/{old_file_path}')
+    mock_delete_objects.assert_called_with(dataset.code, [f'data/{old_file_path}'])
     mock_send_on_move_event.assert_called_with(
         dataset.code, {**folder_sub1, 'feedback': 'exist'}, 'admin', 'folder_name', '/folder_name/sub3/sub1'
     )
@@ -0,0 +1,83 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import pytest
+
+from dataset.components.file.normalizer import CSVNormalizer
+from dataset.components.file.normalizer import RowSplitter
+from dataset.components.file.normalizer import normalize_csv
+
+
+class FakeBody:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.closed = False
+
+    async def __aenter__(self) -> 'FakeBody':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.closed = True
+
+    async def read(self, size: int = -1) -> bytes:
+        chunk, self.data = self.data[:size], self.data[size:]
+        return chunk
+
+
+async def normalize(data: bytes, limit: int | None = None, chunk_size: int = 7, truncated: bool = False) -> str:
+    normalizer = CSVNormalizer(limit, sample_size=16)
+    return ''.join([part async for part in normalize_csv(FakeBody(data), normalizer, chunk_size, truncated)])
+
+
+class TestRowSplitter:
+    @pytest.mark.parametrize('chunk_size', [1, 3, 100])
+    def test_feed_splits_rows_outside_of_quoted_fields(self, chunk_size):
+        data = b'a,b\n"x\ny",2\r\n3,4'
+        splitter = RowSplitter()
+
+        rows = []
+        for i in range(0, len(data), chunk_size):
+            rows += splitter.feed(data[i : i + chunk_size])
+        rows += splitter.finish()
+
+        assert rows == [(0, b'a,b\n'), (4, b'"x\ny",2\r\n'), (13, b'3,4')]
+
+
+class TestNormalizeCSV:
+    @pytest.mark.parametrize('chunk_size', [1, 7, 1000])
+    async def test_normalize_csv_converts_rows_to_comma_separated(self, chunk_size):
+        data = b'a;b;c\n1;"x;\ny";3\n4;5;6'
+
+        content = await normalize(data, chunk_size=chunk_size)
+
+        assert content == 'a,b,c\r\n1,"x;\ny",3\r\n4,5,6\r\n'
+
+    async def test_normalize_csv_stops_before_row_exceeding_limit(self):
+        data = b''.join(f'{i}\t{i}\n'.encode() for i in range(100))
+
+        content = await normalize(data, limit=30)
+
+        assert content == '0,0\r\n1,1\r\n2,2\r\n3,3\r\n4,4\r\n5,5\r\n'
+
+    async def test_normalize_csv_closes_body_when_limit_is_reached(self):
+        body = FakeBody(b'a,b\n' * 1000)
+        normalizer = CSVNormalizer(10, sample_size=16)
+
+        content = [part async for part in normalize_csv(body, normalizer, 7)]
+
+        assert ''.join(content) == 'a,b\r\na,b\r\n'
+        assert body.closed
+        assert body.data
+
+    async def test_normalize_csv_skips_incomplete_last_row_of_truncated_body(self):
+        content = await normalize(b'a,b\n1,2\n3,', truncated=True)
+
+        assert content == 'a,b\r\n1,2\r\n'
+
+    async def test_normalize_csv_returns_short_file(self):
+        content = await normalize(b'a,b')
+
+        assert content == 'a,b\r\n'
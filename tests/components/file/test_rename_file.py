@@ -103,9 +103,9 @@ async def test_rename_file_should_add_file_to_ignoring_when_file_wrong_and_retur
 
 
 @mock.patch.object(S3Client, 'copy_object')
-@mock.patch.object(S3Client, 'delete_object')
+@mock.patch.object(S3Client, 'delete_objects', return_value={})
 async def test_rename_top_level_folder_keeps_all_subfolders_and_files_order(
-    mock_delete_object, mock_copy_object, client, httpx_mock, dataset_factory, authorization_header
+    mock_delete_objects, mock_copy_object, client, httpx_mock, dataset_factory, authorization_header
 ):
     dataset = await dataset_factory.create()
     dataset_geid = str(dataset.id)
@@ -305,9 +305,9 @@ async def test_rename_top_level_folder_keeps_all_subfolders_and_files_order(
 
 
 @mock.patch.object(S3Client, 'copy_object')
-@mock.patch.object(S3Client, 'delete_object')
+@mock.patch.object(S3Client, 'delete_objects', return_value={})
 async def test_rename_middle_level_folder_keeps_all_subfolders_and_files_order(
-    mock_delete_object, mock_copy_object, client, httpx_mock, dataset_factory, authorization_header
+    mock_delete_objects, mock_copy_object, client, httpx_mock, dataset_factory, authorization_header
 ):
     dataset = await dataset_factory.create()
     dataset_geid = str(dataset.id)
@@ -492,9 +492,9 @@ async def test_rename_middle_level_folder_keeps_all_subfolders_and_files_order(
 
 
 @mock.patch.object(S3Client, 'copy_object')
-@mock.patch.object(S3Client, 'delete_object')
+@mock.patch.object(S3Client, 'delete_objects', return_value={})
 async def test_rename_bottom_level_folder_keeps_all_subfolders_and_files_order(
-    mock_delete_object, mock_copy_object, client, httpx_mock, dataset_factory, authorization_header
+    mock_delete_objects, mock_copy_object, client, httpx_mock, dataset_factory, authorization_header
 ):
     dataset = await dataset_factory.create()
     dataset_geid = str(dataset.id)
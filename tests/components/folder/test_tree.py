@@ -0,0 +1,66 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import pytest
+
+from dataset.components.folder.crud import FolderCRUD
+from dataset.components.folder.tree import ContainerTree
+
+
+@pytest.fixture
+def items() -> list[dict[str, str]]:
+    return [
+        {'id': 'folder1', 'parent': None, 'parent_path': None, 'name': 'folder1', 'type': 'folder'},
+        {'id': 'file1', 'parent': None, 'parent_path': None, 'name': 'file1.txt', 'type': 'file'},
+        {'id': 'folder2', 'parent': 'folder1', 'parent_path': 'folder1', 'name': 'folder2', 'type': 'folder'},
+        {'id': 'file2', 'parent': 'folder1', 'parent_path': 'folder1', 'name': 'file2.txt', 'type': 'file'},
+        {'id': 'file3', 'parent': 'folder2', 'parent_path': 'folder1/folder2', 'name': 'file3.txt', 'type': 'file'},
+    ]
+
+
+class TestContainerTree:
+    def test_get_children_returns_direct_children_only(self, items):
+        tree = ContainerTree('code', 'dataset', items)
+
+        assert [item['id'] for item in tree.get_children(None)] == ['folder1', 'file1']
+        assert [item['id'] for item in tree.get_children('folder1')] == ['folder2', 'file2']
+        assert tree.get_children('file1') == []
+
+    def test_get_by_id_and_path_return_indexed_item(self, items):
+        tree = ContainerTree('code', 'dataset', items)
+
+        assert tree.get_by_id('file3')['name'] == 'file3.txt'
+        assert tree.get_by_path('folder1/folder2/file3.txt')['id'] == 'file3'
+        assert tree.get_by_id('unknown') is None
+
+    def test_iter_descendants_yields_parents_before_children(self, items):
+        tree = ContainerTree('code', 'dataset', items)
+
+        assert [item['id'] for item in tree.iter_descendants('folder1')] == ['folder2', 'file3', 'file2']
+
+    def test_get_files_returns_only_files(self, items):
+        tree = ContainerTree('code', 'dataset', items)
+
+        assert [item['id'] for item in tree.get_files()] == ['file1', 'file2', 'file3']
+
+
+async def test_folder_crud_get_children_lists_container_once(httpx_mock, metadata_service, items):
+    httpx_mock.add_response(
+        method='GET',
+        url=(
+            'http://metadata_service/v1/items/search/?'
+            'recursive=true&zone=1&container_type=dataset&page_size=100&page=0&container_code=code'
+        ),
+        json={'page': 0, 'num_of_pages': 1, 'result': items},
+    )
+    folder_crud = FolderCRUD(None, metadata_service)
+
+    await folder_crud.get_children('code', None)
+    await folder_crud.get_children('code', 'folder1')
+    children = await folder_crud.get_children('code', 'folder2')
+
+    assert [item['id'] for item in children] == ['file3']
+    assert len(httpx_mock.get_requests()) == 1
@@ -0,0 +1,78 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from uuid import uuid4
+
+import pytest
+from redis.asyncio import Redis
+
+from dataset.components.job.queue import JobQueue
+from dataset.components.job.schemas import JobType
+
+
+@pytest.fixture
+async def job_queue(redis_url) -> JobQueue:
+    redis_client = Redis(host=redis_url[0], port=redis_url[1])
+    yield JobQueue(redis_client, name=f'test:{uuid4()}', visibility_timeout=60, retry_delay=0)
+    await redis_client.aclose()
+
+
+class TestJobQueue:
+    async def test_reserve_returns_enqueued_jobs_in_order(self, job_queue):
+        first = await job_queue.enqueue(JobType.IMPORT_FILES, {'dataset_id': '1'})
+        second = await job_queue.enqueue(JobType.DELETE_FILES, {'dataset_id': '2'}, 'Bearer token')
+
+        received_first = await job_queue.reserve()
+        received_second = await job_queue.reserve()
+
+        assert received_first.id == first.id
+        assert received_first.attempts == 1
+        assert received_second.id == second.id
+        assert received_second.authorization == 'Bearer token'
+        assert await job_queue.reserve() is None
+
+    async def test_ack_removes_job_from_queue(self, job_queue):
+        await job_queue.enqueue(JobType.MOVE_FILES, {})
+        job = await job_queue.reserve()
+
+        await job_queue.ack(job)
+
+        assert await job_queue.redis_client.zcard(job_queue.processing_key) == 0
+        assert await job_queue.redis_client.hlen(job_queue.jobs_key) == 0
+
+    async def test_requeue_expired_returns_job_when_visibility_timeout_passes(self, job_queue):
+        job_queue.visibility_timeout = -1
+        await job_queue.enqueue(JobType.RENAME_FILE, {})
+        job = await job_queue.reserve()
+
+        count = await job_queue.requeue_expired()
+        received = await job_queue.reserve()
+
+        assert count == 1
+        assert received.id == job.id
+        assert received.attempts == 2
+
+    async def test_retry_dead_letters_job_when_it_runs_out_of_attempts(self, job_queue):
+        await job_queue.enqueue(JobType.PUBLISH_VERSION, {})
+        job = await job_queue.reserve()
+        job.max_attempts = 1
+
+        await job_queue.retry(job, 'error')
+
+        assert await job_queue.redis_client.lrange(job_queue.dead_key, 0, -1) == [job.id.encode()]
+        assert await job_queue.redis_client.zcard(job_queue.processing_key) == 0
+
+    async def test_retry_makes_job_visible_again_after_retry_delay(self, job_queue):
+        await job_queue.enqueue(JobType.IMPORT_FILES, {})
+        job = await job_queue.reserve()
+
+        await job_queue.retry(job, 'error')
+        await job_queue.requeue_expired()
+        received = await job_queue.reserve()
+
+        assert received.id == job.id
+        assert received.error == 'error'
+        assert received.attempts == 2
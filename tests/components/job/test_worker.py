@@ -0,0 +1,113 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from unittest import mock
+from uuid import uuid4
+
+import pytest
+from redis.asyncio import Redis
+
+from dataset.components.file.activity_log import FileActivityLogService
+from dataset.components.file.exceptions import ResourceLocked
+from dataset.components.file.locks import LockingManager
+from dataset.components.file.tasks import FileOperationTasks
+from dataset.components.job.queue import JobQueue
+from dataset.components.job.schemas import JobType
+from dataset.worker import Worker
+
+
+@pytest.fixture
+async def job_queue(redis_url) -> JobQueue:
+    redis_client = Redis(host=redis_url[0], port=redis_url[1])
+    yield JobQueue(redis_client, name=f'test:{uuid4()}', visibility_timeout=60, retry_delay=0)
+    await redis_client.aclose()
+
+
+class TestWorker:
+    @mock.patch.object(LockingManager, 'recursive_lock_import', return_value=([], ResourceLocked('key')))
+    @mock.patch('dataset.worker.get_s3_client', new=mock.AsyncMock())
+    @mock.patch('dataset.worker.get_kafka_client', new=mock.AsyncMock())
+    @mock.patch('dataset.worker.redis_client', new_callable=mock.AsyncMock)
+    @mock.patch('dataset.worker.get_db_engine', new_callable=mock.AsyncMock)
+    async def test_failing_copy_job_is_retried_and_then_dead_lettered(
+        self,
+        mock_get_db_engine,
+        mock_redis_client,
+        mock_recursive_lock_import,
+        job_queue,
+        db_engine,
+        httpx_mock,
+        dataset_factory,
+    ):
+        mock_get_db_engine.return_value = db_engine
+        mock_redis_client.return_value = job_queue.redis_client
+        httpx_mock.add_response(method='POST', url='http://data_ops_util/v1/task-stream/', json={})
+        dataset = await dataset_factory.create()
+        file = {'id': str(uuid4()), 'parent': None, 'parent_path': None, 'type': 'file', 'name': 'file.txt'}
+        payload = {
+            'dataset_id': str(dataset.id),
+            'import_list': [file],
+            'operator': 'admin',
+            'project_code': 'project',
+            'session_id': 'session',
+            'network': {'origin': 'unknown'},
+        }
+        job = await job_queue.enqueue(JobType.IMPORT_FILES, payload)
+        worker = Worker(job_queue, concurrency=1)
+
+        for _ in range(job.max_attempts):
+            await job_queue.requeue_expired()
+            reserved = await job_queue.reserve()
+            await worker.semaphore.acquire()
+            await worker.process(reserved)
+
+        assert mock_recursive_lock_import.call_count == job.max_attempts
+        assert reserved.attempts == job.max_attempts
+        assert await job_queue.redis_client.lrange(job_queue.dead_key, 0, -1) == [job.id.encode()]
+        assert await job_queue.reserve() is None
+
+    @mock.patch.object(FileActivityLogService, 'send_on_import_event', side_effect=Exception('kafka is down'))
+    @mock.patch.object(FileOperationTasks, 'recursive_copy', return_value=(1, 10, []))
+    @mock.patch.object(LockingManager, 'recursive_lock_import', return_value=([], None))
+    @mock.patch('dataset.worker.get_s3_client', new=mock.AsyncMock())
+    @mock.patch('dataset.worker.get_kafka_client', new=mock.AsyncMock())
+    @mock.patch('dataset.worker.redis_client', new_callable=mock.AsyncMock)
+    @mock.patch('dataset.worker.get_db_engine', new_callable=mock.AsyncMock)
+    async def test_copy_job_failing_after_files_were_copied_is_not_retried(
+        self,
+        mock_get_db_engine,
+        mock_redis_client,
+        mock_recursive_lock_import,
+        mock_recursive_copy,
+        mock_send_on_import_event,
+        job_queue,
+        db_engine,
+        httpx_mock,
+        dataset_factory,
+    ):
+        mock_get_db_engine.return_value = db_engine
+        mock_redis_client.return_value = job_queue.redis_client
+        httpx_mock.add_response(method='POST', url='http://data_ops_util/v1/task-stream/', json={})
+        dataset = await dataset_factory.create()
+        file = {'id': str(uuid4()), 'parent': None, 'parent_path': None, 'type': 'file', 'name': 'file.txt'}
+        payload = {
+            'dataset_id': str(dataset.id),
+            'import_list': [file],
+            'operator': 'admin',
+            'project_code': 'project',
+            'session_id': 'session',
+            'network': {'origin': 'unknown'},
+        }
+        job = await job_queue.enqueue(JobType.IMPORT_FILES, payload)
+        worker = Worker(job_queue, concurrency=1)
+
+        reserved = await job_queue.reserve()
+        await worker.semaphore.acquire()
+        await worker.process(reserved)
+
+        mock_recursive_copy.assert_called_once()
+        assert await job_queue.redis_client.hexists(job_queue.jobs_key, job.id) == 0
+        assert await job_queue.redis_client.lrange(job_queue.dead_key, 0, -1) == []
@@ -0,0 +1,63 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from dataset.components.object_storage.batch import DeleteObjectsBatcher
+from dataset.components.object_storage.batch import ObjectDeleteFailed
+
+
+class FakeS3Client:
+    def __init__(self, errors: dict[str, dict[str, Any]] | None = None) -> None:
+        self.errors = errors or {}
+        self.requests = []
+
+    async def delete_objects(self, bucket: str, keys: list[str]) -> dict[str, dict[str, Any]]:
+        self.requests.append((bucket, keys))
+        return {key: error for key, error in self.errors.items() if key in keys}
+
+
+class TestDeleteObjectsBatcher:
+    async def test_delete_coalesces_keys_into_requests_of_batch_size_per_bucket(self):
+        s3_client = FakeS3Client()
+        batcher = DeleteObjectsBatcher(s3_client, batch_size=3, delay=0.01)
+
+        await asyncio.gather(
+            *[batcher.delete('bucket-a', f'key-{i}') for i in range(5)], batcher.delete('bucket-b', 'key')
+        )
+
+        assert sorted(s3_client.requests) == [
+            ('bucket-a', ['key-0', 'key-1', 'key-2']),
+            ('bucket-a', ['key-3', 'key-4']),
+            ('bucket-b', ['key']),
+        ]
+
+    async def test_delete_raises_error_of_the_key_only(self):
+        s3_client = FakeS3Client({'key-1': {'Key': 'key-1', 'Code': 'AccessDenied', 'Message': 'Access Denied'}})
+        batcher = DeleteObjectsBatcher(s3_client, batch_size=10, delay=0.01)
+
+        results = await asyncio.gather(
+            *[batcher.delete('bucket', f'key-{i}') for i in range(3)], return_exceptions=True
+        )
+
+        assert results[0] is None
+        assert isinstance(results[1], ObjectDeleteFailed)
+        assert results[1].code == 'AccessDenied'
+        assert results[2] is None
+        assert len(s3_client.requests) == 1
+
+    async def test_delete_raises_for_all_keys_when_request_failed(self):
+        class FailingS3Client:
+            async def delete_objects(self, bucket: str, keys: list[str]) -> dict[str, dict[str, Any]]:
+                raise ConnectionError('connection lost')
+
+        batcher = DeleteObjectsBatcher(FailingS3Client(), batch_size=10, delay=0.01)
+
+        with pytest.raises(ObjectDeleteFailed, match='connection lost'):
+            await batcher.delete('bucket', 'key')
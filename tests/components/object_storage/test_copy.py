@@ -0,0 +1,121 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from typing import Any
+
+import pytest
+
+from dataset.components.object_storage.copy import ObjectCopier
+
+
+class FakeS3Client:
+    def __init__(self, size: int, failures: dict[int, int] | None = None) -> None:
+        self.size = size
+        self.failures = failures or {}
+        self.calls = []
+        self.parts = {}
+
+    async def head_object(self, bucket: str, key: str) -> dict[str, Any]:
+        self.calls.append('head_object')
+        return {'ContentLength': self.size, 'ContentType': 'text/csv', 'Metadata': {'owner': 'admin'}}
+
+    async def copy_object(self, source_bucket: str, source_key: str, dest_bucket: str, dest_key: str):
+        self.calls.append('copy_object')
+        return {'VersionId': 'copy-version'}
+
+    async def create_multipart_upload(
+        self, bucket: str, key: str, content_type: str | None = None, metadata: dict[str, str] | None = None
+    ) -> str:
+        self.calls.append('create_multipart_upload')
+        self.content_type = content_type
+        self.metadata = metadata
+        return 'upload-id'
+
+    async def upload_part_copy(
+        self, bucket: str, key: str, upload_id: str, part_number: int, source_bucket: str, source_key: str, byte_range
+    ) -> str:
+        if self.failures.get(part_number, 0) > 0:
+            self.failures[part_number] -= 1
+            raise ConnectionError('connection reset')
+        self.parts[part_number] = byte_range
+        return f'etag-{part_number}'
+
+    async def complete_multipart_upload(self, bucket: str, key: str, upload_id: str, parts: list[dict[str, Any]]):
+        self.calls.append('complete_multipart_upload')
+        self.completed_parts = parts
+        return {'VersionId': 'multipart-version'}
+
+    async def abort_multipart_upload(self, bucket: str, key: str, upload_id: str) -> None:
+        self.calls.append('abort_multipart_upload')
+
+
+class TestObjectCopier:
+    async def test_copy_uses_single_request_for_object_below_threshold(self):
+        s3_client = FakeS3Client(size=10)
+        copier = ObjectCopier(s3_client, threshold=100)
+
+        version = await copier.copy('source', 'key', 'dest', 'key', size=10)
+
+        assert s3_client.calls == ['copy_object']
+        assert version == 'copy-version'
+
+    async def test_copy_copies_parts_of_large_object_concurrently(self):
+        s3_client = FakeS3Client(size=250)
+        copier = ObjectCopier(s3_client, threshold=100, part_size=100, concurrency=2)
+
+        version = await copier.copy('source', 'key', 'dest', 'key', size=250)
+
+        assert version == 'multipart-version'
+        assert s3_client.calls == ['head_object', 'create_multipart_upload', 'complete_multipart_upload']
+        assert s3_client.parts == {1: (0, 99), 2: (100, 199), 3: (200, 249)}
+        assert s3_client.completed_parts == [
+            {'ETag': 'etag-1', 'PartNumber': 1},
+            {'ETag': 'etag-2', 'PartNumber': 2},
+            {'ETag': 'etag-3', 'PartNumber': 3},
+        ]
+
+    async def test_copy_sets_content_type_and_metadata_of_source_on_multipart_upload(self):
+        s3_client = FakeS3Client(size=200)
+        copier = ObjectCopier(s3_client, threshold=100, part_size=100)
+
+        await copier.copy('source', 'key', 'dest', 'key')
+
+        assert s3_client.content_type == 'text/csv'
+        assert s3_client.metadata == {'owner': 'admin'}
+
+    async def test_copy_takes_part_ranges_from_object_size_instead_of_size_hint(self):
+        s3_client = FakeS3Client(size=300)
+        copier = ObjectCopier(s3_client, threshold=100, part_size=100)
+
+        await copier.copy('source', 'key', 'dest', 'key', size=150)
+
+        assert s3_client.parts[3] == (200, 299)
+
+    async def test_copy_retries_failed_part_only(self):
+        s3_client = FakeS3Client(size=200, failures={2: 1})
+        copier = ObjectCopier(s3_client, threshold=100, part_size=100, retry_delay=0)
+
+        await copier.copy('source', 'key', 'dest', 'key')
+
+        assert s3_client.parts == {1: (0, 99), 2: (100, 199)}
+        assert s3_client.calls[-1] == 'complete_multipart_upload'
+
+    async def test_copy_aborts_upload_when_part_keeps_failing(self):
+        s3_client = FakeS3Client(size=200, failures={1: 3})
+        copier = ObjectCopier(s3_client, threshold=100, part_size=100, attempts=3, retry_delay=0)
+
+        with pytest.raises(ConnectionError):
+            await copier.copy('source', 'key', 'dest', 'key')
+
+        assert s3_client.calls[-1] == 'abort_multipart_upload'
+
+    def test_get_part_ranges_grows_part_size_to_stay_within_part_limit(self):
+        copier = ObjectCopier(FakeS3Client(size=0), part_size=1)
+
+        ranges = copier.get_part_ranges(20000)
+
+        assert len(ranges) == 10000
+        assert ranges[-1] == (19998, 19999)
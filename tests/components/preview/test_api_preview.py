@@ -140,3 +140,99 @@ async def test_preview_stream_should_return_404_when_file_not_found(client, http
     res = await client.get('/v1/any/preview/stream', headers=authorization_header)
     assert res.status_code == 404
     assert res.json() == {'error': {'code': 'global.not_found', 'details': 'Requested resource is not found'}}
+
+
+async def test_preview_stream_should_return_206_with_requested_range(
+    client, httpx_mock, minio_container, authorization_header
+):
+    bucket_name = str(uuid4())
+    file_name = 'test_folder.csv'
+    file_body = 'a,b,c\n1,2,3\n'
+    s3_client = await get_s3_client()
+    await s3_client.create_bucket(bucket_name)
+    await s3_client.boto_client.upload_object(bucket_name, file_name, file_body)
+
+    file_geid = '6c99e8bb-ecff-44c8-8fdc-a3d0ed7ac067-164.8138467'
+    httpx_mock.add_response(
+        method='GET',
+        url='http://metadata_service/v1/item/6c99e8bb-ecff-44c8-8fdc-a3d0ed7ac067-164.8138467/',
+        json={
+            'result': {
+                'id': file_geid,
+                'storage': {'location_uri': f'minio://http://10.3.7.220/{bucket_name}/{file_name}'},
+                'name': file_name,
+                'size': 1,
+            }
+        },
+    )
+    res = await client.get(f'/v1/{file_geid}/preview/stream', headers={**authorization_header, 'Range': 'bytes=6-'})
+    assert res.status_code == 206
+    assert res.text == '1,2,3\n'
+    assert res.headers['Content-Range'] == f'bytes 6-11/{len(file_body)}'
+    assert res.headers['ETag']
+
+
+async def test_preview_stream_should_return_304_when_etag_matches(
+    client, httpx_mock, minio_container, authorization_header
+):
+    bucket_name = str(uuid4())
+    file_name = 'test_folder.json'
+    s3_client = await get_s3_client()
+    await s3_client.create_bucket(bucket_name)
+    await s3_client.boto_client.upload_object(bucket_name, file_name, '{"test": "test1"}')
+
+    file_geid = '6c99e8bb-ecff-44c8-8fdc-a3d0ed7ac067-164.8138467'
+    httpx_mock.add_response(
+        method='GET',
+        url='http://metadata_service/v1/item/6c99e8bb-ecff-44c8-8fdc-a3d0ed7ac067-164.8138467/',
+        json={
+            'result': {
+                'id': file_geid,
+                'storage': {'location_uri': f'minio://http://10.3.7.220/{bucket_name}/{file_name}'},
+                'name': file_name,
+                'size': 1,
+            }
+        },
+    )
+    res = await client.get(f'/v1/{file_geid}/preview/stream', headers=authorization_header)
+    etag = res.headers['ETag']
+
+    res = await client.get(f'/v1/{file_geid}/preview/stream', headers={**authorization_header, 'If-None-Match': etag})
+    assert res.status_code == 304
+    assert res.headers['ETag'] == etag
+
+
+async def test_preview_stream_should_not_return_304_or_validators_of_object_when_normalized(
+    client, httpx_mock, minio_container, authorization_header
+):
+    bucket_name = str(uuid4())
+    file_name = 'test_folder.tsv'
+    s3_client = await get_s3_client()
+    await s3_client.create_bucket(bucket_name)
+    await s3_client.boto_client.upload_object(bucket_name, file_name, 'a\tb\n1\t2\n')
+
+    file_geid = '6c99e8bb-ecff-44c8-8fdc-a3d0ed7ac067-164.8138467'
+    httpx_mock.add_response(
+        method='GET',
+        url='http://metadata_service/v1/item/6c99e8bb-ecff-44c8-8fdc-a3d0ed7ac067-164.8138467/',
+        json={
+            'result': {
+                'id': file_geid,
+                'storage': {'location_uri': f'minio://http://10.3.7.220/{bucket_name}/{file_name}'},
+                'name': file_name,
+                'size': 1,
+            }
+        },
+    )
+    res = await client.get(f'/v1/{file_geid}/preview/stream', headers=authorization_header)
+    etag = res.headers['ETag']
+
+    res = await client.get(
+        f'/v1/{file_geid}/preview/stream',
+        params={'normalize': 'true'},
+        headers={**authorization_header, 'If-None-Match': etag},
+    )
+    assert res.status_code == 200
+    assert res.text == 'a,b\r\n1,2\r\n'
+    assert 'ETag' not in res.headers
+    assert 'Last-Modified' not in res.headers
@@ -0,0 +1,80 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from unittest import mock
+
+from dataset.components.file.crud import FileCRUD
+from dataset.components.file.schemas import FileSchema
+from dataset.components.preview.cache import PreviewCache
+from dataset.components.preview.cache import PreviewLRU
+
+
+class TestPreviewLRU:
+    def test_set_evicts_least_recently_used_values_over_size_limit(self):
+        lru = PreviewLRU(max_bytes=6)
+        lru.set('a', b'aa', 60)
+        lru.set('b', b'bb', 60)
+        lru.get('a')
+
+        lru.set('c', b'ccc', 60)
+
+        assert lru.get('a') == b'aa'
+        assert lru.get('b') is None
+        assert lru.get('c') == b'ccc'
+        assert lru.size == 5
+
+    def test_get_returns_none_for_expired_value(self):
+        lru = PreviewLRU(max_bytes=10)
+        lru.set('a', b'aa', 0)
+
+        assert lru.get('a') is None
+        assert lru.size == 0
+
+    def test_set_skips_value_larger_than_size_limit(self):
+        lru = PreviewLRU(max_bytes=1)
+        lru.set('a', b'aa', 60)
+
+        assert lru.get('a') is None
+
+
+class TestPreviewCache:
+    async def test_get_returns_preview_from_redis_and_stores_it_in_memory(self):
+        file = FileSchema(content='a,b', type='csv', size=3)
+        redis_client = mock.AsyncMock()
+        redis_client.get.return_value = file.json().encode()
+        preview_cache = PreviewCache(redis_client, PreviewLRU(max_bytes=1024))
+
+        assert await preview_cache.get('file-id', 'etag') == file
+        assert await preview_cache.get('file-id', 'etag') == file
+        redis_client.get.assert_called_once_with('dataset:preview:file-id:etag')
+
+    async def test_get_misses_preview_of_another_object_version(self):
+        redis_client = mock.AsyncMock()
+        redis_client.get.return_value = None
+        preview_cache = PreviewCache(redis_client, PreviewLRU(max_bytes=1024))
+        await preview_cache.set('file-id', 'etag', FileSchema(content='a,b', type='csv', size=3))
+
+        assert await preview_cache.get('file-id', 'new-etag') is None
+
+    async def test_get_preview_makes_no_s3_calls_on_cache_hit_for_file_with_recorded_version(self):
+        file = FileSchema(content='a,b', type='csv', size=3)
+        s3_client = mock.AsyncMock()
+        file_crud = FileCRUD(s3_client, mock.AsyncMock())
+        preview_cache = PreviewCache(mock.AsyncMock(), PreviewLRU(max_bytes=1024))
+        await preview_cache.set('file-id', 'version-id', file)
+        file_metadata = file_crud.parse_file_metadata(
+            {
+                'name': 'file.csv',
+                'size': 3,
+                'storage': {
+                    'location_uri': 'minio://http://10.3.7.220/dataset-code/data/file.csv',
+                    'version': 'version-id',
+                },
+            }
+        )
+
+        assert await preview_cache.get_preview(file_crud, 'file-id', file_metadata) == file
+        assert s3_client.mock_calls == []
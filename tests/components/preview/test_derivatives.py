@@ -0,0 +1,160 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+from dataset.components.file.crud import FileCRUD
+from dataset.components.file.schemas import FileSchema
+from dataset.components.object_storage.batch import DeleteObjectsBatcher
+from dataset.components.preview.derivatives import PreviewDerivatives
+from dataset.components.preview.headers import HeaderPreview
+from dataset.components.preview.schemas import PreviewHeaderSchema
+
+
+class FakeBody:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+    async def __aenter__(self) -> 'FakeBody':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+    async def read(self) -> bytes:
+        return self.data
+
+
+class FakeS3Client:
+    def __init__(self) -> None:
+        self.objects = {}
+        self.deleted_batches = []
+
+    async def upload_file(self, bucket, key, f):
+        self.objects[(bucket, key)] = f.read()
+
+    async def get_object(self, bucket, key, version_id=None, byte_range=None):
+        if (bucket, key) not in self.objects:
+            raise ClientError({'Error': {'Code': 'NoSuchKey'}}, 'GetObject')
+        return {'Body': FakeBody(self.objects[(bucket, key)])}
+
+    async def delete_object(self, bucket, key):
+        self.objects.pop((bucket, key), None)
+
+    async def delete_objects(self, bucket, keys):
+        self.deleted_batches.append(keys)
+        for key in keys:
+            self.objects.pop((bucket, key), None)
+        return {}
+
+
+def make_item(name: str) -> dict:
+    return {
+        'id': 'file-id',
+        'name': name,
+        'size': 10,
+        'storage': {'location_uri': f'minio://http://10.3.7.220/dataset-code/data/{name}'},
+    }
+
+
+def make_preview_derivatives() -> PreviewDerivatives:
+    file_crud = FileCRUD(FakeS3Client(), mock.Mock())
+    header_preview = HeaderPreview(file_crud)
+    return PreviewDerivatives(file_crud, header_preview, prefix='.preview', concurrency=2)
+
+
+class TestPreviewDerivatives:
+    async def test_build_stores_content_sidecar_served_by_get_content(self):
+        preview_derivatives = make_preview_derivatives()
+        file = FileSchema(content='a,b\r\n', type='csv', size=10)
+        preview_derivatives.file_crud.read_file = mock.AsyncMock(return_value=file)
+        item = make_item('file.csv')
+
+        await preview_derivatives.build(item)
+
+        file_metadata = preview_derivatives.file_crud.parse_file_metadata(item)
+        assert ('dataset-code', '.preview/file-id/content.json') in preview_derivatives.s3_client.objects
+        assert await preview_derivatives.get_content('file-id', file_metadata) == file
+        assert await preview_derivatives.get_header('file-id', file_metadata) is None
+
+    async def test_build_stores_header_sidecar_for_header_formats(self):
+        preview_derivatives = make_preview_derivatives()
+        header = PreviewHeaderSchema(type='nii.gz', format='nifti', header={'dimensions': [64, 64, 32]})
+        preview_derivatives.header_preview.read_header = mock.AsyncMock(return_value=header)
+        item = make_item('sub-01_T1w.nii.gz')
+
+        await preview_derivatives.build(item)
+
+        file_metadata = preview_derivatives.file_crud.parse_file_metadata(item)
+        assert await preview_derivatives.get_header('file-id', file_metadata) == header
+        assert await preview_derivatives.get_content('file-id', file_metadata) is None
+
+    async def test_build_does_not_raise_when_generation_fails(self):
+        preview_derivatives = make_preview_derivatives()
+        preview_derivatives.file_crud.read_file = mock.AsyncMock(side_effect=Exception())
+
+        await preview_derivatives.build(make_item('file.json'))
+
+        assert preview_derivatives.s3_client.objects == {}
+
+    async def test_submit_schedules_build_awaited_by_wait_when_enabled(self, mocker):
+        mocker.patch('dataset.components.preview.derivatives.settings.PREVIEW_DERIVATIVES_ENABLED', True)
+        preview_derivatives = make_preview_derivatives()
+        preview_derivatives.build = mock.AsyncMock()
+
+        await preview_derivatives.submit(make_item('file.csv'))
+        await preview_derivatives.wait()
+
+        preview_derivatives.build.assert_awaited_once()
+
+    async def test_submit_does_nothing_when_disabled(self, mocker):
+        mocker.patch('dataset.components.preview.derivatives.settings.PREVIEW_DERIVATIVES_ENABLED', False)
+        preview_derivatives = make_preview_derivatives()
+        preview_derivatives.build = mock.AsyncMock()
+
+        await preview_derivatives.submit(make_item('file.csv'))
+        await preview_derivatives.wait()
+
+        preview_derivatives.build.assert_not_called()
+        assert preview_derivatives.consumers == []
+
+    async def test_submit_builds_queued_items_with_bounded_number_of_consumers(self, mocker):
+        mocker.patch('dataset.components.preview.derivatives.settings.PREVIEW_DERIVATIVES_ENABLED', True)
+        preview_derivatives = make_preview_derivatives()
+        running = []
+        max_running = 0
+
+        async def build(item):
+            nonlocal max_running
+            running.append(item)
+            max_running = max(max_running, len(running))
+            await asyncio.sleep(0)
+            running.remove(item)
+
+        preview_derivatives.build = mock.AsyncMock(side_effect=build)
+
+        for _ in range(10):
+            await preview_derivatives.submit(make_item('file.csv'))
+        await preview_derivatives.wait()
+
+        assert preview_derivatives.build.await_count == 10
+        assert max_running == 2
+        assert preview_derivatives.consumers == []
+
+    async def test_delete_sends_sidecar_keys_through_batcher(self, mocker):
+        mocker.patch('dataset.components.preview.derivatives.settings.PREVIEW_DERIVATIVES_ENABLED', True)
+        preview_derivatives = make_preview_derivatives()
+        s3_client = preview_derivatives.s3_client
+        s3_client.objects[('dataset-code', '.preview/file-id/content.json')] = b'{}'
+        batcher = DeleteObjectsBatcher(s3_client, batch_size=10, delay=0.01)
+
+        await preview_derivatives.delete(make_item('file.csv'), batcher)
+
+        assert s3_client.objects == {}
+        assert s3_client.deleted_batches == [['.preview/file-id/content.json', '.preview/file-id/header.json']]
@@ -0,0 +1,172 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import gzip
+import os
+import struct
+from unittest import mock
+
+import pytest
+from botocore.exceptions import ClientError
+
+from dataset.components.file.crud import FileCRUD
+from dataset.components.preview.exceptions import HeaderPreviewNotSupported
+from dataset.components.preview.exceptions import InvalidHeader
+from dataset.components.preview.headers import HeaderPreview
+from dataset.components.preview.headers import NiftiHeaderReader
+
+
+class FakeBody:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+    async def __aenter__(self) -> 'FakeBody':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+    async def read(self) -> bytes:
+        return self.data
+
+
+class FakeS3Client:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.ranges = []
+
+    async def get_object(self, bucket, path, version_id=None, byte_range=None):
+        self.ranges.append(byte_range)
+        start, end = byte_range.removeprefix('bytes=').split('-')
+        if int(start) >= len(self.data):
+            raise ClientError({'Error': {'Code': 'InvalidRange'}}, 'GetObject')
+        chunk = self.data[int(start) : int(end) + 1]
+        return {
+            'Body': FakeBody(chunk),
+            'ContentRange': f'bytes {start}-{int(start) + len(chunk) - 1}/{len(self.data)}',
+        }
+
+
+def make_nifti1(byte_order: str = '<') -> bytes:
+    header = bytearray(348)
+    struct.pack_into(f'{byte_order}i', header, 0, 348)
+    struct.pack_into(f'{byte_order}8h', header, 40, 4, 64, 64, 32, 100, 1, 1, 1)
+    struct.pack_into(f'{byte_order}hh', header, 70, 4, 16)
+    struct.pack_into(f'{byte_order}8f', header, 76, -1.0, 2.0, 2.0, 3.0, 1.5, 0, 0, 0)
+    struct.pack_into(f'{byte_order}f', header, 108, 352.0)
+    struct.pack_into(f'{byte_order}f', header, 112, 1.0)
+    header[123] = 2 | 8
+    header[148:152] = b'test'
+    struct.pack_into(f'{byte_order}hh', header, 252, 1, 0)
+    struct.pack_into(f'{byte_order}3f', header, 256, 0.0, 0.0, 1.0)
+    struct.pack_into(f'{byte_order}3f', header, 268, 10.0, 20.0, 30.0)
+    header[344:348] = b'n+1\0'
+    return bytes(header) + bytes(4) + os.urandom(64 * 1024)
+
+
+def make_nifti2() -> bytes:
+    header = bytearray(540)
+    struct.pack_into('<i', header, 0, 540)
+    header[4:12] = b'n+2\0\r\n\x1a\n'
+    struct.pack_into('<hh', header, 12, 16, 32)
+    struct.pack_into('<8q', header, 16, 3, 256, 256, 128, 1, 1, 1, 1)
+    struct.pack_into('<8d', header, 104, 1.0, 0.5, 0.5, 1.0, 0, 0, 0, 0)
+    struct.pack_into('<q', header, 168, 544)
+    struct.pack_into('<ii', header, 344, 0, 2)
+    struct.pack_into('<4d', header, 400, 0.5, 0.0, 0.0, -64.0)
+    struct.pack_into('<4d', header, 432, 0.0, 0.5, 0.0, -64.0)
+    struct.pack_into('<4d', header, 464, 0.0, 0.0, 1.0, -64.0)
+    struct.pack_into('<i', header, 500, 2)
+    return bytes(header) + bytes(4)
+
+
+def make_header_preview(data: bytes, name: str, size: int | None = None) -> HeaderPreview:
+    file_crud = mock.Mock()
+    file_crud.s3_client = FakeS3Client(data)
+    file_crud.get_file_metadata = mock.AsyncMock(
+        return_value={
+            'bucket': 'bucket',
+            'path': name,
+            'type': FileCRUD(mock.Mock(), mock.Mock())._get_file_type(name),
+            'size': len(data) if size is None else size,
+            'version': None,
+        }
+    )
+    return HeaderPreview(file_crud)
+
+
+class TestNiftiHeaderReader:
+    @pytest.mark.parametrize('byte_order', ['<', '>'])
+    def test_parse_returns_nifti1_header_with_affine_from_qform(self, byte_order):
+        header = NiftiHeaderReader().parse(make_nifti1(byte_order)[:540])
+
+        assert header['format'] == 'nifti1'
+        assert header['dimensions'] == [64, 64, 32, 100]
+        assert header['voxel_sizes'] == [2.0, 2.0, 3.0, 1.5]
+        assert header['datatype'] == 'int16'
+        assert header['spatial_unit'] == 'mm'
+        assert header['temporal_unit'] == 'sec'
+        assert header['description'] == 'test'
+        assert header['affine'] == [
+            [-2.0, 0.0, 0.0, 10.0],
+            [0.0, -2.0, 0.0, 20.0],
+            [0.0, 0.0, -3.0, 30.0],
+            [0.0, 0.0, 0.0, 1.0],
+        ]
+
+    def test_parse_returns_nifti2_header_with_affine_from_sform(self):
+        header = NiftiHeaderReader().parse(make_nifti2())
+
+        assert header['format'] == 'nifti2'
+        assert header['dimensions'] == [256, 256, 128]
+        assert header['datatype'] == 'float32'
+        assert header['vox_offset'] == 544
+        assert header['affine'][0] == [0.5, 0.0, 0.0, -64.0]
+
+    def test_parse_raises_for_not_nifti_content(self):
+        with pytest.raises(InvalidHeader):
+            NiftiHeaderReader().parse(b'a,b,c\n' * 100)
+
+
+class TestHeaderPreview:
+    async def test_get_header_reads_only_the_beginning_of_gzip_compressed_file(self):
+        data = gzip.compress(make_nifti1())
+        header_preview = make_header_preview(data, 'sub-01_T1w.nii.gz')
+
+        header = await header_preview.get_header('file-id')
+
+        assert header.type == 'nii.gz'
+        assert header.header['dimensions'] == [64, 64, 32, 100]
+        assert header_preview.file_crud.s3_client.ranges == ['bytes=0-4095']
+
+    async def test_get_header_reads_plain_file_smaller_than_header_size(self):
+        data = make_nifti1()[:352]
+        header_preview = make_header_preview(data, 'sub-01.T1w.nii')
+
+        header = await header_preview.get_header('file-id')
+
+        assert header.type == 'nii'
+        assert header.header['format'] == 'nifti1'
+
+    async def test_get_header_raises_for_not_supported_file_type(self):
+        header_preview = make_header_preview(b'a,b', 'file.csv')
+
+        with pytest.raises(HeaderPreviewNotSupported):
+            await header_preview.get_header('file-id')
+
+    async def test_get_header_raises_for_empty_file_without_reading_it(self):
+        header_preview = make_header_preview(b'', 'sub-01_T1w.nii.gz')
+
+        with pytest.raises(InvalidHeader):
+            await header_preview.get_header('file-id')
+
+        assert header_preview.file_crud.s3_client.ranges == []
+
+    async def test_get_header_raises_for_empty_file_with_stale_size_in_metadata(self):
+        header_preview = make_header_preview(b'', 'sub-01_T1w.nii', size=352)
+
+        with pytest.raises(InvalidHeader):
+            await header_preview.get_header('file-id')
@@ -0,0 +1,64 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from unittest import mock
+
+import pytest
+
+from dataset.components.file.crud import FileCRUD
+from dataset.components.file.schemas import FileSchema
+from dataset.components.preview.loader import PreviewLoader
+
+
+def make_item(file_id: str, name: str, item_type: str = 'file') -> dict:
+    return {
+        'id': file_id,
+        'type': item_type,
+        'name': name,
+        'size': 10,
+        'storage': {'location_uri': f'minio://http://10.3.7.220/dataset-code/data/{name}'},
+    }
+
+
+@pytest.fixture
+def preview_loader(mocker) -> PreviewLoader:
+    mocker.patch('dataset.components.preview.loader.settings.PREVIEW_DERIVATIVES_ENABLED', False)
+    mocker.patch('dataset.components.preview.loader.settings.PREVIEW_CACHE_ENABLED', False)
+    metadata_service = mock.Mock()
+    metadata_service.get_by_ids = mock.AsyncMock(
+        return_value=[
+            make_item('file-1', 'a.csv'),
+            make_item('file-2', 'b.json'),
+            make_item('folder-1', 'folder', item_type='folder'),
+        ]
+    )
+    file_crud = FileCRUD(mock.Mock(), metadata_service)
+
+    async def read_file(file_metadata):
+        if file_metadata['type'] == 'json':
+            raise ValueError()
+        return FileSchema(content='a,b\r\n', type=file_metadata['type'], size=file_metadata['size'])
+
+    file_crud.read_file = mock.AsyncMock(side_effect=read_file)
+    return PreviewLoader(file_crud, mock.Mock(), mock.Mock(), concurrency=2)
+
+
+class TestPreviewLoader:
+    async def test_get_previews_returns_results_and_errors_in_requested_order(self, preview_loader):
+        previews = await preview_loader.get_previews(['missing', 'file-1', 'folder-1', 'file-2', 'file-1'])
+
+        assert [preview.file_id for preview in previews] == ['missing', 'file-1', 'folder-1', 'file-2', 'file-1']
+        assert previews[0].error['code'] == 'global.not_found'
+        assert previews[1].result.content == 'a,b\r\n'
+        assert previews[1].error is None
+        assert previews[2].error['code'] == 'global.not_found'
+        assert previews[3].error['code'] == 'global.unhandled_exception'
+        assert previews[4].result.type == 'csv'
+
+    async def test_get_previews_resolves_metadata_of_unique_ids_with_one_request(self, preview_loader):
+        await preview_loader.get_previews(['file-1', 'file-2', 'file-1'])
+
+        preview_loader.file_crud.metadata_service.get_by_ids.assert_awaited_once_with(['file-1', 'file-2'])
@@ -0,0 +1,82 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+
+from dataset.components.file.schemas import FileStatSchema
+from dataset.components.preview.exceptions import RangeNotSatisfiable
+from dataset.components.preview.ranges import get_validator_headers
+from dataset.components.preview.ranges import is_not_modified
+from dataset.components.preview.ranges import parse_range
+
+
+@pytest.fixture
+def file_stat() -> FileStatSchema:
+    return FileStatSchema(
+        bucket='bucket',
+        path='file.csv',
+        type='csv',
+        size=100,
+        etag='"abc"',
+        last_modified=datetime(2024, 1, 2, 3, 4, 5, 600, tzinfo=timezone.utc),
+    )
+
+
+def test_get_validator_headers_returns_etag_and_last_modified_in_http_format(file_stat):
+    assert get_validator_headers(file_stat) == {
+        'Accept-Ranges': 'bytes',
+        'ETag': '"abc"',
+        'Last-Modified': 'Tue, 02 Jan 2024 03:04:05 GMT',
+    }
+
+
+@pytest.mark.parametrize(
+    'if_none_match,if_modified_since,expected',
+    [
+        (None, None, False),
+        ('"abc"', None, True),
+        ('"xyz", W/"abc"', None, True),
+        ('*', None, True),
+        ('"xyz"', 'Tue, 02 Jan 2024 03:04:05 GMT', False),
+        (None, 'Tue, 02 Jan 2024 03:04:05 GMT', True),
+        (None, 'Tue, 02 Jan 2024 03:04:04 GMT', False),
+        (None, 'invalid date', False),
+    ],
+)
+def test_is_not_modified_evaluates_conditional_headers(file_stat, if_none_match, if_modified_since, expected):
+    assert is_not_modified(if_none_match, if_modified_since, file_stat) is expected
+
+
+@pytest.mark.parametrize(
+    'range_header,if_range,expected',
+    [
+        (None, None, None),
+        ('bytes=0-9', None, (0, 9)),
+        ('bytes=90-', None, (90, 99)),
+        ('bytes=-10', None, (90, 99)),
+        ('bytes=-1000', None, (0, 99)),
+        ('bytes=50-1000', None, (50, 99)),
+        ('bytes=0-9,20-29', None, None),
+        ('bytes=9-0', None, None),
+        ('bytes=a-b', None, None),
+        ('items=0-9', None, None),
+        ('bytes=0-9', '"abc"', (0, 9)),
+        ('bytes=0-9', '"xyz"', None),
+        ('bytes=0-9', 'Tue, 02 Jan 2024 03:04:05 GMT', (0, 9)),
+        ('bytes=0-9', 'Mon, 01 Jan 2024 00:00:00 GMT', None),
+    ],
+)
+def test_parse_range_returns_inclusive_byte_positions(file_stat, range_header, if_range, expected):
+    assert parse_range(range_header, if_range, file_stat) == expected
+
+
+@pytest.mark.parametrize('range_header', ['bytes=100-', 'bytes=200-300', 'bytes=-0'])
+def test_parse_range_raises_for_unsatisfiable_range(file_stat, range_header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(range_header, None, file_stat)
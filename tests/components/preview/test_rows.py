@@ -0,0 +1,100 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from unittest import mock
+
+import pytest
+
+from dataset.components.preview.exceptions import PreviewNotSupported
+from dataset.components.preview.rows import RowPager
+
+
+class FakeBody:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+    async def __aenter__(self) -> 'FakeBody':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+    async def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            size = len(self.data)
+        chunk, self.data = self.data[:size], self.data[size:]
+        return chunk
+
+
+class FakeS3Client:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.ranges = []
+
+    async def get_object(self, bucket, path, version_id=None, byte_range=None):
+        self.ranges.append(byte_range)
+        start, end = byte_range.removeprefix('bytes=').split('-')
+        end = int(end) + 1 if end else len(self.data)
+        return {'Body': FakeBody(self.data[int(start) : end])}
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+def make_row_pager(data: bytes, file_type: str = 'csv') -> RowPager:
+    file_crud = mock.Mock()
+    file_crud.s3_client = FakeS3Client(data)
+    file_crud.get_file_metadata = mock.AsyncMock(
+        return_value={'bucket': 'bucket', 'path': 'file.csv', 'type': file_type, 'size': len(data), 'version': 'v1'}
+    )
+    file_crud.get_object_version = mock.AsyncMock(return_value='v1')
+    return RowPager(file_crud, FakeRedis(), interval=10, chunk_size=16)
+
+
+class TestRowPager:
+    async def test_get_page_returns_requested_rows_with_header(self):
+        data = b'id,name\n' + b''.join(f'{i},"name\n{i}"\n'.encode() for i in range(1, 100))
+        row_pager = make_row_pager(data)
+
+        page = await row_pager.get_page('file-id', 55, 2)
+
+        assert page.header == ['id', 'name']
+        assert page.content == '55,"name\n55"\r\n56,"name\n56"\r\n'
+        assert page.total is None
+
+    async def test_get_page_reads_deep_page_with_one_ranged_read_when_index_is_cached(self):
+        data = b'id;value\n' + b''.join(f'{i};{i * 2}\n'.encode() for i in range(1, 100))
+        row_pager = make_row_pager(data)
+        await row_pager.get_page('file-id', 0, 100)
+        row_pager.s3_client.ranges.clear()
+
+        page = await row_pager.get_page('file-id', 91, 3)
+
+        assert page.content == '91,182\r\n92,184\r\n93,186\r\n'
+        assert page.total == 100
+        assert len(row_pager.s3_client.ranges) == 1
+
+    async def test_get_page_returns_no_rows_past_the_end(self):
+        row_pager = make_row_pager(b'a,b\n1,2\n')
+
+        page = await row_pager.get_page('file-id', 5, 10)
+
+        assert page.content == ''
+        assert page.total == 2
+
+    async def test_get_page_raises_for_not_csv_file(self):
+        row_pager = make_row_pager(b'{}', file_type='json')
+
+        with pytest.raises(PreviewNotSupported):
+            await row_pager.get_page('file-id', 0, 10)
@@ -0,0 +1,56 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from datetime import datetime
+from datetime import timezone
+from uuid import uuid4
+
+import pytest
+
+from dataset.components.dataset.models import Dataset
+from dataset.components.pagination import Cursor
+from dataset.components.pagination import InvalidCursor
+from dataset.components.pagination import Page
+from dataset.components.pagination import Pagination
+from dataset.components.sorting import Sorting
+from dataset.components.sorting import SortingOrder
+
+
+class TestCursor:
+    def test_decode_returns_cursor_that_was_encoded(self):
+        cursor = Cursor(field='created_at', value=datetime.now(timezone.utc), id=uuid4())
+
+        decoded = Cursor.decode(cursor.encode())
+
+        assert decoded.field == cursor.field
+        assert datetime.fromisoformat(decoded.value) == cursor.value
+        assert decoded.id == cursor.id
+
+    def test_decode_raises_invalid_cursor_for_malformed_token(self):
+        with pytest.raises(InvalidCursor):
+            Cursor.decode('malformed')
+
+
+class TestPagination:
+    def test_offset_is_ignored_when_cursor_is_set(self):
+        pagination = Pagination(page=3, page_size=10, cursor=Cursor(id=uuid4()).encode())
+
+        assert pagination.offset == 0
+
+    def test_apply_raises_invalid_cursor_when_cursor_does_not_match_sorting_field(self):
+        cursor = Cursor(field='code', value='code', id=uuid4()).encode()
+        pagination = Pagination(cursor=cursor)
+        sorting = Sorting(field='creator', order=SortingOrder.ASC)
+
+        with pytest.raises(InvalidCursor):
+            pagination.apply(Dataset.__table__.select(), Dataset, sorting)
+
+
+class TestPage:
+    def test_total_pages_is_none_when_count_is_not_selected(self):
+        page = Page(pagination=Pagination(), count=None, entries=[])
+
+        assert page.total_pages is None
@@ -24,6 +24,15 @@ class TestPageParameters:
         assert pagination.page == page
         assert pagination.page_size == page_size
 
+    def test_to_pagination_passes_cursor_and_include_count(self, fake):
+        cursor = fake.pystr()
+        page_parameters = PageParameters(cursor=cursor, include_count=False)
+
+        pagination = page_parameters.to_pagination()
+
+        assert pagination.cursor == cursor
+        assert pagination.include_count is False
+
 
 class TestSortParameters:
     def test_with_sort_by_fields_returns_a_class_with_overridden_type_annotation_for_sort_by_field(self):
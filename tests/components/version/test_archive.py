@@ -0,0 +1,81 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import io
+import zipfile
+from unittest import mock
+
+import pytest
+from pydantic import ValidationError
+
+from dataset.components.object_storage.copy import MAX_PARTS
+from dataset.components.version.archive import StreamingZipUpload
+from dataset.config import Settings
+from dataset.dependencies import get_s3_client
+
+
+class TestStreamingZipUpload:
+    async def test_archive_is_uploaded_in_parts_with_streamed_objects(self, minio_container, s3_test_client):
+        s3_client = await get_s3_client()
+        await s3_client.create_bucket('streamingzip')
+        content = b'0123456789' * 1024 * 1024
+        await s3_client.boto_client.upload_object('streamingzip', 'data/file.bin', content)
+
+        async with StreamingZipUpload(
+            s3_client, 'streamingzip', 'versions/test.zip', part_size=5 * 1024 * 1024, chunk_size=64 * 1024
+        ) as archive:
+            await archive.write_object('data/file.bin', 'streamingzip', 'data/file.bin', len(content))
+            await archive.write_str('default_schema.json', '{}')
+
+        assert len(archive.parts) > 1
+        body = s3_test_client.client.get_object(Bucket='streamingzip', Key='versions/test.zip')['Body'].read()
+        with zipfile.ZipFile(io.BytesIO(body)) as zip_file:
+            assert zip_file.namelist() == ['data/file.bin', 'default_schema.json']
+            assert zip_file.read('data/file.bin') == content
+            assert zip_file.read('default_schema.json') == b'{}'
+
+    async def test_upload_is_aborted_when_archive_fails(self, minio_container, s3_test_client):
+        s3_client = await get_s3_client()
+        await s3_client.create_bucket('streamingzipfail')
+
+        with pytest.raises(ValueError):
+            async with StreamingZipUpload(s3_client, 'streamingzipfail', 'versions/test.zip') as archive:
+                await archive.write_str('default_schema.json', '{}')
+                raise ValueError()
+
+        assert not s3_test_client.check_if_file_exists('streamingzipfail', 'versions/test.zip')
+
+    async def test_upload_is_aborted_when_it_cannot_be_completed(self):
+        s3_client = mock.AsyncMock()
+        s3_client.create_multipart_upload.return_value = 'upload-id'
+        s3_client.complete_multipart_upload.side_effect = ConnectionError()
+
+        with pytest.raises(ConnectionError):
+            async with StreamingZipUpload(s3_client, 'bucket', 'versions/test.zip') as archive:
+                await archive.write_str('default_schema.json', '{}')
+
+        s3_client.abort_multipart_upload.assert_awaited_once_with('bucket', 'versions/test.zip', 'upload-id')
+
+    def test_part_size_grows_with_total_size_to_fit_maximum_number_of_parts(self):
+        total_size = 500 * 1024**3
+
+        archive = StreamingZipUpload(
+            mock.AsyncMock(), 'bucket', 'versions/test.zip', total_size, part_size=16 * 1024**2
+        )
+
+        assert archive.part_size > 16 * 1024**2
+        assert total_size * 1.01 / archive.part_size <= MAX_PARTS
+
+    def test_part_size_is_configured_value_for_small_archives(self):
+        archive = StreamingZipUpload(mock.AsyncMock(), 'bucket', 'versions/test.zip', 1024, part_size=16 * 1024**2)
+
+        assert archive.part_size == 16 * 1024**2
+
+    def test_settings_reject_part_size_below_s3_minimum(self, monkeypatch):
+        monkeypatch.setenv('VERSION_PUBLISH_PART_SIZE', str(1024 * 1024))
+
+        with pytest.raises(ValidationError):
+            Settings()
@@ -0,0 +1,181 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import json
+import os
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path
+from unittest import mock
+from uuid import uuid4
+
+import pytest
+
+from dataset.components.version.publisher import NotEnoughDiskSpace
+from dataset.components.version.publisher import ObjectVersionMissing
+from dataset.components.version.publisher import VersionPublisher
+from dataset.components.version.publisher import disk_budget
+from dataset.components.version.schemas import VersionCreateSchema
+
+
+async def write_downloaded_file(bucket: str, key: str, local_path: str) -> None:
+    Path(local_path).parent.mkdir(parents=True, exist_ok=True)
+    Path(local_path).write_bytes(b'')
+
+
+@pytest.fixture
+def version_publisher(tmp_path) -> Iterator[VersionPublisher]:
+    publisher = VersionPublisher(
+        redis_client=mock.AsyncMock(),
+        version_crud=mock.AsyncMock(),
+        version_file_crud=mock.AsyncMock(),
+        locking_manager=mock.AsyncMock(),
+        folder_crud=mock.AsyncMock(),
+        metadata_service=mock.AsyncMock(),
+        s3_client=mock.AsyncMock(),
+        activity_log=mock.AsyncMock(),
+    )
+    publisher.job_key = 'job-key'
+    publisher.tmp_folder = str(tmp_path / 'version')
+    publisher.zip_path = str(tmp_path / 'archive')
+    publisher.s3_client.download_file.side_effect = write_downloaded_file
+    yield publisher
+    publisher._remove_local_files()
+
+
+def make_file(path: str, size: int) -> dict:
+    return {'size': size, 'storage': {'location_uri': f'minio://http://minio:9000/dataset/{path}'}}
+
+
+class TestVersionPublisher:
+    async def test_download_dataset_files_returns_paths_in_file_order_and_reports_progress(self, version_publisher):
+        version_publisher.dataset_files = [make_file('data/b.txt', 2), make_file('data/a.txt', 3)]
+
+        file_paths = await version_publisher._download_dataset_files()
+
+        assert file_paths == [
+            f'{version_publisher.tmp_folder}/data/b.txt',
+            f'{version_publisher.tmp_folder}/data/a.txt',
+        ]
+        status = json.loads(version_publisher.redis_client.set.call_args.args[1])
+        assert status['progress'] == {'files_done': 2, 'files_total': 2, 'bytes_done': 5, 'bytes_total': 5}
+
+    async def test_download_dataset_files_retries_failed_download(self, version_publisher, monkeypatch):
+        monkeypatch.setattr('dataset.components.version.publisher.settings.VERSION_PUBLISH_DOWNLOAD_RETRY_DELAY', 0)
+        attempts = []
+
+        async def fail_first_attempt(bucket: str, key: str, local_path: str) -> None:
+            attempts.append(local_path)
+            if len(attempts) == 1:
+                raise Exception()
+            await write_downloaded_file(bucket, key, local_path)
+
+        version_publisher.s3_client.download_file.side_effect = fail_first_attempt
+        version_publisher.dataset_files = [make_file('data/a.txt', 1)]
+
+        await version_publisher._download_dataset_files()
+
+        assert version_publisher.s3_client.download_file.call_count == 2
+
+    async def test_download_dataset_files_raises_when_disk_budget_is_exceeded(self, version_publisher, monkeypatch):
+        monkeypatch.setattr('dataset.components.version.publisher.settings.VERSION_PUBLISH_DISK_BUDGET', 10)
+        version_publisher.dataset_files = [make_file('data/a.txt', 6)]
+
+        with pytest.raises(NotEnoughDiskSpace):
+            await version_publisher._download_dataset_files()
+
+        version_publisher.s3_client.download_file.assert_not_called()
+
+    async def test_download_dataset_files_raises_when_disk_budget_is_reserved_by_other_jobs(
+        self, version_publisher, monkeypatch
+    ):
+        monkeypatch.setattr('dataset.components.version.publisher.settings.VERSION_PUBLISH_DISK_BUDGET', 10)
+        version_publisher.dataset_files = [make_file('data/a.txt', 3)]
+        disk_budget.reserve(version_publisher.TMP_BASE, 6)
+
+        try:
+            with pytest.raises(NotEnoughDiskSpace):
+                await version_publisher._download_dataset_files()
+        finally:
+            disk_budget.release(6, 0)
+
+        version_publisher.s3_client.download_file.assert_not_called()
+
+    async def test_download_dataset_files_raises_when_files_are_larger_than_reserved(self, version_publisher):
+        async def write_larger_file(bucket: str, key: str, local_path: str) -> None:
+            Path(local_path).parent.mkdir(parents=True, exist_ok=True)
+            Path(local_path).write_bytes(b'0' * 100)
+
+        version_publisher.s3_client.download_file.side_effect = write_larger_file
+        version_publisher.dataset_files = [make_file('data/a.txt', 1)]
+
+        with pytest.raises(NotEnoughDiskSpace):
+            await version_publisher._download_dataset_files()
+
+    def test_zip_files_adds_entries_in_sorted_path_order(self, version_publisher, tmp_path):
+        for path in ('data/b.txt', 'data/a.txt', 'default_schema.json'):
+            file_path = tmp_path / 'version' / path
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_text(path)
+
+        version_publisher._zip_files()
+
+        with zipfile.ZipFile(f'{version_publisher.zip_path}.zip') as zip_file:
+            assert zip_file.namelist() == ['data/', 'data/a.txt', 'data/b.txt', 'default_schema.json']
+
+    def test_zip_files_creates_the_same_archive_for_the_same_files(self, version_publisher, tmp_path):
+        file_path = tmp_path / 'version' / 'data' / 'a.txt'
+        file_path.parent.mkdir(parents=True)
+        file_path.write_text('content')
+
+        version_publisher._zip_files()
+        first = Path(f'{version_publisher.zip_path}.zip').read_bytes()
+        os.utime(file_path, (0, 0))
+        version_publisher._zip_files()
+        second = Path(f'{version_publisher.zip_path}.zip').read_bytes()
+
+        assert first == second
+
+    async def test_create_snapshot_pins_current_object_versions(self, version_publisher):
+        version_publisher._get_schemas = mock.AsyncMock(return_value=[])
+        version_publisher.s3_client.head_object.return_value = {
+            'VersionId': 'object-version',
+            'ContentLength': 4,
+            'ETag': '"etag"',
+        }
+        version_publisher.version_crud.create.return_value = mock.Mock(id=uuid4())
+        version_publisher.dataset_files = [{'id': 'file-id', **make_file('data/a.txt', 4)}]
+        version_data = VersionCreateSchema(operator='admin', notes='notes', version='1.0', snapshot=True)
+
+        version = await version_publisher._create_snapshot('dataset', uuid4(), version_data)
+
+        version_schema = version_publisher.version_crud.create.call_args.args[0]
+        assert version_schema.snapshot is True
+        assert version_schema.location is None
+        [version_file] = version_publisher.version_file_crud.create_many.call_args.args[0]
+        assert version_file.version_id == version.id
+        assert version_file.path == 'data/a.txt'
+        assert version_file.object_version_id == 'object-version'
+        assert version_file.etag == 'etag'
+        version_publisher.s3_client.download_file.assert_not_called()
+
+    @pytest.mark.parametrize('object_version_id', [None, 'null'])
+    async def test_create_snapshot_raises_when_bucket_versioning_is_not_enabled(
+        self, version_publisher, object_version_id
+    ):
+        version_publisher._get_schemas = mock.AsyncMock(return_value=[])
+        version_publisher.s3_client.head_object.return_value = {
+            'VersionId': object_version_id,
+            'ContentLength': 4,
+            'ETag': '"etag"',
+        }
+        version_publisher.dataset_files = [{'id': 'file-id', **make_file('data/a.txt', 4)}]
+        version_data = VersionCreateSchema(operator='admin', notes='notes', version='1.0', snapshot=True)
+
+        with pytest.raises(ObjectVersionMissing):
+            await version_publisher._create_snapshot('dataset', uuid4(), version_data)
+
+        version_publisher.version_crud.create.assert_not_called()
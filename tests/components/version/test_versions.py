@@ -11,7 +11,9 @@ from sqlalchemy import select
 
 from dataset.components.file.schemas import ItemStatusSchema
 from dataset.components.version.activity_log import VersionActivityLog
+from dataset.components.version.crud import VersionFileCRUD
 from dataset.components.version.models import Version
+from dataset.components.version.schemas import VersionFileSchema
 from dataset.components.version.schemas import VersionResponseSchema
 from dataset.dependencies import get_s3_client
 
@@ -50,29 +52,6 @@ async def test_publish_version_should_start_background_task_and_return_200(
         },
     )
 
-    httpx_mock.add_response(
-        method='GET',
-        url=(
-            'http://metadata_service/v1/items/search/?'
-            f'recursive=true&zone=1&container_code={dataset.code}'
-            '&container_type=dataset&page_size=100&page=0&type=file'
-        ),
-        json={
-            'page': 0,
-            'num_of_pages': 1,
-            'result': [
-                {
-                    'id': file_geid,
-                    'parent': None,
-                    'type': 'file',
-                    'parent_path': 'obj/path',
-                    'status': ItemStatusSchema.ACTIVE.name,
-                    'storage': {'location_uri': f'http://anything.com/{dataset.code}/obj/path'},
-                }
-            ],
-        },
-    )
-
     httpx_mock.add_response(
         method='POST',
         url='http://data_ops_util/v2/resource/lock/',
@@ -198,3 +177,79 @@ async def test_version_publish_status_not_found_should_return_404(client):
     res = await client.get(f'/v1/dataset/{dataset_id}/publish/status?status_id={dataset_id}')
     assert res.status_code, 404
     assert res.json()['error'] == {'code': 'global.not_found', 'details': 'Requested resource is not found'}
+
+
+async def test_list_version_files_returns_files_of_snapshot_version_sorted_by_path(client, version_factory, db_session):
+    version = await version_factory.create_with_dataset(location=None, snapshot=True)
+    version_file_crud = VersionFileCRUD(db_session)
+    await version_file_crud.create_many(
+        [
+            VersionFileSchema(
+                version_id=version.id,
+                file_id=str(uuid4()),
+                path=path,
+                bucket=version.dataset_code,
+                key=path,
+                object_version_id=str(uuid4()),
+                size=10,
+                etag='etag',
+            )
+            for path in ('data/b.txt', 'data/a.txt')
+        ]
+    )
+
+    res = await client.get(f'/v1/dataset/versions/{version.id}/files')
+
+    assert res.status_code == 200
+    assert res.json()['total'] == 2
+    assert [file['path'] for file in res.json()['result']] == ['data/a.txt', 'data/b.txt']
+
+
+async def test_list_version_files_returns_404_for_unknown_version(client):
+    res = await client.get(f'/v1/dataset/versions/{uuid4()}/files')
+
+    assert res.status_code == 404
+    assert res.json()['error'] == {'code': 'global.not_found', 'details': 'Requested resource is not found'}
+
+
+async def test_list_version_files_returns_400_for_version_that_is_not_snapshot(client, version_factory):
+    version = await version_factory.create_with_dataset(snapshot=False)
+
+    res = await client.get(f'/v1/dataset/versions/{version.id}/files')
+
+    assert res.status_code == 400
+    assert res.json()['error'] == {
+        'code': 'version.not_snapshot',
+        'details': 'Files are only available for snapshot versions',
+    }
+
+
+@mock.patch.object(VersionActivityLog, 'send_version_file_download_event')
+async def test_download_version_file_returns_presigned_url_for_pinned_object_version(
+    mock_activity_log, client, version_factory, db_session, authorization_header
+):
+    version = await version_factory.create_with_dataset(location=None, snapshot=True)
+    file_id = str(uuid4())
+    await VersionFileCRUD(db_session).create_many(
+        [
+            VersionFileSchema(
+                version_id=version.id,
+                file_id=file_id,
+                path='data/a.txt',
+                bucket=version.dataset_code,
+                key='data/a.txt',
+                object_version_id='object-version',
+                size=10,
+                etag='etag',
+            )
+        ]
+    )
+
+    res = await client.get(
+        f'/v1/dataset/versions/{version.id}/files/{file_id}/download/pre', headers=authorization_header
+    )
+
+    assert res.status_code == 200
+    assert 'versionId=object-version' in res.json()['result']['source']
+    version_file = mock_activity_log.call_args.args[1]
+    assert version_file.path == 'data/a.txt'
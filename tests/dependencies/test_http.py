@@ -0,0 +1,36 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from dataset.dependencies.http import GetHTTPClient
+from dataset.dependencies.http import Upstream
+
+
+class TestGetHTTPClient:
+    async def test_same_client_is_returned_for_the_same_upstream(self):
+        get_http_client = GetHTTPClient()
+
+        client = get_http_client(Upstream.METADATA)
+
+        assert get_http_client(Upstream.METADATA) is client
+        assert get_http_client(Upstream.DATA_OPS) is not client
+
+        await get_http_client.close()
+
+    async def test_close_releases_all_clients(self):
+        get_http_client = GetHTTPClient()
+        client = get_http_client(Upstream.PROJECT)
+
+        await get_http_client.close()
+
+        assert client.is_closed
+        assert get_http_client.instances == {}
+
+    async def test_authorization_header_is_passed_per_request(self, httpx_mock, metadata_service):
+        httpx_mock.add_response(method='GET', url='http://metadata_service/v1/item/any/', json={'result': {}})
+
+        await metadata_service.get_by_id('any')
+
+        assert httpx_mock.get_requests()[0].headers['Authorization'] == 'Bearer eyJhbGc'
@@ -4,7 +4,11 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from dataset.config import get_settings
 from dataset.dependencies import get_s3_client
+from dataset.dependencies.s3 import GetS3Client
+
+settings = get_settings()
 
 
 class TestS3Client:
@@ -19,3 +23,20 @@ class TestS3Client:
         assert s3_test_client.check_if_bucket_exists('another-bucket')
         await s3_client.remove_bucket('another-bucket')
         assert not s3_test_client.check_if_bucket_exists('another-bucket')
+
+    async def test_s3_client_is_created_once(self):
+        get_s3_client = GetS3Client()
+
+        s3_client = await get_s3_client()
+
+        assert await get_s3_client() is s3_client
+        await get_s3_client.close()
+        assert get_s3_client.instance is None
+
+    async def test_s3_client_reuses_pooled_client(self):
+        s3_client = await get_s3_client()
+
+        client = await s3_client._get_client(s3_client.boto_client.endpoint)
+
+        assert await s3_client._get_client(s3_client.boto_client.endpoint) is client
+        assert client.meta.config.max_pool_connections == settings.S3_MAX_POOL_CONNECTIONS
@@ -82,7 +82,7 @@ class SchemaFactory(CRUDFactory):
             name, dataset_id, schema_template_id, standard, system_defined, is_draft, content, creator
         )
 
-        return await self.crud.create(entry, **kwds)
+        return await self.crud.create(entry, load_relationships=True, **kwds)
 
     async def create_essentials(self, dataset: Dataset) -> SchemaDataset:
         return await self.crud.create_essentials(dataset)
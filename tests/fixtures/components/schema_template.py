@@ -74,7 +74,7 @@ class SchemaTemplateFactory(CRUDFactory):
     ) -> SchemaTemplate:
         entry = self.generate(name, creator, standard, system_defined, is_draft, content, dataset_id)
 
-        return await self.crud.create(entry, **kwds)
+        return await self.crud.create(entry, load_relationships=True, **kwds)
 
     async def bulk_create(
         self,
@@ -79,7 +79,7 @@ class VersionFactory(CRUDFactory):
     ) -> Version:
         entry = self.generate(notes, created_by, version, dataset_code, dataset_id, location)
 
-        return await self.crud.create(entry, **kwds)
+        return await self.crud.create(entry, load_relationships=True, **kwds)
 
     async def create_with_dataset(
         self,
@@ -69,7 +69,7 @@ class VersionSharingRequestFactory(CRUDFactory):
             status=status,
         )
 
-        return await self.crud.create(entry, **kwds)
+        return await self.crud.create(entry, load_relationships=True, **kwds)
 
     async def bulk_create(
         self,
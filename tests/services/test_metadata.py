@@ -160,3 +160,44 @@ class TestMetadataService:
         )
         response = await metadata_service.is_duplicated_name_item(dataset_code, folder_name, item['parent'])
         assert response
+
+    async def test_get_objects_returns_items_from_all_pages_exactly_once(self, httpx_mock, metadata_service, item):
+        dataset_code = 'testdataset'
+        items = []
+        for page in range(4):
+            page_item = copy.deepcopy(item)
+            page_item['id'] = f'item-{page}'
+            items.append(page_item)
+            httpx_mock.add_response(
+                method='GET',
+                url=(
+                    'http://metadata_service/v1/items/search/'
+                    f'?recursive=true&zone=1&container_code={dataset_code}&container_type=dataset&page_size=100'
+                    f'&page={page}'
+                ),
+                json={'page': page, 'num_of_pages': 4, 'result': [page_item]},
+            )
+
+        response = await metadata_service.get_objects(dataset_code)
+
+        assert response == items
+        assert len(httpx_mock.get_requests()) == 4
+
+    async def test_iter_objects_streams_items_in_page_order(self, httpx_mock, metadata_service, item):
+        dataset_code = 'testdataset'
+        item2 = copy.deepcopy(item)
+        item2['id'] = 'item-2'
+        for page, result in enumerate([[item], [item2]]):
+            httpx_mock.add_response(
+                method='GET',
+                url=(
+                    'http://metadata_service/v1/items/search/'
+                    f'?recursive=true&zone=1&container_code={dataset_code}&container_type=dataset&page_size=1'
+                    f'&page={page}'
+                ),
+                json={'page': page, 'num_of_pages': 2, 'result': result},
+            )
+
+        received = [obj async for obj in metadata_service.iter_objects(dataset_code, page_size=1, concurrency=1)]
+
+        assert received == [item, item2]
@@ -0,0 +1,68 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import json
+
+import pytest
+
+from dataset.components.file.types import EActionType
+from dataset.components.file.types import EFileStatus
+from dataset.services.task_stream import TaskStreamService
+
+
+@pytest.fixture
+def files():
+    return [
+        {
+            'id': f'fd571f18-a62a-44b1-927c-91ad662260a{index}',
+            'name': f'file{index}.txt',
+            'parent_path': 'folder1',
+            'type': 'file',
+        }
+        for index in range(3)
+    ]
+
+
+class TestTaskStreamService:
+    async def test_flush_sends_only_latest_status_of_each_job(self, httpx_mock, files):
+        httpx_mock.add_response(method='POST', url='http://data_ops_util/v1/task-stream/', json={})
+        service = TaskStreamService()
+        action = EActionType.data_delete.name
+
+        job_tracker = await service.initialize_file_jobs('session', action, files, 'dataset')
+        for file in files:
+            job_id = job_tracker['job_id'][file['id']]
+            await service.update_job_status('session', file, action, EFileStatus.RUNNING.name, 'dataset', job_id)
+            await service.update_job_status('session', file, action, EFileStatus.SUCCEED.name, 'dataset', job_id)
+        await service.flush()
+
+        sent = [json.loads(request.content) for request in httpx_mock.get_requests()]
+        assert sorted(status['job_id'] for status in sent) == sorted(file['id'] for file in files)
+        assert {status['status'] for status in sent} == {EFileStatus.SUCCEED.name}
+        assert service.pending == {}
+        assert service.flush_task is None
+
+    async def test_pending_statuses_are_sent_after_flush_interval(self, httpx_mock, files):
+        httpx_mock.add_response(method='POST', url='http://data_ops_util/v1/task-stream/', json={})
+        service = TaskStreamService()
+        service.flush_interval = 0.01
+
+        await service.initialize_file_jobs('session', EActionType.data_import.name, files, 'dataset')
+        await asyncio.sleep(0.1)
+
+        sent = [json.loads(request.content) for request in httpx_mock.get_requests()]
+        assert {status['status'] for status in sent} == {EFileStatus.WAITING.name}
+        assert len(sent) == len(files)
+
+    async def test_flush_does_not_raise_when_status_is_not_accepted(self, httpx_mock, files):
+        httpx_mock.add_response(method='POST', url='http://data_ops_util/v1/task-stream/', status_code=500)
+        service = TaskStreamService()
+
+        await service.initialize_file_jobs('session', EActionType.data_import.name, files[:1], 'dataset')
+        await service.flush()
+
+        assert len(httpx_mock.get_requests()) == 1